@@ -0,0 +1,160 @@
+"""
+Benchmarks headless (sem Tk) sobre dumps sintéticos.
+
+    python -m benchmarks.run [--sizes 10k,100k,500k] [--repeat 3] [-j N] [-o resultados.json]
+    python -m benchmarks.run --compare antes.json depois.json
+
+Cada operação roda 'repeat' vezes (com o preparo fora do tempo); o JSON guarda todas
+as medidas, o mínimo e a mediana, junto com o commit, a máquina e a semente, para
+comparar execuções de commits diferentes.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import threading
+import subprocess
+from statistics import median
+from datetime import datetime
+from .synthetic import write_dataset
+from src.logic.backend import FileManager
+from src.logic.audit import AuditManager, SPELL_AVAILABLE, compile_dictionary
+from src.logic.audit_engine import AuditEngine
+from src.logic.save_engine import SaveEngine
+from src.logic.text_index import TextIndex
+
+SIZES = {"10k": 10_000, "100k": 100_000, "500k": 500_000}
+QUERIES = ("sales", "coração", "<color=", "door", "xyzzy")  # Comum, acentuado, tag, raro, ausente
+
+def timed(fn, repeat, setup=None):
+    """Roda fn(setup()) 'repeat' vezes; devolve as medidas e o último resultado."""
+    runs, out = [], None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        out = fn(arg) if setup else fn()
+        runs.append(time.perf_counter() - t0)
+    return {"min": min(runs), "median": median(runs), "runs": runs}, out
+
+def _git(*args):
+    try: return subprocess.run(("git",) + args, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError): return None
+
+def metadata(args):
+    return {"commit": _git("rev-parse", "HEAD"), "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "time": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+            "platform": platform.platform(), "cpus": os.cpu_count(), "seed": args.seed, "repeat": args.repeat,
+            "jobs": args.jobs, "spell": SPELL_AVAILABLE}
+
+def bench_size(name, lines, args):
+    paths = write_dataset(os.path.join(args.data, name), lines, seed=args.seed)
+    ops, info = {}, {"lines": lines, "bytes": os.path.getsize(paths["base"])}
+    log = lambda op: print(f"  {name} {op}: {ops[op]['median'] * 1000:.1f} ms", file=sys.stderr)
+
+    # Leitura do dump: parser antigo (readlines) e o índice mapeado usado pelo app
+    def parse_dict():
+        with open(paths["base"], 'r', encoding='utf-8') as f: return FileManager.parse_file_to_dict(f.readlines())
+    ops["parse"], _ = timed(parse_dict, args.repeat); log("parse")
+    ops["index"], index = timed(lambda: FileManager.index_base_file(paths["base"]), args.repeat); log("index")
+    ops["build_table"], trans = timed(lambda: FileManager.build_translations(index), args.repeat); log("build_table")
+
+    # Importação do arquivo de tradução (parse + aplicar) sobre uma tabela limpa
+    def do_import(table):
+        with open(paths["translation"], 'r', encoding='utf-8') as f: lines_ = f.readlines()
+        return FileManager.apply_updates(table, FileManager.parse_translation_lines(lines_), "translation.txt")
+    ops["import"], changed = timed(do_import, args.repeat, lambda: FileManager.build_translations(index)); log("import")
+    trans = FileManager.build_translations(index)
+    do_import(trans)
+    info["translated"] = len(changed)
+    rows = list(trans.columns("original", "translated"))
+
+    with open(paths["glossary"], 'r', encoding='utf-8') as f: gloss = json.load(f)
+    am = AuditManager(load_dictionary=False)
+    am.set_glossary(gloss)
+    ops["glossary"], issues = timed(lambda: sum(1 for _, o, t in rows if am.validate_glossary(o, t)), args.repeat)
+    info["glossary_issues"] = issues; log("glossary")
+
+    # Auditoria completa em processos; cada repetição começa com o cache vazio
+    checks = (True, SPELL_AVAILABLE, True)
+    def audit(manager): return AuditEngine(manager, workers=args.jobs).run(rows, checks)
+    def fresh():
+        m = AuditManager(load_dictionary=False)
+        m.set_glossary(gloss)
+        return m
+    ops["audit"], stats = timed(audit, args.repeat, fresh)
+    info["audit_errors"], info["audit_workers"] = stats["errors"], stats["workers"]; log("audit")
+
+    # Busca: montagem do índice de trigramas, consultas pelo índice e varredura linear
+    def build_index():
+        idx, done = TextIndex(), threading.Event()
+        idx.rebuild(trans, done.set)
+        done.wait()
+        return idx
+    ops["search_index_build"], tindex = timed(build_index, args.repeat); log("search_index_build")
+    ops["search_indexed"], hits = timed(lambda: [len(tindex.search(q)) for q in QUERIES], args.repeat)
+    log("search_indexed")
+    def linear():
+        out = []
+        for q in QUERIES:
+            q = q.casefold()
+            out.append(sum(1 for _, o, t in trans.columns("original", "translated") if q in t.casefold() or q in o.casefold()))
+        return out
+    ops["search_linear"], lin = timed(linear, args.repeat); log("search_linear")
+    if hits != lin: raise SystemExit(f"Busca pelo índice diverge da varredura: {hits} != {lin}")
+    info["search_hits"] = dict(zip(QUERIES, hits))
+
+    out_dir = os.path.join(args.data, name)
+    modified = trans.modified_ids()
+    ops["export"], _ = timed(lambda: FileManager.write_selection(os.path.join(out_dir, "export.txt"), trans, modified), args.repeat)
+    log("export")
+    ops["save"], _ = timed(lambda: SaveEngine.save(index, SaveEngine.snapshot_rows(trans), os.path.join(out_dir, "saved.txt")), args.repeat)
+    log("save")
+    index.close()
+    return {**info, "ops": ops}
+
+def compare(old_path, new_path, threshold=0.10):
+    """Tabela de medianas (antes / depois); devolve 1 se alguma operação piorou mais que o limite."""
+    with open(old_path, 'r', encoding='utf-8') as f: old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f: new = json.load(f)
+    print(f"{'tamanho':<8}{'operação':<22}{'antes (ms)':>12}{'depois (ms)':>13}{'razão':>8}")
+    worse = False
+    for size, res in new["results"].items():
+        base = old["results"].get(size)
+        if not base: continue
+        for op, m in res["ops"].items():
+            if op not in base["ops"]: continue
+            a, b = base["ops"][op]["median"], m["median"]
+            ratio = b / a if a else float("inf")
+            flag = " <-" if ratio > 1 + threshold else ""
+            worse |= bool(flag)
+            print(f"{size:<8}{op:<22}{a * 1000:>12.1f}{b * 1000:>13.1f}{ratio:>8.2f}{flag}")
+    return 1 if worse else 0
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmarks do Hatsune ENA Tool")
+    p.add_argument("--sizes", default="10k,100k,500k", help=f"Tamanhos separados por vírgula ({', '.join(SIZES)} ou nº de linhas)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("-j", "--jobs", type=int, default=None, help="Processos da auditoria (padrão: todos os núcleos)")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--data", default="bench_data", help="Pasta dos dumps gerados (reaproveitados entre execuções)")
+    p.add_argument("-o", "--output", help="Grava o JSON neste arquivo (padrão: stdout)")
+    p.add_argument("--compare", nargs=2, metavar=("ANTES", "DEPOIS"), help="Compara dois resultados e sai")
+    args = p.parse_args(argv)
+    if args.compare: return compare(*args.compare)
+
+    if SPELL_AVAILABLE: compile_dictionary()  # Fora das medidas: a compilação só acontece uma vez
+    results = {}
+    for name in (s.strip() for s in args.sizes.split(",") if s.strip()):
+        lines = SIZES.get(name) or int(name)
+        print(f"{name}: {lines} linhas", file=sys.stderr)
+        results[name] = bench_size(name, lines, args)
+    text = json.dumps({"meta": metadata(args), "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: f.write(text)
+    else: print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Dumps sintéticos no formato do jogo (Unity 'vector values' / '1 string data') e os
+arquivos que acompanham: tradução exportada ([id] + string data) e glossário.
+Tudo é gerado a partir de uma semente, então o mesmo tamanho + semente dá sempre
+os mesmos bytes (resultados comparáveis entre commits).
+"""
+import os
+import json
+import random
+
+GENERATOR = 1  # Mudou a geração: incremente para não reaproveitar dumps antigos
+EN_WORDS = (
+    "the you I it to a and is that of what this we be do have not in for my me your are on so "
+    "just like know can get all but with no here was there now if out right go think about one "
+    "want up how time look see something got come back she he why who really mean money buy "
+    "sell item world room night day light dark help wait stop please sorry maybe never always "
+    "again little still thing way much work talk call find keep feel leave play turn hear move "
+    "place point hand head face eye"
+).split()
+PT_WORDS = (
+    "o a você eu isso para um uma e é que de do da não em por meu minha seu sua são no na então "
+    "só como sei pode ter tudo mas com aqui foi lá agora se fora certo vai acho sobre quer cima "
+    "tempo olha ver alguma coisa veio ela ele porque quem mesmo vendas cliente dinheiro preço "
+    "negócio comprar vender oferta loja item sonho mundo porta quarto noite dia luz escuro voz "
+    "amigo ajuda espera pare desculpa talvez nunca sempre pouco ainda jeito muito trabalho falar "
+    "chamar achar manter sentir sair jogar virar ouvir mover lugar ponto mão cabeça rosto olho "
+    "coração também já quando onde obrigado bem melhor grande pequeno novo velho"
+).split()
+ENA_WORDS = ("Whisper", "Hint", "ENASales", "ENAMean")
+PUNCT = (".", ".", ".", "!", "?", "...", ",")
+COLORS = ("#ff0000", "#00ffcc", "#ffd700", "#8a2be2", "#ffffff")
+
+# Glossário: termos do jogo (origem -> tradução recomendada). Os termos não estão em EN_WORDS:
+# só aparecem nas linhas sorteadas (glossary_rate), como no jogo.
+GLOSSARY_BASE = {
+    "Sales": "Vendas", "Customer": "Cliente", "Dream": "Sonho", "Shop": "Loja", "Offer": "Oferta",
+    "Deal": "Negócio", "Price": "Preço", "Friend": "Amigo", "Door": "Porta", "Voice": "Voz",
+    "Moony": "Moony", "Turrón": "Turrón", "ENA": "ENA", "Taski Maiden": "Taski Maiden",
+}
+
+def glossary(extra=200, seed=0):
+    """Glossário com os termos fixos + 'extra' termos gerados (nomes próprios fictícios)."""
+    rng = random.Random(seed)
+    g = dict(GLOSSARY_BASE)
+    syl = ("ka", "lo", "mi", "ra", "to", "shi", "na", "be", "zu", "ven", "tor", "el")
+    while len(g) < len(GLOSSARY_BASE) + extra:
+        name = "".join(rng.choice(syl) for _ in range(rng.randint(2, 4))).capitalize()
+        g[name] = name
+    return g
+
+class TextGen:
+    """Frases com densidade de tags e palavras reservadas parecida com a do jogo."""
+    def __init__(self, seed, tag_rate=0.25, typo_rate=0.03):
+        self.rng = random.Random(seed)
+        self.tag_rate = tag_rate
+        self.typo_rate = typo_rate
+
+    def _words(self, vocab, n, terms=()):
+        rng = self.rng
+        words = [rng.choice(vocab) for _ in range(n)]
+        for t in terms: words.insert(rng.randrange(len(words) + 1), t)
+        if rng.random() < 0.05: words.insert(rng.randrange(len(words) + 1), rng.choice(ENA_WORDS))
+        return words
+
+    def _tagged(self, words, tag_plan):
+        """Aplica o mesmo plano de tags (posições relativas) nas duas línguas."""
+        for kind, pos in tag_plan:
+            i = min(int(pos * len(words)), len(words) - 1)
+            if kind == "color": words[i] = f"<color={COLORS[i % len(COLORS)]}>{words[i]}</color>"
+            elif kind == "size": words[i] = f"<size=40>{words[i]}</size>"
+            elif kind == "br": words[i] = words[i] + "<br>"
+            else: words[i] = f"<{kind}>{words[i]}</{kind}>"
+        return words
+
+    def _sentence(self, words):
+        s = " ".join(words)
+        return s[:1].upper() + s[1:] + self.rng.choice(PUNCT)
+
+    def _typo(self, w):
+        if len(w) < 4 or '<' in w: return w
+        i = self.rng.randrange(1, len(w) - 1)
+        return w[:i] + w[i + 1] + w[i] + w[i + 2:]
+
+    def pair(self, terms=()):
+        """(original em inglês, tradução em português) com as mesmas tags."""
+        rng = self.rng
+        n = rng.randint(3, 25)
+        plan = []
+        if rng.random() < self.tag_rate:
+            plan = [(rng.choice(("color", "b", "i", "size", "br")), rng.random()) for _ in range(rng.randint(1, 3))]
+        en = self._tagged(self._words(EN_WORDS, n, [src for src, _ in terms]), plan)
+        pt_terms = [tgt if rng.random() < 0.9 else tgt.lower() for _, tgt in terms]  # Alguns erros de glossário
+        pt = self._words(PT_WORDS, max(1, n + rng.randint(-2, 3)), pt_terms)
+        pt = [self._typo(w) if rng.random() < self.typo_rate else w for w in pt]
+        pt = self._tagged(pt, plan if rng.random() > 0.02 else plan[:-1])  # ~2% com tag faltando
+        return self._sentence(en), self._sentence(pt)
+
+def write_dataset(folder, lines, seed=1, translated=0.6, glossary_rate=0.1):
+    """
+    Gera em 'folder': base.txt (dump com 'lines' strings), translation.txt (fração
+    'translated' das linhas, formato exportado) e glossary.json. Devolve os caminhos.
+    Reaproveita os arquivos se já existem para o mesmo tamanho e semente.
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = {k: os.path.join(folder, f) for k, f in
+             (("base", "base.txt"), ("translation", "translation.txt"), ("glossary", "glossary.json"), ("meta", "meta.json"))}
+    meta = {"generator": GENERATOR, "lines": lines, "seed": seed, "translated": translated, "glossary_rate": glossary_rate}
+    try:
+        with open(paths["meta"], 'r', encoding='utf-8') as f:
+            if json.load(f) == meta: return paths
+    except (OSError, ValueError): pass
+
+    gloss = glossary(seed=seed)
+    terms = list(gloss.items())
+    gen = TextGen(seed)
+    rng = random.Random(seed + 1)
+    with open(paths["base"], 'w', encoding='utf-8', newline='\n') as base, \
+         open(paths["translation"], 'w', encoding='utf-8', newline='\n') as trans:
+        base.write("0 MonoBehaviour Base\n"
+                   "\t0 PPtr<GameObject> m_GameObject\n\t\t0 int m_FileID = 0\n\t\t0 SInt64 m_PathID = 0\n"
+                   "\t1 UInt8 m_Enabled = 1\n\t1 string m_Name = \"DialogueTable\"\n"
+                   f"\t0 vector values\n\t\t1 Array Array ({lines} items)\n\t\t0 int size = {lines}\n")
+        for idx in range(lines):
+            used = [rng.choice(terms)] if rng.random() < glossary_rate else []
+            en, pt = gen.pair(used)
+            quoted = rng.random() < 0.9
+            q = '"' if quoted else ''
+            base.write(f"\t\t[{idx}]\n\t\t\t0 data\n\t\t\t\t1 string data = {q}{en}{q}\n")
+            if rng.random() < translated: trans.write(f"[{idx}]\n\t1 string data = {q}{pt}{q}\n\n")
+    with open(paths["glossary"], 'w', encoding='utf-8') as f: json.dump(gloss, f, ensure_ascii=False)
+    with open(paths["meta"], 'w', encoding='utf-8') as f: json.dump(meta, f)
+    return paths
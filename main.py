@@ -1,7 +1,9 @@
+import multiprocessing
 import tkinter as tk
 from src.app import ENATranslationTool
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Workers da auditoria no executável (PyInstaller)
     root = tk.Tk()
     app = ENATranslationTool(root)
     root.mainloop()
\ No newline at end of file
@@ -1,8 +1,17 @@
 import os
+import time
+import threading
 import tkinter as tk
-from .config import DARK_THEME, resource_path
+from tkinter import messagebox, filedialog
+from .logic.startup import STARTUP
+from .logic.perf import PERF
+from .config import DARK_THEME, JOURNAL_FLUSH_MS, PERF_LAG_MS, resource_path
 from .logic.backend import TranslationManager, FileManager
-from .logic.audit import AuditManager
+from .logic.audit import AuditManager, SPELL_AVAILABLE
+from .logic.session_journal import SessionJournal
+from .logic.row_store import RowStore
+from .logic.history_store import SessionLog
+from .logic.text_index import TextIndex
 from .logic.media import EasterEgg
 from .gui.layout import setup_ui
 from .controllers.file_controller import FileController
@@ -11,11 +20,14 @@ from .controllers.editor_controller import EditorController
 
 class ENATranslationTool:
     def __init__(self, root):
+        STARTUP.mark("importações")
         self.root = root
         self.root.title("Hatsune ENA Tool")
         self.root.geometry("1300x800")
         self.root.configure(bg="#1e1e1e")
-        self.SESSION_FILE = "ena_session_state.json"
+        self.SESSION_FILE = "ena_session.snap"
+        self.LEGACY_SESSION_FILE = "ena_session_state.json"  # Formato antigo (JSON), migrado ao abrir
+        self.MT_CACHE_FILE = "ena_mt_cache.db"
 
         try:
             icon = resource_path("app.ico")
@@ -23,11 +35,12 @@ class ENATranslationTool:
         except: pass
 
         # Data & State
-        self.translations = {}
-        self.base_filepath = ""; self.base_lines = []
+        self.translations = RowStore()
+        self.base_filepath = ""; self.base_index = None
         self.current_index = None; self.last_selected_id = None
-        self.session_log = []; self.baseline_snapshot = {}
+        self.session_log = SessionLog(); self.baseline_snapshot = {}
         self.unsaved_changes = False; self.spy_mode = False
+        self.edit_generation = 0  # Incrementa a cada alteração (usado pelo salvamento em background)
         
         # UI Variables
         self.show_spell = tk.BooleanVar(value=False)
@@ -43,8 +56,12 @@ class ENATranslationTool:
 
         # Managers & Controllers
         self.current_theme = DARK_THEME
-        self.translator_service = TranslationManager()
-        self.audit_manager = AuditManager()
+        # Tradutor e dicionário não são carregados aqui (ver _on_window_ready)
+        self.translator_service = TranslationManager(self.MT_CACHE_FILE)
+        self.audit_manager = AuditManager(load_dictionary=False)
+        self.journal = SessionJournal(self.SESSION_FILE, self.LEGACY_SESSION_FILE)
+        self.text_index = TextIndex()
+        STARTUP.mark("serviços")
         
         self.file_ctrl = FileController(self)
         self.tree_ctrl = TreeController(self)
@@ -56,43 +73,134 @@ class ENATranslationTool:
         self.root.bind('<Control-f>', self.editor_ctrl.focus_search)
         self.root.bind('<Control-h>', self.editor_ctrl.show_advanced_find)
         self.root.bind('<Control-m>', self.tree_ctrl.toggle_spy_mode)
+        if PERF.enabled: self.root.bind('<Control-P>', self.toggle_perf_panel)  # Ctrl+Shift+P
         # Importante para fechar o popup de filtros ao clicar fora
         self.root.bind('<Button-1>', self.tree_ctrl.check_close_filter)
 
         # Setup UI
         setup_ui(self)
+        STARTUP.mark("interface")
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.load_auto_session()
+        STARTUP.mark("sessão")
+        self.root.after(JOURNAL_FLUSH_MS, self._journal_tick)
+        self.root.after_idle(self._on_window_ready)
+        self.perf_visible = False
+        self._perf_expected, self._perf_ticks = None, 0
+        if PERF.enabled: self._perf_tick()
+
+    def _on_window_ready(self):
+        """Com a janela na tela: dicionário (e o tradutor, se o painel estiver ativo) em segundo plano."""
+        STARTUP.window_ready()
+        if self.audit_manager.load_dictionary_async(lambda: self.root.after(0, self._on_dictionary_ready)):
+            self.chk_spell.config(text="Ortografia (carregando dicionário…)")
+        elif not SPELL_AVAILABLE: self.chk_spell.config(text="Ortografia (N/A)")
+        if self.show_mt.get(): threading.Thread(target=self._preload_translator, daemon=True).start()
+
+    def _on_dictionary_ready(self):
+        am = self.audit_manager
+        for step, sec in am.load_times.items(): STARTUP.add(f"ortografia: {step}", sec)
+        self.chk_spell.config(text="Ortografia" if am.spell else "Ortografia (N/A)")
+        if am.spell and self.show_spell.get(): self.editor_ctrl.refresh_audit_view()
+
+    def _preload_translator(self):
+        svc = self.translator_service
+        ok = svc.preload()
+        for step, sec in svc.load_times.items(): STARTUP.add(f"tradutor: {step}", sec)
+        if not ok: self.root.after(0, lambda: self.chk_mt.config(text="Tradutor (N/A)", state=tk.DISABLED))
+
+    # --- Monitor de desempenho ---
+    def _perf_tick(self):
+        """Pulso periódico: o atraso em relação ao agendado é o tempo em que o loop do Tk ficou travado."""
+        now = time.perf_counter()
+        if self._perf_expected is not None: PERF.record("Tk.loop_lag", max(0.0, now - self._perf_expected))
+        self._perf_expected = now + PERF_LAG_MS / 1000
+        self._perf_ticks += 1
+        if self.perf_visible and self._perf_ticks % max(1, 1000 // PERF_LAG_MS) == 0: self.refresh_perf_panel()
+        self.root.after(PERF_LAG_MS, self._perf_tick)
+
+    def toggle_perf_panel(self, event=None):
+        self.perf_visible = not self.perf_visible
+        if self.perf_visible:
+            self.perf_group.pack(side=tk.LEFT, padx=(10, 5), anchor="n")
+            self.refresh_perf_panel()
+        else: self.perf_group.pack_forget()
+
+    def refresh_perf_panel(self):
+        lines = []
+        for name, st in PERF.top(5):
+            short = name.rsplit(".", 1)[-1][:22]
+            lines.append(f"{short:<22}{st['p50_ms']:7.1f}{st['p95_ms']:8.1f}{st['calls']:7d}")
+        self.lbl_perf_stats.config(text="\n".join(lines) or "(sem medidas ainda)")
+
+    def reset_perf(self):
+        PERF.reset()
+        self.refresh_perf_panel()
+
+    def export_perf(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", initialfile="ena_perf.json", title="Exportar Desempenho")
+        if not path: return
+        try: PERF.export(path, {"startup": STARTUP.to_dict(), "rows": len(self.translations)})
+        except Exception as e: messagebox.showerror("Erro", str(e)); return
+        self.lbl_status.config(text=f"Desempenho exportado: {os.path.basename(path)}")
 
     def open_secret_video(self, e=None): EasterEgg.play(self.root)
-    def mark_unsaved(self): self.unsaved_changes = True; self.root.title("Hatsune ENA Tool *")
+    def mark_unsaved(self): self.unsaved_changes = True; self.edit_generation += 1; self.root.title("Hatsune ENA Tool *")
     def mark_saved(self): self.unsaved_changes = False; self.root.title("Hatsune ENA Tool")
 
-    def save_auto_session(self):
-        if not self.translations: return
-        data = {
-            "base": self.base_filepath, "idx": self.current_index, "trans": self.translations,
-            "log": self.session_log, "base_snap": self.baseline_snapshot, "ui": {
+    def touch_row(self, idx): self.journal.mark_row(idx)
+
+    def load_session_sections(self, *names):
+        """Garante 'history' e/ou 'mt' da sessão nas linhas (lidos do snapshot só no primeiro uso)."""
+        for name in names or ("history", "mt"): self.journal.attach(name, self.translations)
+
+    def session_state(self):
+        """Estado pequeno (seleção, UI, filtros) que vai para o diário quando muda."""
+        return {
+            "base": self.base_filepath, "idx": self.current_index, "ui": {
                 "spell": self.show_spell.get(), "tags": self.show_tags.get(), "mt": self.show_mt.get()
             },
             "spy_mode": self.spy_mode,
-            "filters": self.filters,
+            "filters": dict(self.filters),
             "use_custom_baseline": self.use_custom_baseline.get()
         }
-        FileManager.save_session(self.SESSION_FILE, data)
+
+    def session_snapshot(self):
+        """Cópia do estado completo para a compactação (gravada em outra thread)."""
+        self.load_session_sections()
+        data = self.session_state()
+        data.update({
+            "trans": self.translations.copy(),
+            "log": self.session_log.to_list(), "base_snap": dict(self.baseline_snapshot)
+        })
+        return data
+
+    def save_auto_session(self, compact=False):
+        """Envia as alterações pendentes para o diário da sessão (ou um snapshot completo)."""
+        if not self.translations: return
+        if compact: self.journal.request_compact()
+        self.journal.flush(self.translations, self.session_log, self.session_state(), self.session_snapshot)
+
+    def _journal_tick(self):
+        self.save_auto_session()
+        if self.journal.error: self.lbl_status.config(text=f"Erro ao gravar sessão: {self.journal.error}")
+        self.root.after(JOURNAL_FLUSH_MS, self._journal_tick)
 
     def load_auto_session(self):
-        data = FileManager.load_session(self.SESSION_FILE)
+        try: data = self.journal.load()
+        except Exception as e:
+            print(f"Erro ao recuperar sessão: {e}"); return
         if not data: return
         self.base_filepath = data.get("base", "")
         if self.base_filepath and os.path.exists(self.base_filepath):
-            with open(self.base_filepath, 'r', encoding='utf-8') as f: self.base_lines = f.readlines()
+            try: self.base_index = FileManager.index_base_file(self.base_filepath)
+            except Exception as e: print(f"Erro ao indexar base: {e}")
             self.lbl_orig.config(text=f"Original: {os.path.basename(self.base_filepath)}")
         
-        raw_t = data.get("trans", {})
-        self.translations = {int(k): v for k, v in raw_t.items()}
+        self.translations = data["trans"]
+        self.text_index.rebuild(self.translations, lambda: STARTUP.add("índice de busca", self.text_index.build_time))
         self.current_index = data.get("idx")
-        self.session_log = data.get("log", [])
+        self.session_log = SessionLog.from_list(data.get("log", []))
         
         # Restore State
         self.filters = data.get("filters", self.filters)
@@ -116,10 +224,18 @@ class ENATranslationTool:
         if self.translations: 
             for b in [self.btn_import_trans, self.btn_import_partial, self.btn_export_mod]: b.config(state="normal")
             if self.current_index is not None and self.current_index in self.translations:
-                self.tree.selection_set(self.current_index)
-                self.tree.see(self.current_index)
-                self.editor_ctrl.on_select(None)
+                # Depois da janela aparecer: abrir a linha carrega o histórico da sessão
+                self.root.after_idle(self._restore_selection, self.current_index)
+
+    def _restore_selection(self, idx):
+        if idx in self.translations and self.current_index == idx:
+            self.vtree.select(idx)
+            self.editor_ctrl.on_select(None)
 
     def on_close(self):
         self.save_auto_session()
+        err = self.journal.wait()
+        if err and not messagebox.askyesno("Sessão", f"Não foi possível gravar a sessão:\n{err}\n\nFechar mesmo assim?"): return
+        self.journal.close()
+        self.translator_service.close()
         self.root.destroy()
\ No newline at end of file
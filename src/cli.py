@@ -0,0 +1,182 @@
+"""
+Interface de linha de comando (sem Tk) para CI e pipelines.
+
+    python -m src.cli audit  BASE [-t TRAD ...] [-s SESSAO] [-g GLOSSARIO] [-j N] [--strict]
+    python -m src.cli import BASE -t TRAD [--range MIN MAX] --session-out SESSAO
+    python -m src.cli merge  BASE -t TRAD [-t TRAD ...] -o SAIDA
+    python -m src.cli export BASE [-t TRAD | -s SESSAO] (--ids 0-10,42 | --modified) -o SAIDA
+    python -m src.cli save   BASE -s SESSAO -o SAIDA
+    python -m src.cli build-dict [-o ARQUIVO] [--force]
+
+Todos os comandos escrevem um relatório JSON (stdout ou --report).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from .logic.backend import FileManager
+from .logic.audit import AuditManager, compile_dictionary
+from .logic.audit_engine import AuditEngine
+from .logic.save_engine import SaveEngine
+from .logic.session_journal import SessionJournal
+from .logic.snapshot import SessionSnapshot
+from .config import SPELL_DICT_FILE
+
+def _load_state(args):
+    """Indexa a base e aplica sessão e arquivos de tradução, na ordem da linha de comando."""
+    index = FileManager.index_base_file(args.base)
+    trans = FileManager.build_translations(index)
+    report = {"base": os.path.abspath(args.base), "lines": len(trans), "imports": []}
+    if getattr(args, "session", None):
+        data = SessionJournal(args.session).load(full=True)  # Snapshot (binário ou JSON) + diário, como o app
+        if data is None: raise SystemExit(f"Sessão inválida ou inexistente: {args.session}")
+        saved = data["trans"]
+        for idx, row in saved.items():
+            if idx in trans:
+                for key in ("translated", "source_file", "ignore_errors", "mt_cache"):
+                    if key in row: trans[idx][key] = row[key]
+                if "history" in row: trans[idx]["history"] = saved.packed_history(idx)
+        report["session"] = os.path.abspath(args.session)
+    rng = tuple(args.range) if getattr(args, "range", None) else None
+    for path in getattr(args, "translation", None) or []:
+        with open(path, 'r', encoding='utf-8') as f: lines = f.readlines()
+        changed = FileManager.apply_updates(trans, FileManager.parse_translation_lines(lines, rng), os.path.basename(path))
+        report["imports"].append({"file": os.path.abspath(path), "updated": len(changed)})
+    return index, trans, report
+
+def _checks(args):
+    return (not args.no_tags, not args.no_spell, not args.no_grammar)
+
+def cmd_audit(args):
+    index, trans, report = _load_state(args)
+    am = AuditManager()
+    if args.glossary:
+        if am.load_glossary_file(args.glossary) is None: raise SystemExit("Glossário: JSON inválido.")
+    checks = _checks(args)
+    rows = [(idx, orig, text) for idx, orig, text, ign in trans.columns("original", "translated", "ignore_errors") if not ign]
+    stats = AuditEngine(am, workers=args.jobs).run(rows, checks)
+    if stats.get("failure"): raise SystemExit(f"Falha na auditoria: {stats['failure']}")
+
+    issues = []
+    for idx, orig, text in rows:
+        res = am.audit_row(idx, orig, text, checks)
+        if res.has_errors:
+            issues.append({"id": idx, "issues": [{"type": k, "message": m} for k, m in res.issues]})
+    report.update({"checks": dict(zip(("tags", "spell", "grammar"), checks)), "audited": len(rows),
+                   "errors": len(issues), "elapsed": stats["elapsed"], "workers": stats["workers"],
+                   "rows": issues})
+    return report, (1 if args.strict and issues else 0)
+
+def cmd_import(args):
+    index, trans, report = _load_state(args)
+    data = {"base": report["base"], "idx": None, "trans": trans, "log": [], "base_snap": {},
+            "ui": {"spell": False, "tags": True, "mt": False}, "spy_mode": False,
+            "filters": {}, "use_custom_baseline": False}
+    SessionSnapshot.write(args.session_out, data)
+    # Um diário antigo com o mesmo nome seria reaplicado sobre a sessão nova
+    if os.path.exists(args.session_out + ".journal"): os.remove(args.session_out + ".journal")
+    report["session_out"] = os.path.abspath(args.session_out)
+    return report, 0
+
+def _save(index, trans, out):
+    return SaveEngine.save(index, SaveEngine.snapshot_rows(trans), out)
+
+def cmd_write(args):
+    """merge e save: base + sessão/traduções -> arquivo final (só muda o que cada um exige)."""
+    index, trans, report = _load_state(args)
+    report["save"] = _save(index, trans, args.output)
+    return report, 0
+
+def _parse_ids(spec):
+    ids = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part: continue
+        if "-" in part:
+            a, b = part.split("-", 1)
+            ids.update(range(int(a), int(b) + 1))
+        else: ids.add(int(part))
+    return ids
+
+def cmd_export(args):
+    index, trans, report = _load_state(args)
+    ids = _parse_ids(args.ids) if args.ids else set(trans)
+    if args.modified: ids = {i for i in ids if i in trans and trans[i]["translated"] != trans[i]["original"]}
+    ids_list = sorted(i for i in ids if i in trans)
+    FileManager.write_selection(args.output, trans, ids_list)
+    report.update({"output": os.path.abspath(args.output), "exported": len(ids_list)})
+    return report, 0
+
+def cmd_build_dict(args):
+    """Compila o dicionário ortográfico (para distribuir junto ou antes de auditar em CI)."""
+    report = compile_dictionary(args.output, force=args.force)
+    if report is None: raise SystemExit("Dicionário fonte não encontrado (pt_BR.json.gz ou pyspellchecker).")
+    return report, 0
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="python -m src.cli", description="Hatsune ENA Tool (modo headless)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    def common(sp, translations=True, session=True):
+        sp.add_argument("base", help="Arquivo ORIGINAL (dump Unity)")
+        if translations:
+            sp.add_argument("-t", "--translation", action="append", help="Arquivo de tradução (pode repetir)")
+            sp.add_argument("--range", nargs=2, type=int, metavar=("MIN", "MAX"), help="Só IDs neste intervalo")
+        if session: sp.add_argument("-s", "--session", help="Sessão salva pelo app")
+        sp.add_argument("--report", help="Grava o relatório JSON neste arquivo (padrão: stdout)")
+
+    sp = sub.add_parser("audit", help="Auditoria completa (glossário, tags, ortografia, gramática)")
+    common(sp)
+    sp.add_argument("-g", "--glossary", help="Glossário JSON")
+    sp.add_argument("-j", "--jobs", type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    sp.add_argument("--no-spell", action="store_true"); sp.add_argument("--no-tags", action="store_true")
+    sp.add_argument("--no-grammar", action="store_true")
+    sp.add_argument("--strict", action="store_true", help="Código de saída 1 se houver alertas")
+    sp.set_defaults(func=cmd_audit)
+
+    sp = sub.add_parser("import", help="Aplica traduções e grava uma sessão para o app")
+    common(sp)
+    sp.add_argument("--session-out", required=True, help="Arquivo de sessão de saída")
+    sp.set_defaults(func=cmd_import)
+
+    sp = sub.add_parser("merge", help="Aplica traduções e grava o arquivo final")
+    common(sp)
+    sp.add_argument("-o", "--output", required=True)
+    sp.set_defaults(func=cmd_write)
+
+    sp = sub.add_parser("export", help="Exporta linhas selecionadas ([id] + string data)")
+    common(sp)
+    sp.add_argument("--ids", help="Lista de IDs, ex.: 0-10,42")
+    sp.add_argument("--modified", action="store_true", help="Só linhas diferentes do original")
+    sp.add_argument("-o", "--output", required=True)
+    sp.set_defaults(func=cmd_export)
+
+    sp = sub.add_parser("save", help="Grava o arquivo final a partir de uma sessão")
+    common(sp, translations=False)
+    sp.add_argument("-o", "--output", required=True)
+    sp.set_defaults(func=cmd_write)
+
+    sp = sub.add_parser("build-dict", help="Compila o dicionário ortográfico (arquivo mapeável)")
+    sp.add_argument("-o", "--output", default=SPELL_DICT_FILE, help=f"Arquivo de saída (padrão: {SPELL_DICT_FILE})")
+    sp.add_argument("--force", action="store_true", help="Compila mesmo se estiver atualizado")
+    sp.add_argument("--report", help="Grava o relatório JSON neste arquivo (padrão: stdout)")
+    sp.set_defaults(func=cmd_build_dict)
+    return p
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "save" and not args.session: raise SystemExit("save: informe --session")
+    if args.command == "merge" and not args.translation: raise SystemExit("merge: informe ao menos um -t")
+    t0 = time.perf_counter()
+    report, code = args.func(args)
+    report["command"] = args.command
+    report["total_elapsed"] = time.perf_counter() - t0
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f: f.write(text)
+    else: print(text)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,46 @@ def remove_accents(input_str):
     nfkd_form = unicodedata.normalize('NFKD', input_str)
     return "".join([c for c in nfkd_form if not unicodedata.combining(c)])
 
+# --- Editor ---
+EDIT_DEBOUNCE_MS = 150  # Pausa na digitação antes de revalidar a linha
+AUDIT_IDLE_MS = 1000    # Pausa maior antes da auditoria completa da linha (glossário, tags, ícone da lista)
+
+# --- Ortografia ---
+# Dicionário compilado (mmap), refeito quando o pt_BR.json.gz ou a whitelist mudam
+SPELL_DICT_FILE = "ena_spell.dict"
+
+# --- Monitor de desempenho ---
+# Com ENA_PERF=1 os handlers principais são cronometrados e Ctrl+Shift+P mostra o painel
+PERF_MONITOR = os.environ.get("ENA_PERF", "") not in ("", "0")
+PERF_SAMPLES = 1000    # Últimas medidas por handler usadas no p50/p95
+PERF_LAG_MS = 100      # Intervalo do pulso que mede o atraso do loop do Tk
+
+# --- Abertura ---
+# Com ENA_STARTUP_REPORT=1 o tempo de cada etapa da abertura é impresso no stderr
+STARTUP_REPORT = os.environ.get("ENA_STARTUP_REPORT", "") not in ("", "0")
+
+# --- Sessão automática (snapshot + diário) ---
+JOURNAL_FLUSH_MS = 3000          # Intervalo entre gravações do diário
+JOURNAL_COMPACT_RECORDS = 5000   # Registros no diário antes de gerar um novo snapshot
+JOURNAL_COMPACT_ROWS = 2000      # Linhas alteradas de uma vez (importação) que já justificam um snapshot
+
+# --- Histórico de versões ---
+HISTORY_MAX_VERSIONS = 50             # Versões guardadas por linha
+HISTORY_KEYFRAME = 10                 # A cada N versões uma é guardada inteira (o resto é diferença)
+HISTORY_BUDGET = 32 * 1024 * 1024     # Bytes (estimados) para o histórico de todas as linhas
+SESSION_LOG_SIZE = 5000               # Entradas do Log Global (as mais antigas são descartadas)
+
+# --- Modo Espião (varredura de tradução automática) ---
+SCAN_WORKERS = 4      # Threads simultâneas
+SCAN_RATE = 5.0       # Requisições por segundo permitidas pelo provedor
+SCAN_BURST = 10       # Rajada máxima acumulada pelo limitador
+SCAN_RETRIES = 3      # Retentativas por texto
+SCAN_BACKOFF = 0.5    # Espera inicial (s) entre retentativas; dobra a cada falha
+MT_WORKERS = 2        # Threads do painel de tradução do editor
+MT_PREFETCH = 5       # Linhas seguintes (ordem da lista) traduzidas antecipadamente
+# Provedor: "google" (deep_translator) ou "local" (simulado, para testes/benchmarks offline)
+MT_PROVIDER = os.environ.get("ENA_MT_PROVIDER", "google")
+
 DARK_THEME = {
     "mode": "dark", "bg_root": "#1e1e1e", "bg_ribbon": "#252526", "bg_list": "#191919",
     "bg_editor": "#2b2b2b", "bg_readonly": "#191919",
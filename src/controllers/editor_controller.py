@@ -1,10 +1,16 @@
 import re
-import tkinter as tk
+import time
 import threading
+import tkinter as tk
 from tkinter import Toplevel, ttk, Menu
 from datetime import datetime
 from ..gui.windows import FindReplaceDialog
-from ..logic.backend import MT_AVAILABLE
+from ..logic.mt_scheduler import MTScheduler
+from ..logic.find_replace import FindReplaceEngine
+from ..logic.tokenizer import tokenize, ena_ranges, TAG
+from ..gui.tag_renderer import TagRenderer
+from ..config import MT_PREFETCH, EDIT_DEBOUNCE_MS, AUDIT_IDLE_MS
+from ..logic.perf import PERF, timed
 
 class EditorController:
     """
@@ -23,7 +29,25 @@ class EditorController:
         # Variáveis para o sistema de sugestão (Tooltip) ao passar o mouse
         self.tooltip = None
         self.hover_sug = None
+        self._hover = None  # (ini, fim, palavra, x, y) da palavra sob o mouse
+        
+        # Sugestões ortográficas calculadas fora da thread do Tk (a distância 2 leva ~1 s)
+        self._suggestions = {}      # palavra (minúsculas) -> candidatos ([] = nenhum)
+        self._suggest_lock = threading.Lock()
+        self._suggest_next = None   # (palavra, on_ready) esperando o worker; só o pedido mais novo fica
+        self._suggest_running = None
+        
+        # Tradução automática do painel (um pedido por vez + prefetch das próximas linhas)
+        self.mt_scheduler = MTScheduler(self.app.translator_service)
+        
+        # Validação ao digitar (debounce) e latência tecla -> tela (no monitor de desempenho)
+        self._edit_job = None
+        self._audit_job = None  # Auditoria completa da linha, adiada até uma pausa maior
+        self._edit_started = None
+        self._validated_text = None
+        self._renderer = None
 
+    @timed()
     def on_select(self, event):
         """
         Chamado quando o usuário clica em uma linha na lista (Treeview).
@@ -32,12 +56,22 @@ class EditorController:
         sel = self.app.tree.selection()
         if not sel: return
 
+        # A lista virtual reaplica a seleção ao rolar; se a linha já está no editor, não recarrega
+        idx = int(sel[0])
+        if event is not None and idx == self.app.current_index and idx == self.app.vtree.selected: return
+
+        # Validação pendente da linha anterior: o texto já está no modelo, falta o ícone da lista
+        if (self._edit_job or self._audit_job) and self.app.current_index is not None:
+            self._cancel_pending_edit()
+            self.update_tree_row(self.app.current_index)
+        
         # 1. Salva um snapshot da linha ANTERIOR no histórico antes de mudar
+        self.app.load_session_sections("history")
         if self.app.last_selected_id is not None: 
             self._add_history_snapshot(self.app.last_selected_id)
         
         # 2. Identifica a nova linha selecionada
-        idx = int(sel[0])
+        self.app.vtree.selected = idx
         self.app.current_index = idx
         self.app.last_selected_id = idx
         data = self.app.translations[idx]
@@ -61,7 +95,7 @@ class EditorController:
         self.app.txt_translation.edit_reset() # Reseta a pilha de undo/redo do Tkinter
         
         # 7. Mostra ou esconde o botão de histórico se houver versões anteriores
-        if len(data.get("history", [])) > 1:
+        if self.app.translations.history_count(idx) > 1:
             self.app.btn_history.pack(side="left", padx=10)
         else:
             self.app.btn_history.pack_forget()
@@ -71,97 +105,183 @@ class EditorController:
             self.fetch_mt_translation()
             
         # 9. Aplica cores (sintaxe) e verifica erros
+        self._validated_text = data["translated"]
         self.highlight_syntax()
         self.check_line_status()
 
+    @timed()
     def on_edit_text(self, event):
         """
         Chamado a cada tecla digitada na caixa de tradução.
-        Salva o texto na memória e atualiza validações em tempo real.
+        Salva o texto na memória na hora; a validação espera uma pausa na digitação
+        (EDIT_DEBOUNCE_MS) e só reverifica as palavras em volta do trecho alterado.
+        Chamadas internas (event=None) validam a linha inteira imediatamente.
         """
         if self.app.current_index is None: return
         
         # Pega todo o texto da caixa (o -1c remove o \n automático final do Tkinter)
         txt = self.app.txt_translation.get("1.0", "end-1c")
+        data = self.app.translations[self.app.current_index]
+        
+        # Tecla sem efeito no texto (setas, Shift, Ctrl...): nada a fazer
+        if event is not None and data["translated"] == txt: return
         
-        # Se houve mudança real, marca o projeto como "Não Salvo" (*)
-        if self.app.translations[self.app.current_index]["translated"] != txt: 
+        # Se houve mudança real, marca o projeto como "Não Salvo" (*) e atualiza os dados e o índice de busca
+        if data["translated"] != txt: 
             self.app.mark_unsaved()
-            
-        # Atualiza o dicionário de dados principal
-        self.app.translations[self.app.current_index]["translated"] = txt
+            self.app.touch_row(self.app.current_index)
+            data["translated"] = txt
+            self.app.text_index.update(self.app.current_index)
+        
+        if event is None:
+            self._cancel_pending_edit()
+            self._validated_text = None
+            self._flush_edit()
+            return
+        
+        if self._edit_started is None: self._edit_started = time.perf_counter()
+        if self._edit_job: self.app.root.after_cancel(self._edit_job)
+        self._edit_job = self.app.root.after(EDIT_DEBOUNCE_MS, self._flush_edit)
+
+    def _cancel_pending_edit(self):
+        if self._edit_job:
+            self.app.root.after_cancel(self._edit_job)
+            self._edit_job = None
+        if self._audit_job:
+            self.app.root.after_cancel(self._audit_job)
+            self._audit_job = None
+        self._edit_started = None
+
+    @timed()
+    def _flush_edit(self):
+        """
+        Valida o que foi digitado desde a última validação. Durante a digitação só as palavras
+        em volta do trecho alterado; a auditoria completa e o ícone da lista esperam AUDIT_IDLE_MS.
+        """
+        self._edit_job = None
+        idx = self.app.current_index
+        if idx is None: return
+        text = self.app.translations[idx]["translated"]
+        old, self._validated_text = self._validated_text, text
         
         # Revalida sintaxe e erros
         self.highlight_syntax()
+        if old is None: self._full_audit()
+        else:
+            self.check_line_status(self._changed_span(old, text))
+            if self._audit_job: self.app.root.after_cancel(self._audit_job)
+            self._audit_job = self.app.root.after(AUDIT_IDLE_MS, self._full_audit)
+        if self._edit_started is not None:
+            # Callbacks ociosos rodam em ordem: este vem depois do redesenho pedido acima
+            if PERF.enabled: self.app.root.after_idle(self._record_latency, self._edit_started)
+            self._edit_started = None
+
+    @staticmethod
+    def _record_latency(started):
+        PERF.record("Editor.keystroke_to_render", time.perf_counter() - started)
+
+    def _full_audit(self):
+        """Auditoria completa da linha aberta (glossário, tags, alerta) e ícone na árvore lateral."""
+        self._audit_job = None
+        idx = self.app.current_index
+        if idx is None: return
         self.check_line_status()
-        
         # Atualiza o ícone na árvore lateral (ex: mudar para lápis verde)
-        self.update_tree_row(self.app.current_index)
+        self.update_tree_row(idx)
+
+    @staticmethod
+    def _changed_span(old, new):
+        """Trecho [ini, fim) de 'new' que difere de 'old' (prefixo e sufixo comuns descartados)."""
+        n = min(len(old), len(new))
+        p = 0
+        while p < n and old[p] == new[p]: p += 1
+        s = 0
+        while s < n - p and old[-1 - s] == new[-1 - s]: s += 1
+        return p, len(new) - s
 
     def update_tree_row(self, idx):
         """
         Atualiza visualmente apenas uma linha específica na árvore lateral.
         Evita ter que recarregar toda a lista (populate_tree) para ganhar performance.
         """
-        tags = self.app.tree_ctrl.get_row_tags(idx)
-        text = self.app.translations[idx]["translated"]
-        
-        # Cria um preview limpo (sem tags HTML)
-        clean = re.sub(r'<.*?>', '', text)[:60]
-        
-        is_mod = 'modified' in tags
-        disp = f"✎ {clean}" if is_mod else clean
-        if 'mt_match' in tags: disp = f"🤖 {clean}"
-        
-        # Define o ícone de status
-        icon = ""
-        if 'alert' in tags: icon = "⚠️"
-        elif 'glossary_issue' in tags: icon = "📖"
-        
-        # Aplica na árvore
-        self.app.tree.item(idx, values=(idx, disp, icon), tags=tags)
+        self.app.vtree.refresh_row(idx)
 
     def highlight_syntax(self):
         """
         Aplica cores (tags do Text widget) em elementos especiais como HTML e keywords.
         """
-        # Limpa formatações anteriores
-        self.app.txt_translation.tag_remove("tag_xml", "1.0", "end")
-        self.app.txt_translation.tag_remove("tag_ena", "1.0", "end")
+        r = self.renderer
+        if not self.app.show_tags.get():
+            r.clear("tag_xml"); r.clear("tag_ena")
+            return
         
-        if not self.app.show_tags.get(): return
-        
-        txt = self.app.txt_translation.get("1.0", "end")
+        text = self.app.txt_translation.get("1.0", "end-1c")
+        spans = tokenize(text)
         
         # Colore tags HTML/XML (ex: <br>, <b>)
-        for m in re.finditer(r'<[^>]+>', txt):
-            self.app.txt_translation.tag_add("tag_xml", f"1.0+{m.start()}c", f"1.0+{m.end()}c")
+        r.render("tag_xml", [(s, e) for kind, s, e, _ in spans if kind == TAG], text)
         
         # Colore palavras reservadas do jogo
-        for m in re.finditer(r'\b(ENASales|ENAMean|Whisper|Hint)\b', txt):
-             self.app.txt_translation.tag_add("tag_ena", f"1.0+{m.start()}c", f"1.0+{m.end()}c")
+        r.render("tag_ena", list(ena_ranges(spans)), text)
+
+    @property
+    def renderer(self):
+        """TagRenderer da caixa de tradução (criado depois do setup_ui)."""
+        if self._renderer is None: self._renderer = TagRenderer(self.app.txt_translation)
+        return self._renderer
 
-    def check_line_status(self):
+    @timed()
+    def check_line_status(self, span=None):
         """
         Validação principal. Verifica Glossário, Tags, Ortografia e Gramática.
         Controla o sublinhado vermelho e a mensagem de alerta.
+        span=(ini, fim): trecho editado; só a ortografia das palavras em volta dele e a gramática
+        são refeitas (o Text desloca sozinho os sublinhados do resto da linha). Glossário, tags e
+        o alerta ficam como estão até a auditoria completa (ver _flush_edit).
+        Os sublinhados passam pelo TagRenderer, que só envia ao Tk o que mudou.
         """
-        # Reseta alertas
-        self.app.lbl_tag_alert.config(text="")
-        self.app.lbl_tag_alert.pack_forget()
-        
-        # Limpa sublinhados de erro
-        for t in ["misspelled", "grammar_error", "tag_error", "glossary_case_error"]: 
-            self.app.txt_translation.tag_remove(t, "1.0", "end")
+        r = self.renderer
+        ignored = self.app.current_index is None or self.app.var_ignore_error.get()
+        if span is None or ignored:
+            # Reseta alertas
+            self.app.lbl_tag_alert.config(text="")
+            self.app.lbl_tag_alert.pack_forget()
+            
+            # Marcações que nenhuma validação usa hoje
+            r.clear("tag_error"); r.clear("glossary_case_error")
 
         # Se não há seleção ou se o usuário "Perdoou" a linha, não valida
-        if self.app.current_index is None or self.app.var_ignore_error.get(): return
-        
-        data = self.app.translations[self.app.current_index]
-        orig, text = data["original"], data["translated"]
+        if ignored:
+            r.clear("misspelled"); r.clear("grammar_error")
+            return
         
+        text = self.app.translations[self.app.current_index]["translated"]
+        # 1-2. Glossário e Tags: só na auditoria completa
+        if span is None: self._show_alert(self.audit_row(self.app.current_index))
+
+        # 3. Validação Ortográfica (Sublinhado)
+        if self.app.show_spell.get():
+            # Palavras desconhecidas já com posição (tags e seu conteúdo ficam de fora)
+            # Com span, só as palavras em volta do trecho editado
+            window = self._token_window(text, *span) if span is not None else None
+            marks = self.app.audit_manager.misspelled_spans(text, window)
+            r.render("misspelled", [(s, e) for s, e, _ in marks], text, window)
+        else: r.clear("misspelled")
+
+        # 4. Validação Gramatical (Espaços e Pontuação)
+        if self.app.show_grammar.get():
+            # Espaços duplos / Pontuação sem espaço depois (ex: Olá.Tudo bem)
+            marks = []
+            for kind, s, e in self.app.audit_manager.grammar_marks(text):
+                if kind == "double_space": marks.append((s, e))
+                elif kind == "missing_space": marks.append((s, e + 1))
+            r.render("grammar_error", marks, text)
+        else: r.clear("grammar_error")
+
+    def _show_alert(self, res):
+        """Mensagem de alerta acima da caixa de texto (glossário, depois tags)."""
         # 1. Validação de Glossário (Prioridade Alta)
-        errs = self.app.audit_manager.validate_glossary(orig, text)
+        errs = res.glossary
         msg_show = ""
         color_show = ""
         
@@ -170,8 +290,8 @@ class EditorController:
             color_show = self.app.current_theme.get("glossary_warn", "orange")
         
         # 2. Validação de Tags HTML (Prioridade Alta)
-        elif self.app.show_tags.get():
-            msg, k = self.app.audit_manager.validate_tags(orig, text)
+        elif res.tags:
+            msg, k = res.tags
             if k != "tag_ok": 
                 msg_show = msg
                 color_show = self.app.current_theme.get("tag_err", "red") if k == "tag_err" else "orange"
@@ -181,64 +301,82 @@ class EditorController:
             self.app.lbl_tag_alert.config(text=msg_show, fg=color_show)
             self.app.lbl_tag_alert.pack(anchor="w", pady=(0, 2), before=self.app.txt_translation)
 
-        # 3. Validação Ortográfica (Sublinhado)
-        if self.app.show_spell.get():
-            # Cria lista de intervalos protegidos (tags HTML) para não corrigir código
-            protected = [(m.start(), m.end()) for m in re.finditer(r'<[^>]+>', text)]
-            
-            unks = self.app.audit_manager.check_spelling(text)
-            if unks:
-                for w in unks:
-                    # Encontra todas as ocorrências da palavra errada
-                    for m in re.finditer(r'\b'+re.escape(w)+r'\b', text):
-                        s, e = m.start(), m.end()
-                        # Só marca se não estiver dentro de uma tag HTML
-                        if not any(ps <= s and e <= pe for ps, pe in protected):
-                            self.app.txt_translation.tag_add("misspelled", f"1.0+{s}c", f"1.0+{e}c")
-
-        # 4. Validação Gramatical (Espaços e Pontuação)
-        if self.app.show_grammar.get():
-             # Espaços duplos
-             for m in re.finditer(r' {2,}', text):
-                 self.app.txt_translation.tag_add("grammar_error", f"1.0+{m.start()}c", f"1.0+{m.end()}c")
-             # Pontuação sem espaço depois (ex: Olá.Tudo bem)
-             for m in re.finditer(r'[\.,;:\?!](?!\s|$|\d|\.)\w', text):
-                 self.app.txt_translation.tag_add("grammar_error", f"1.0+{m.start()}c", f"1.0+{m.end()+1}c")
-
-    def has_errors(self, text, orig):
-        """Helper simples que retorna True se a linha tem qualquer tipo de erro."""
-        return (self.app.audit_manager.validate_glossary(orig, text) or 
-                (self.app.show_tags.get() and self.app.audit_manager.validate_tags(orig, text)[1] != "tag_ok") or
-                (self.app.show_spell.get() and self.app.audit_manager.check_spelling(text)) or
-                (self.app.show_grammar.get() and self.app.audit_manager.check_grammar_issues(text, orig)))
+    @staticmethod
+    def _token_window(text, start, end):
+        """Expande [start, end) até os limites dos trechos (palavras/tags) que ele toca."""
+        lo, hi = start, end
+        for _, s, e, _ in tokenize(text):
+            if e < start: continue
+            if s > end: break
+            lo, hi = min(lo, s), max(hi, e)
+        return lo, hi
+
+    def audit_checks(self):
+        """Validações ativas na interface: (tags, ortografia, gramática)."""
+        return (self.app.show_tags.get(), self.app.show_spell.get(), self.app.show_grammar.get())
+
+    def audit_row(self, idx, checks=None):
+        """Resultado (em cache) da auditoria de uma linha. Ver AuditManager.audit_row."""
+        data = self.app.translations[idx]
+        return self.app.audit_manager.audit_row(idx, data["original"], data["translated"], checks or self.audit_checks())
 
     def fetch_mt_translation(self):
-        """Inicia a tradução automática em uma thread separada (background)."""
-        if not MT_AVAILABLE or not self.app.show_mt.get(): return
-        if self.app.current_index is None: return
+        """
+        Mostra a tradução automática da linha aberta. Usa o cache (da linha ou em disco);
+        senão pede ao MTScheduler, que descarta pedidos de linhas já abandonadas.
+        Em seguida pede as próximas linhas da lista em segundo plano.
+        """
+        if not self.app.translator_service.available or not self.app.show_mt.get(): return
+        idx = self.app.current_index
+        if idx is None: return
+        self.app.load_session_sections("mt")
         
         # Limpa tags para enviar apenas o texto puro para o Google
-        orig = re.sub(r'<[^>]+>', '', self.app.translations[self.app.current_index]["original"])
+        orig = re.sub(r'<[^>]+>', '', self.app.translations[idx]["original"])
+        hit = self.app.translations[idx].get("mt_cache") or self.app.translator_service.cached(orig)
+        if hit: self._update_mt_box(hit, idx)
+        else:
+            self._update_mt_box("Traduzindo...", idx)
+            self.mt_scheduler.request(idx, orig, self._on_mt_result)
+        self._prefetch_mt(idx)
+
+    def _prefetch_mt(self, idx):
+        """Agenda as próximas MT_PREFETCH linhas (na ordem da lista filtrada) sem sugestão."""
+        vt = self.app.vtree
+        pos = vt.position(idx)
+        items = []
+        if pos is not None:
+            for nxt in vt.ids[pos + 1:pos + 1 + MT_PREFETCH]:
+                data = self.app.translations.get(nxt)
+                if data and not data.get("mt_cache"): items.append((nxt, re.sub(r'<[^>]+>', '', data["original"])))
+        self.mt_scheduler.prefetch(items, self._on_mt_result)
+
+    def _on_mt_result(self, idx, orig, text, error):
+        # Thread de trabalho: agenda a atualização da UI para a thread principal
+        res = text if text else f"Erro: {error or 'sem resposta'}"
+        self.app.root.after(0, lambda: self._update_mt_box(res, idx, orig))
+
+    def _update_mt_box(self, text, idx=None, orig=None):
+        """
+        Guarda a tradução na linha idx (a que fez o pedido) e só atualiza a caixa
+        do tradutor se essa linha ainda for a aberta no editor.
+        """
+        self.app.load_session_sections("mt")
+        data = self.app.translations.get(idx) if idx is not None else None
+        # Resposta de um arquivo que já foi fechado/trocado
+        if data is not None and orig is not None and re.sub(r'<[^>]+>', '', data["original"]) != orig: return
+        
+        # Salva em cache para o Modo Espião não precisar traduzir de novo
+        if data is not None and "Traduzindo..." not in text and not text.startswith("Erro") \
+                and data.get("mt_cache") != text.strip():
+            data["mt_cache"] = text.strip()
+            self.app.touch_row(idx)
+        if idx is not None and idx != self.app.current_index: return
         
-        def task():
-            try: res = self.app.translator_service.translate(orig)
-            except Exception as e: res = f"Erro: {str(e)}"
-            # Agenda a atualização da UI para a thread principal
-            self.app.root.after(0, lambda: self._update_mt_box(res))
-            
-        self._update_mt_box("Traduzindo...")
-        threading.Thread(target=task, daemon=True).start()
-
-    def _update_mt_box(self, text):
-        """Atualiza a caixa de texto do tradutor (Machine Translation)."""
         self.app.txt_mt.config(state="normal")
         self.app.txt_mt.delete("1.0", "end")
         self.app.txt_mt.insert("1.0", text)
         self.app.txt_mt.config(state="disabled")
-        
-        # Salva em cache para o Modo Espião não precisar traduzir de novo
-        if self.app.current_index is not None and "Traduzindo..." not in text and not text.startswith("Erro"): 
-            self.app.translations[self.app.current_index]["mt_cache"] = text.strip()
 
     def toggle_mt_view(self):
         """
@@ -279,23 +417,18 @@ class EditorController:
         # Evita salvar placeholders de loading
         if curr.strip().lower().startswith("line:"): return
 
-        hist = self.app.translations[idx].get("history", [])
-        
-        # Só salva se o texto mudou em relação ao último snapshot
-        if not hist or hist[-1]["text"] != curr:
-            t = datetime.now().strftime("%H:%M:%S")
-            hist.append({"time": t, "text": curr})
-            self.app.translations[idx]["history"] = hist
-            
-            if global_log and len(hist) > 1: 
-                self.app.session_log.append({"time": t, "id": idx, "text": curr})
-            
-            # Limita histórico por linha para economizar memória
-            if len(hist) > 50: hist.pop(0)
+        self.app.load_session_sections("history")
+        # Só salva se o texto mudou em relação à última versão (guardada como diferença; ver HistoryStore)
+        t = datetime.now().strftime("%H:%M:%S")
+        v = self.app.translations.add_version(idx, curr, t)
+        if v is None: return
+        self.app.touch_row(idx)
+        if global_log and v > 0: self.app.session_log.append(t, idx, v)
 
     def open_history_window(self):
         """Abre janela para ver versões anteriores da linha atual."""
         if self.app.current_index is None: return
+        self.app.load_session_sections("history")
         win = Toplevel(self.app.root)
         win.title(f"Histórico ID {self.app.current_index}")
         win.geometry("400x300")
@@ -305,14 +438,16 @@ class EditorController:
         tree.heading("txt", text="Texto"); tree.column("txt", width=300)
         tree.pack(fill="both", expand=True)
         
-        hist = self.app.translations[self.app.current_index].get("history", [])
-        for h in reversed(hist):
-            tree.insert("", "end", values=(h["time"], h["text"]))
+        idx = self.app.current_index
+        for v, t, text in reversed(self.app.translations.versions(idx)):
+            tree.insert("", "end", iid=str(v), values=(t, text))
             
         def restore():
             sel = tree.selection()
             if not sel: return
-            val = tree.item(sel[0])["values"][1]
+            # Reconstrói a versão pelo número (o texto exibido no Treeview pode vir alterado)
+            val = self.app.translations.version_text(idx, int(sel[0]))
+            if val is None or idx != self.app.current_index: return
             # Restaura o texto antigo
             self.app.txt_translation.delete("1.0", "end")
             self.app.txt_translation.insert("1.0", val)
@@ -331,8 +466,12 @@ class EditorController:
         tree.heading("txt", text="Texto"); tree.column("txt", width=400)
         tree.pack(fill="both", expand=True)
         
-        for l in reversed(self.app.session_log): 
-            tree.insert("", "end", values=(l["time"], l["id"], l["text"]))
+        # O log só guarda (hora, ID, nº da versão); o texto vem do histórico da linha
+        trans = self.app.translations
+        for l in reversed(self.app.session_log.entries()):
+            text = l.get("text")
+            if text is None: text = trans.version_text(l["id"], l["v"])
+            tree.insert("", "end", values=(l["time"], l["id"], "(versão descartada)" if text is None else text))
 
     def show_advanced_find(self):
         """Abre a janela de Localizar/Substituir."""
@@ -342,91 +481,130 @@ class EditorController:
         else:
             self.find_dialog = FindReplaceDialog(self.app.root, self, self.app.current_theme)
 
-    def find_next_action(self, v_find, v_case, v_whole):
-        """Lógica do botão 'Localizar Próximo'."""
+    def _find_setup(self, v_find, v_case, v_whole, v_regex=None):
+        """(motor, padrão compilado, termo literal) ou None se o termo está vazio/inválido."""
         pat_str = v_find.get()
-        if not pat_str: return
-        
-        flags = 0 if v_case.get() else re.IGNORECASE
-        pattern = re.escape(pat_str)
-        if v_whole.get(): pattern = r'\b' + pattern + r'\b'
-        
-        try: regex = re.compile(pattern, flags)
-        except: return
-
-        keys = list(self.app.translations.keys())
-        # Começa a busca logo após o índice atual
-        start = self.last_search_idx + 1
-        # Cria uma lista circular (do atual até o fim, depois do inicio até o atual)
-        order = keys[start:] + keys[:start]
-        
-        found = None
-        for idx in order:
-            if regex.search(self.app.translations[idx]["translated"]):
-                found = idx
-                break
-        
-        if found is not None:
-            self.last_search_idx = found
-            self.app.tree.selection_set(found)
-            self.app.tree.see(found)
-            self.on_select(None)
-            
-            # Seleciona o texto encontrado na caixa de edição
-            txt = self.app.translations[found]["translated"]
-            m = regex.search(txt)
-            if m:
-                self.app.txt_translation.tag_remove("sel", "1.0", "end")
-                self.app.txt_translation.tag_add("sel", f"1.0+{m.start()}c", f"1.0+{m.end()}c")
-                self.app.txt_translation.focus_set()
-
-    def replace_current(self, f, r, c, w):
+        if not pat_str: return None
+        regex = bool(v_regex and v_regex.get())
+        try: rx = FindReplaceEngine.compile(pat_str, v_case.get(), v_whole.get(), regex)
+        except re.error as e:
+            self.app.lbl_status.config(text=f"Regex inválida: {e}"); return None
+        engine = FindReplaceEngine(self.app.translations, self.app.text_index)
+        return engine, rx, (None if regex else pat_str)
+
+    def find_next_action(self, v_find, v_case, v_whole, v_regex=None):
+        """Lógica do botão 'Localizar Próximo' (só as linhas candidatas do índice são testadas)."""
+        setup = self._find_setup(v_find, v_case, v_whole, v_regex)
+        if not setup: return
+        engine, rx, literal = setup
+        # Começa a busca logo após a última ocorrência, dando a volta na lista
+        hit = engine.find_next(rx, self.last_search_idx, literal)
+        if hit is None:
+            self.app.lbl_status.config(text="Nenhuma ocorrência."); return
+        found, m = hit
+        self.last_search_idx = found
+        self.app.vtree.select(found)
+        self.on_select(None)
+        
+        # Seleciona o texto encontrado na caixa de edição
+        self.app.txt_translation.tag_remove("sel", "1.0", "end")
+        self.app.txt_translation.tag_add("sel", f"1.0+{m.start()}c", f"1.0+{m.end()}c")
+        self.app.txt_translation.focus_set()
+
+    def count_matches_action(self, v_find, v_case, v_whole, v_regex=None, v_replace=None):
+        """Prévia: quantas ocorrências/linhas seriam afetadas. Devolve o texto para a janela."""
+        setup = self._find_setup(v_find, v_case, v_whole, v_regex)
+        if not setup: return ""
+        engine, rx, literal = setup
+        repl = FindReplaceEngine.template(v_replace.get(), literal is None) if v_replace is not None else None
+        try: res = engine.preview(rx, repl, literal)
+        except re.error as e: return f"Substituição inválida: {e}"
+        return f"{res['matches']} ocorrências em {res['rows']} linhas"
+
+    def replace_current(self, f, r, c, w, x=None):
         """Substitui a ocorrência na linha atual."""
         if self.app.current_index is None: return
         curr = self.app.translations[self.app.current_index]["translated"]
-        
-        pat_str = f.get()
-        if not pat_str: return
-        
-        flags = 0 if c.get() else re.IGNORECASE
-        pattern = re.escape(pat_str)
-        if w.get(): pattern = r'\b' + pattern + r'\b'
-        
-        new_t = re.sub(pattern, r.get(), curr, count=1, flags=flags)
+        setup = self._find_setup(f, c, w, x)
+        if not setup: return
+        _, rx, literal = setup
+        try: new_t = rx.sub(FindReplaceEngine.template(r.get(), literal is None), curr, count=1)
+        except re.error as e:
+            self.app.lbl_status.config(text=f"Substituição inválida: {e}"); return
         
         if new_t != curr:
             self.app.txt_translation.delete("1.0", "end")
             self.app.txt_translation.insert("1.0", new_t)
             self.on_edit_text(None)
 
-    def replace_all(self, f, r, c, w):
-        """Substitui todas as ocorrências em TODAS as linhas."""
-        pat_str = f.get()
-        if not pat_str: return
-        
-        flags = 0 if c.get() else re.IGNORECASE
-        pattern = re.escape(pat_str)
-        if w.get(): pattern = r'\b' + pattern + r'\b'
-        regex = re.compile(pattern, flags)
-        
-        cnt = 0
-        for k, v in self.app.translations.items():
-            new_t = regex.sub(r.get(), v["translated"])
-            if new_t != v["translated"]:
-                self.app.translations[k]["translated"] = new_t
-                self._add_history_snapshot(k) # Salva histórico antes de alterar
-                cnt += 1
-        
-        if cnt:
-            self.app.tree_ctrl.populate_tree() # Atualiza a lista visual
-            if self.app.current_index is not None: self.on_select(None) # Recarrega linha atual
-            self.app.mark_unsaved()
-            tk.messagebox.showinfo("Substituir Tudo", f"{cnt} ocorrências substituídas.")
+    def replace_all(self, f, r, c, w, x=None):
+        """
+        Substitui todas as ocorrências em TODAS as linhas, como um lote: calcula tudo antes,
+        grava de uma vez e só reavalia na lista as linhas alteradas.
+        """
+        setup = self._find_setup(f, c, w, x)
+        if not setup: return
+        engine, rx, literal = setup
+        try: changes = engine.plan(rx, FindReplaceEngine.template(r.get(), literal is None), literal)
+        except re.error as e:
+            tk.messagebox.showerror("Substituir Tudo", f"Substituição inválida: {e}"); return
+        if not changes:
+            self.app.lbl_status.config(text="Nenhuma ocorrência."); return
+        
+        # A linha aberta tem edição pendente no widget; o lote parte do modelo já atualizado
+        if self._edit_job: self._cancel_pending_edit()
+        ids = engine.apply(changes)
+        self.app.load_session_sections("history")
+        for k in ids: self._add_history_snapshot(k) # Nova versão no histórico de cada linha
+        cnt = sum(n for idx, _, _, n in changes)
+        
+        self.app.tree_ctrl.refilter_rows(ids) # Só as linhas alteradas entram/saem da lista
+        if self.app.current_index in ids: self._reload_current()
+        self.app.mark_unsaved()
+        tk.messagebox.showinfo("Substituir Tudo", f"{cnt} ocorrências substituídas em {len(ids)} linhas.")
+
+    def _reload_current(self):
+        """Recarrega a linha aberta depois de uma alteração feita fora do editor."""
+        idx = self.app.current_index
+        self.app.txt_translation.delete("1.0", "end")
+        self.app.txt_translation.insert("1.0", self.app.translations[idx]["translated"])
+        self._validated_text = None
+        self._flush_edit()
+
+    def suggestions(self, word, on_ready=None):
+        """
+        Correções para 'word' já calculadas (lista, vazia se não há), ou None se ainda não.
+        Nesse caso o cálculo vai para uma thread de fundo e on_ready(palavra) é chamado na
+        thread do Tk quando terminar.
+        """
+        key = word.lower()
+        if key in self._suggestions: return self._suggestions[key]
+        with self._suggest_lock:
+            if key == self._suggest_running and on_ready is None: return None
+            start = self._suggest_running is None and self._suggest_next is None
+            self._suggest_next = (key, on_ready)
+        if start: threading.Thread(target=self._suggest_worker, args=(self.app.audit_manager.spell,), daemon=True).start()
+        return None
+
+    def _suggest_worker(self, spell):
+        while True:
+            with self._suggest_lock:
+                req, self._suggest_next = self._suggest_next, None
+                self._suggest_running = req[0] if req else None
+                if req is None: return
+            word, on_ready = req
+            cands = spell.candidates(word) or []
+            self.app.root.after(0, self._on_suggestions, word, cands, on_ready)
+
+    def _on_suggestions(self, word, cands, on_ready):
+        if len(self._suggestions) >= 512: self._suggestions.clear()
+        self._suggestions[word] = cands
+        if on_ready: on_ready(word)
 
     def on_text_motion(self, event):
         """
         Detecta se o mouse está sobre uma palavra marcada como erro ortográfico.
-        Se sim, mostra um tooltip com a sugestão.
+        Se sim, mostra um tooltip com a sugestão (assim que ela estiver calculada).
         """
         if not self.app.show_spell.get(): return
         try:
@@ -435,16 +613,31 @@ class EditorController:
             tags = self.app.txt_translation.tag_names(idx)
             
             if "misspelled" in tags and self.app.audit_manager.spell:
-                word = self.app.txt_translation.get(idx + " wordstart", idx + " wordend")
-                cands = self.app.audit_manager.spell.candidates(word)
-                if cands:
-                    cand = list(cands)[0]
-                    self.show_tooltip(f"Sugestão: {cand} (TAB)", event.x_root, event.y_root)
-                    self.hover_sug = (idx + " wordstart", idx + " wordend", cand)
-                    return
+                # O sublinhado cobre exatamente a palavra do tokenizador (inclusive com hífen)
+                ws, we = self.app.txt_translation.tag_prevrange("misspelled", idx + "+1c")
+                word = self.app.txt_translation.get(ws, we)
+                if self._hover and self._hover[:3] == (ws, we, word): return  # Mesma palavra: tooltip já mostrado ou a caminho
+                self._hover = (ws, we, word, event.x_root, event.y_root)
+                if self._show_suggestion() is not False: return
         except: pass
         self.hide_tooltip()
 
+    def _show_suggestion(self, word=None):
+        """Tooltip da palavra sob o mouse; False se ela não tem sugestão (None se ainda calculando)."""
+        if not self._hover or (word is not None and self._hover[2].lower() != word): return False
+        ws, we, w, x, y = self._hover
+        if self.app.txt_translation.get(ws, we) != w: return False  # Texto mudou enquanto calculava
+        cands = self.suggestions(w, self._show_suggestion)
+        if cands is None:
+            # Tooltip de outra palavra sai, mas _hover fica para o on_ready
+            if self.tooltip: self.tooltip.destroy(); self.tooltip = None
+            self.hover_sug = None
+            return None
+        if not cands: return False
+        self.show_tooltip(f"Sugestão: {cands[0]} (TAB)", x, y)
+        self.hover_sug = (ws, we, cands[0])
+        return True
+
     def show_tooltip(self, text, x, y):
         """Exibe uma pequena janela flutuante com texto."""
         if self.tooltip: self.tooltip.destroy()
@@ -456,6 +649,7 @@ class EditorController:
     def hide_tooltip(self, e=None):
         if self.tooltip: self.tooltip.destroy(); self.tooltip = None
         self.hover_sug = None
+        self._hover = None
 
     def on_tab_pressed(self, event):
         """Se houver uma sugestão de correção ativa (hover), a tecla TAB aplica a correção."""
@@ -480,8 +674,11 @@ class EditorController:
             m = Menu(self.app.root, tearoff=0)
             
             if self.app.show_spell.get() and self.app.audit_manager.spell:
-                cands = self.app.audit_manager.spell.candidates(word)
-                if cands:
+                cands = self.suggestions(word)
+                if cands is None:
+                    m.add_command(label="Buscando sugestões…", state="disabled")
+                    m.add_separator()
+                elif cands:
                     # Adiciona as 5 melhores sugestões
                     for c in list(cands)[:5]:
                         m.add_command(label=c, command=lambda val=c: self._apply_fix(val, idx))
@@ -502,7 +699,8 @@ class EditorController:
     def add_to_dict(self, word):
         """Adiciona a palavra ao dicionário em memória para parar de marcar como erro."""
         if self.app.audit_manager.spell:
-            self.app.audit_manager.spell.word_frequency.load_words([word])
+            self.app.audit_manager.add_words([word])
+            self._suggestions.clear()
             self.refresh_audit_view()
 
     def refresh_audit_view(self):
@@ -514,6 +712,7 @@ class EditorController:
         """Chamado quando o usuário clica no checkbox 'Ignorar Erros'."""
         if self.app.current_index is not None:
             self.app.translations[self.app.current_index]["ignore_errors"] = self.app.var_ignore_error.get()
+            self.app.touch_row(self.app.current_index)
             self.check_line_status()
             self.update_tree_row(self.app.current_index)
 
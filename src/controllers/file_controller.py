@@ -1,14 +1,21 @@
 import os
 import re
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, Toplevel, Label, Entry, Button, Frame, ttk
 from ..logic.backend import FileManager
+from ..logic.save_engine import SaveEngine
+from ..logic.row_store import RowStore
+from ..logic.history_store import SessionLog
+from ..logic.perf import timed
 
 class FileController:
     def __init__(self, app):
         self.app = app
+        self.saving = False
 
     def load_base_file(self):
+        if self.saving: messagebox.showwarning("Aguarde", "Salvamento em andamento."); return
         if self.app.translations and self.app.unsaved_changes:
             ans = messagebox.askyesnocancel("Fechar Trabalho", "Salvar sessão antes de carregar nova base?")
             if ans is None: return
@@ -18,58 +25,73 @@ class FileController:
         if not filename: return
 
         try:
-            with open(filename, 'r', encoding='utf-8') as f: lines = f.readlines()
-            new_parsed = FileManager.parse_file_to_dict(lines)
+            index = FileManager.index_base_file(filename)
         except Exception as e:
             messagebox.showerror("Erro de Leitura", f"Não foi possível ler o arquivo:\n{str(e)}"); return
 
         keep = False
         if self.app.translations:
             ans = messagebox.askyesnocancel("Nova Base", "Manter traduções atuais?")
-            if ans is None: return
+            if ans is None: index.close(); return
             keep = ans
 
         self.app.base_filepath = filename
-        self.app.base_lines = lines
-        new_dict = {}
-        for idx, item in new_parsed.items():
-            entry = {"original": item["text"], "translated": item["text"], "has_quotes": item["quotes"], 
-                     "mt_cache": None, "original_line": item["original_line"], 
-                     "history": [{"time": "Original", "text": item["text"]}], "source_file": None, "ignore_errors": False}
-            if keep and idx in self.app.translations:
-                old = self.app.translations[idx]
-                entry.update({"translated": old["translated"], "history": old.get("history", []), 
-                              "source_file": old.get("source_file"), "ignore_errors": old.get("ignore_errors", False), 
-                              "mt_cache": old.get("mt_cache")})
-            new_dict[idx] = entry
+        if self.app.base_index: self.app.base_index.close()
+        self.app.base_index = index
+        if keep: self.app.load_session_sections()
+        new_dict = FileManager.build_translations(index, self.app.translations if keep else None)
         
         self.app.translations = new_dict
+        self.app.text_index.rebuild(new_dict)
+        self.app.vtree.reset()
         self.app.tree_ctrl.populate_tree()
         self.app.lbl_status.config(text=f"Base: {len(new_dict)} linhas")
         self.app.lbl_orig.config(text=f"Original: {os.path.basename(filename)}")
         for b in [self.app.btn_import_trans, self.app.btn_import_partial, self.app.btn_export_mod]: b.config(state="normal")
         if keep: self.app.mark_unsaved()
         else: self.app.mark_saved()
+        self.app.save_auto_session(compact=True)  # Nova base: o diário recomeça de um snapshot
 
     def save_file(self, event=None):
-        if not self.app.base_lines: return
+        if not self.app.base_index or self.saving: return
         if self.app.current_index is not None: self.app.editor_ctrl._add_history_snapshot(self.app.current_index)
         save_path = filedialog.asksaveasfilename(defaultextension=".txt", title="Salvar Arquivo")
-        if not save_path: return
-        try:
-            new_lines = self.app.base_lines[:]
-            pat = re.compile(r'^(.*1 string data = )(.*)$')
-            for idx, data in self.app.translations.items():
-                line_idx = data["original_line"]
-                if line_idx < len(new_lines):
-                    m = pat.match(new_lines[line_idx])
-                    if m:
-                        content = f'"{data["translated"]}"' if data["has_quotes"] else data["translated"]
-                        new_lines[line_idx] = m.group(1) + content + "\n"
-            with open(save_path, 'w', encoding='utf-8') as f: f.writelines(new_lines)
-            self.app.mark_saved()
-            messagebox.showinfo("Sucesso", "Arquivo salvo!")
-        except Exception as e: messagebox.showerror("Erro", str(e))
+        if save_path: self._start_save(save_path)
+
+    @timed("FileController.save_file")
+    def _start_save(self, save_path):
+        """Separado de save_file para o monitor de desempenho medir sem o tempo do diálogo."""
+        # Captura o estado na thread do Tk; a escrita roda em background
+        rows = SaveEngine.snapshot_rows(self.app.translations)
+        index, generation = self.app.base_index, self.app.edit_generation
+        self.saving = True
+        self.app.lbl_status.config(text="Salvando...")
+
+        def task():
+            res, err = None, None
+            try: res = SaveEngine.save(index, rows, save_path)
+            except Exception as e: err = e
+            new_index = None
+            if index.buffer is None:  # Base sobrescrita: reindexa o arquivo novo
+                try: new_index = FileManager.index_base_file(index.filepath)
+                except Exception as e: err = err or e
+            self.app.root.after(0, lambda: self._finish_save(res, err, index, new_index, generation))
+        threading.Thread(target=task, daemon=True).start()
+
+    def _finish_save(self, res, err, old_index, new_index, generation):
+        self.saving = False
+        if new_index is not None:
+            if self.app.base_index is old_index: self.app.base_index = new_index
+            else: new_index.close()
+        if err is not None:
+            self.app.lbl_status.config(text="")
+            messagebox.showerror("Erro", str(err)); return
+        # Só limpa o '*' se nada foi editado durante o salvamento
+        if self.app.edit_generation == generation: self.app.mark_saved()
+        info = (f"{res['lines']} linhas ({res['changed']} alteradas) em {res['elapsed']:.2f}s\n"
+                f"{res['lines_per_s']:,.0f} linhas/s | {res['mb_per_s']:.1f} MB/s")
+        self.app.lbl_status.config(text=f"Salvo: {res['lines_per_s']:,.0f} linhas/s, {res['mb_per_s']:.1f} MB/s")
+        messagebox.showinfo("Sucesso", f"Arquivo salvo!\n{info}")
 
     def import_translation_file(self):
         if not self.app.translations: return
@@ -77,22 +99,7 @@ class FileController:
         if not filename: return
         try:
             with open(filename, 'r', encoding='utf-8') as f: lines = f.readlines()
-            updates = {}
-            has_ids = any(re.match(r'^\s*\[(\d+)\]', l) for l in lines)
-            if has_ids:
-                curr = -1
-                for l in lines:
-                    m = re.match(r'^\s*\[(\d+)\]', l)
-                    if m: curr = int(m.group(1)); continue
-                    if curr != -1:
-                        m2 = re.match(r'^\s*1 string data = (.*)$', l)
-                        if m2:
-                            raw = m2.group(1).strip()
-                            updates[curr] = raw[1:-1] if (len(raw)>=2 and raw.startswith('"') and raw.endswith('"')) else raw
-                            curr = -1
-            else:
-                parsed = FileManager.parse_file_to_dict(lines)
-                for k, v in parsed.items(): updates[k] = v["text"]
+            updates = FileManager.parse_translation_lines(lines)
             self._process_updates(updates, os.path.basename(filename))
         except Exception as e:
             messagebox.showerror("Erro", str(e))
@@ -105,31 +112,19 @@ class FileController:
         mn, mx = rng
         try:
             with open(filename, 'r', encoding='utf-8') as f: lines = f.readlines()
-            updates = {}
-            curr = -1
-            for l in lines:
-                m = re.match(r'^\s*\[(\d+)\]', l)
-                if m: curr = int(m.group(1)); continue
-                if curr != -1 and mn <= curr <= mx:
-                    m2 = re.match(r'^\s*1 string data = (.*)$', l)
-                    if m2:
-                        raw = m2.group(1).strip()
-                        updates[curr] = raw[1:-1] if (len(raw)>=2 and raw.startswith('"') and raw.endswith('"')) else raw
-                        curr = -1
+            updates = FileManager.parse_translation_lines(lines, (mn, mx))
             self._process_updates(updates, os.path.basename(filename))
         except Exception as e:
             messagebox.showerror("Erro", str(e))
 
     def _process_updates(self, updates, source):
         if not updates: return
-        cnt = 0
-        for k, v in updates.items():
-            if k in self.app.translations:
-                if self.app.translations[k]["translated"] != v:
-                    self.app.translations[k]["translated"] = v
-                    self.app.translations[k]["source_file"] = source
-                    self.app.editor_ctrl._add_history_snapshot(k, False)
-                    cnt += 1
+        changed = FileManager.apply_updates(self.app.translations, updates, source)
+        for k in changed:
+            self.app.editor_ctrl._add_history_snapshot(k, False)
+            self.app.touch_row(k)
+            self.app.text_index.update(k)
+        cnt = len(changed)
         self.app.tree_ctrl.populate_tree()
         if cnt: self.app.mark_unsaved()
         messagebox.showinfo("Importação", f"{cnt} linhas atualizadas.")
@@ -158,19 +153,25 @@ class FileController:
         return tuple(res) if res else None
 
     def unload_all_files(self):
+        if self.saving: messagebox.showwarning("Aguarde", "Salvamento em andamento."); return
         if not messagebox.askyesno("Reset", "Zerar tudo? Isso apagará o histórico da sessão atual."): return
         self.app.base_filepath = ""
-        self.app.base_lines = []
-        self.app.translations = {}
+        if self.app.base_index: self.app.base_index.close()
+        self.app.base_index = None
+        self.app.translations = RowStore()
+        self.app.text_index.clear()
         self.app.current_index = None
-        self.app.session_log = []
-        self.app.audit_manager.glossary = {}
+        self.app.session_log = SessionLog()
+        self.app.audit_manager.set_glossary({})
+        self.app.audit_manager.clear_audit_cache()
+        self.app.editor_ctrl.mt_scheduler.clear()
         self.app.baseline_snapshot = {}
         self.app.unsaved_changes = False
         self.app.use_custom_baseline.set(False)
         self.app.spy_mode = False
         
-        self.app.tree.delete(*self.app.tree.get_children())
+        self.app.vtree.reset()
+        self.app.vtree.set_ids([])
         self.app.txt_original.config(state="normal"); self.app.txt_original.delete("1.0", "end"); self.app.txt_original.config(state="disabled")
         self.app.txt_translation.delete("1.0", "end")
         self.app.txt_mt.config(state="normal"); self.app.txt_mt.delete("1.0", "end"); self.app.txt_mt.config(state="disabled")
@@ -181,9 +182,7 @@ class FileController:
         self.app.btn_history.pack_forget()
         
         for b in [self.app.btn_import_trans, self.app.btn_import_partial, self.app.btn_export_mod]: b.config(state="disabled")
-        if os.path.exists(self.app.SESSION_FILE): 
-            try: os.remove(self.app.SESSION_FILE)
-            except: pass
+        self.app.journal.reset()
         messagebox.showinfo("Reset Concluído", "O aplicativo foi resetado com sucesso.")
 
     def open_export_selector(self):
@@ -236,6 +235,7 @@ class FileController:
             search_term = var_search_text.get().lower()
             filter_mod_only = var_filter_mod.get()
             filter_alert_only = var_filter_alert.get()
+            checks = self.app.editor_ctrl.audit_checks()
 
             for idx in sorted(self.app.translations.keys()):
                 data = self.app.translations[idx]
@@ -254,9 +254,10 @@ class FileController:
 
                 has_alert = False
                 if not data.get("ignore_errors", False):
-                    if self.app.audit_manager.validate_glossary(orig, text): 
+                    res = self.app.editor_ctrl.audit_row(idx, checks)
+                    if res.glossary: 
                         tags.append('glossary_issue'); has_alert = True
-                    elif self.app.editor_ctrl.has_errors(text, orig): 
+                    elif res.has_errors: 
                         tags.append('alert'); has_alert = True
 
                 if filter_mod_only and not is_modified: continue
@@ -329,13 +330,6 @@ class FileController:
         save_path = filedialog.asksaveasfilename(defaultextension=".txt", title=f"Exportar {len(ids_list)} Linhas", filetypes=[("Text Files", "*.txt")])
         if not save_path: return
         try:
-            with open(save_path, 'w', encoding='utf-8') as f:
-                for idx in ids_list:
-                    if idx in self.app.translations:
-                        data = self.app.translations[idx]
-                        content = data["translated"]
-                        if data["has_quotes"]: content = f'"{content}"'
-                        f.write(f"[{idx}]\n")
-                        f.write(f"\t1 string data = {content}\n\n")
+            FileManager.write_selection(save_path, self.app.translations, ids_list)
             messagebox.showinfo("Sucesso", f"{len(ids_list)} linhas exportadas com sucesso!")
         except Exception as e: messagebox.showerror("Erro ao salvar", str(e))
\ No newline at end of file
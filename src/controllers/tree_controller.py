@@ -1,26 +1,31 @@
-import time
 import re
-import threading
 import tkinter as tk
-from tkinter import ttk, messagebox, Toplevel, Label, Entry, Button, Frame
+from tkinter import ttk, filedialog, messagebox, Toplevel, Label, Entry, Button, Frame
 from ..gui.windows import ProgressPopup
-from ..logic.backend import MT_AVAILABLE
+from ..logic.audit_engine import AuditEngine
+from ..logic.scan_engine import ScanEngine
+from ..logic.perf import timed
 
 class TreeController:
     def __init__(self, app):
         self.app = app
         self.spy_active = False
         self.prog_win = None
+        self.audit_engine = None
+        self.scan_engine = None
+        self.audit_popup = None
         self.filter_popup = None
         self.chk_widgets = {}
+        self.last_query = ""
 
-    def get_row_tags(self, idx):
+    def get_row_tags(self, idx, checks=None):
         data = self.app.translations[idx]
         text, orig = data["translated"], data["original"]
         tags = []
         if not data.get("ignore_errors", False):
-            if self.app.audit_manager.validate_glossary(orig, text): tags.append('glossary_issue')
-            elif self.app.editor_ctrl.has_errors(text, orig): tags.append('alert')
+            res = self.app.editor_ctrl.audit_row(idx, checks)
+            if res.glossary: tags.append('glossary_issue')
+            elif res.has_errors: tags.append('alert')
         
         if self.app.spy_mode and data.get("mt_cache"):
             clean_t = re.sub(r'<[^>]+>', '', text).strip()
@@ -32,49 +37,100 @@ class TreeController:
         if text != base: tags.append('modified')
         return tuple(tags)
 
-    def populate_tree(self, query=None):
-        for i in self.app.tree.get_children(): self.app.tree.delete(i)
-        query = query.lower() if query else ""
+    def build_row(self, idx, tags=None):
+        """Valores e tags de exibição de uma linha (usado pela lista virtual)."""
+        if tags is None: tags = self.get_row_tags(idx)
+        text = self.app.translations[idx]["translated"]
+        clean = re.sub(r'<.*?>', '', text)[:60]
+        disp = f"✎ {clean}" if 'modified' in tags else clean
+        if 'mt_match' in tags: disp = f"🤖 {clean}"
+        icon = "📖" if 'glossary_issue' in tags else ("⚠️" if 'alert' in tags else "")
+        return (idx, disp, icon), tags
+
+    def _row_filter(self, query=None):
+        """
+        Monta o teste (id, original, tradução) -> bool com a busca e os filtros atuais.
+        Sem query explícita, usa o texto atual da caixa de busca.
+        """
+        if query is None: query = self.app.entry_search.get()
+        query = query.casefold() if query else ""
+        # Índice de trigramas; None enquanto ele é montado (ou consulta curta): varredura linear
+        hits = self.app.text_index.search(query) if query else None
         try: mn, mx = int(self.app.id_min_var.get() or 0), int(self.app.id_max_var.get() or 99999999)
         except: mn, mx = 0, 99999999
-        
-        count = 0
-        for idx, data in self.app.translations.items():
-            if idx < mn or idx > mx: continue
-            text, orig = data["translated"], data["original"]
-            if query and (query not in text.lower() and query not in orig.lower()): continue
-            
-            tags = self.get_row_tags(idx)
-            is_mod = 'modified' in tags
-            has_err = 'alert' in tags or 'glossary_issue' in tags
-            
-            # Filtros
-            if self.app.filters["modified"] and not self.app.filters["original"] and not is_mod: continue
-            elif self.app.filters["original"] and not self.app.filters["modified"] and is_mod: continue
-            if self.app.filters["alerts"] and not has_err: continue
-            if self.app.filters["tags"] and not (re.search(r'<[^>]+>', text) or re.search(r'<[^>]+>', orig)): continue
-            if self.app.filters["glossary"] and 'glossary_issue' not in tags: continue
-            if self.app.filters["mt_match"] and 'mt_match' not in tags: continue
-            
-            clean = re.sub(r'<.*?>', '', text)[:60]
-            disp = f"✎ {clean}" if is_mod else clean
-            if 'mt_match' in tags: disp = f"🤖 {clean}"
-            icon = "📖" if 'glossary_issue' in tags else ("⚠️" if 'alert' in tags else "")
-            
-            self.app.tree.insert("", "end", iid=idx, values=(idx, disp, icon), tags=tags)
-            count += 1; 
-            if count > 2000 and not query and mn==0 and mx==99999999: break
+        f = self.app.filters
+        # Só audita as linhas quando algum filtro depende das tags
+        need_tags = any(f[k] for k in ("modified", "original", "alerts", "glossary", "mt_match"))
+        if self.app.spy_mode: self.app.load_session_sections("mt")
+        checks = self.app.editor_ctrl.audit_checks()
 
-    def filter_list(self, event): self.populate_tree(self.app.entry_search.get())
+        def keep(idx, orig, text):
+            if idx < mn or idx > mx: return False
+            if query:
+                if hits is not None:
+                    if idx not in hits: return False
+                elif query not in text.casefold() and query not in orig.casefold(): return False
+            if f["tags"] and not (re.search(r'<[^>]+>', text) or re.search(r'<[^>]+>', orig)): return False
+            if need_tags:
+                tags = self.get_row_tags(idx, checks)
+                is_mod = 'modified' in tags
+                has_err = 'alert' in tags or 'glossary_issue' in tags
+                
+                # Filtros
+                if f["modified"] and not f["original"] and not is_mod: return False
+                elif f["original"] and not f["modified"] and is_mod: return False
+                if f["alerts"] and not has_err: return False
+                if f["glossary"] and 'glossary_issue' not in tags: return False
+                if f["mt_match"] and 'mt_match' not in tags: return False
+            return True
+        return keep
+
+    @timed()
+    def populate_tree(self, query=None):
+        """
+        Calcula os IDs que passam na busca/filtros e entrega para a lista virtual.
+        Só a janela visível vira item do Treeview, então não há mais limite de linhas.
+        Sem query explícita, mantém o texto atual da caixa de busca.
+        """
+        keep = self._row_filter(query)
+        self.app.vtree.set_ids([idx for idx, orig, text in self.app.translations.columns("original", "translated")
+                                if keep(idx, orig, text)])
+
+    @timed()
+    def refilter_rows(self, ids):
+        """
+        Depois de uma alteração em lote: reaplica busca/filtros só nas linhas 'ids'
+        (entram ou saem da lista) e redesenha as que estão visíveis.
+        """
+        keep = self._row_filter()
+        texts = self.app.translations.texts
+        current = set(self.app.vtree.ids)
+        changed = False
+        for idx in ids:
+            t = texts(idx)
+            if t is not None and keep(idx, *t):
+                if idx not in current: current.add(idx); changed = True
+            elif idx in current: current.discard(idx); changed = True
+        if changed: self.app.vtree.set_ids(sorted(current))
+        else:
+            for idx in ids: self.app.vtree.refresh_row(idx)
+
+    @timed()
+    def filter_list(self, event):
+        query = self.app.entry_search.get()
+        if query != self.last_query: self.app.vtree.top = 0  # Nova busca começa do topo
+        self.last_query = query
+        self.populate_tree(query)
 
     def toggle_custom_baseline(self):
         if self.app.use_custom_baseline.get():
-            self.app.baseline_snapshot = {k: v["translated"] for k, v in self.app.translations.items()}
+            self.app.baseline_snapshot = dict(self.app.translations.columns("translated"))
             messagebox.showinfo("Zerar Verdes", "Visual resetado! Novas edições ficarão verdes.")
         else: 
             if not messagebox.askokcancel("Restaurar", "Isso fará linhas traduzidas ficarem verdes de novo."):
                 self.app.use_custom_baseline.set(True); return
             self.app.baseline_snapshot = {}
+        self.app.journal.request_compact()
         self.populate_tree()
 
     def toggle_spy_mode(self, event=None):
@@ -85,42 +141,89 @@ class TreeController:
         messagebox.showinfo("Modo Espião 🕵️", f"Status: {'ATIVADO' if self.app.spy_mode else 'DESATIVADO'}")
         self.populate_tree()
 
+    @timed()
     def run_spy_batch_scan(self):
-        if not MT_AVAILABLE: messagebox.showerror("Erro", "Tradutor indisponível."); return
+        if not self.app.translator_service.available: messagebox.showerror("Erro", "Tradutor indisponível."); return
         try: s, e = int(self.app.spy_scan_min.get()), int(self.app.spy_scan_max.get())
         except: messagebox.showerror("Erro", "IDs inválidos."); return
         if s > e: messagebox.showerror("Erro", "Inicio > Fim."); return
-        
+        if self.scan_engine and self.scan_engine.running: return
+
+        self.app.load_session_sections("mt")
+        rows = [(i, self.app.translations[i]["original"]) for i in range(s, e + 1)
+                if i in self.app.translations and not self.app.translations[i].get("mt_cache")]
         self.spy_active = True
-        self.prog_win = ProgressPopup(self.app.root, self.app.current_theme, s, e, self.cancel_scan)
-        threading.Thread(target=self._scan, args=(s, e), daemon=True).start()
-
-    def _scan(self, s, e):
-        total = e - s + 1
-        cnt = 0
-        for i in range(s, e + 1):
-            if not self.spy_active: break
-            if i in self.app.translations and not self.app.translations[i]["mt_cache"]:
-                orig = re.sub(r'<[^>]+>', '', self.app.translations[i]["original"])
-                try: 
-                    if cnt > 0 and cnt % 20 == 0: time.sleep(0.5)
-                    self.app.translations[i]["mt_cache"] = self.app.translator_service.translate(orig).strip()
-                except: pass
-            cnt += 1
-            if self.prog_win: 
-                self.app.root.after(0, lambda c=cnt: self.prog_win.update(i, c, total, 0, 0))
-        self.app.root.after(0, self.populate_tree)
-        if self.spy_active: 
-            self.app.root.after(0, self.prog_win.destroy)
-            self.app.root.after(0, lambda: messagebox.showinfo("Fim", "Scan concluído."))
+        self.scan_engine = ScanEngine(self.app.translator_service)
+        self.prog_win = ProgressPopup(self.app.root, self.app.current_theme, 0, max(len(rows) - 1, 0), self.cancel_scan)
+
+        def result(idx, text):
+            # Chamado pelas threads do scan: a tabela só é alterada na thread do Tk
+            self.app.root.after(0, self._store_mt, idx, text)
+        def progress(done, total, last):
+            self.app.root.after(0, lambda: self.prog_win and self.prog_win.update(last, done, total, 0, 0))
+        def finished(stats):
+            self.app.root.after(0, lambda: self._finish_scan(stats))
+        self.scan_engine.start(rows, result, progress, finished)
+
+    def _store_mt(self, idx, text):
+        row = self.app.translations.get(idx)
+        if row is None: return
+        row["mt_cache"] = text
+        self.app.touch_row(idx)
+
+    @timed()
+    def _finish_scan(self, stats):
+        self.spy_active = False
+        if self.prog_win: self.prog_win.destroy(); self.prog_win = None
+        self.populate_tree()
+        self.app.lbl_status.config(text=f"Scan: {stats['done']}/{stats['total']} em {stats['elapsed']:.1f}s "
+                                        f"({stats['requests']} req., {stats['cached']} do cache)")
+        if stats["cancelled"]: return
+        msg = "Scan concluído."
+        if stats["failed"]: msg += f"\n{stats['failed']} linhas falharam após {self.scan_engine.retries} tentativas."
+        messagebox.showinfo("Fim", msg)
 
     def cancel_scan(self):
         self.spy_active = False
-        if self.prog_win: self.prog_win.destroy()
+        if self.scan_engine: self.scan_engine.cancel()
+        if self.prog_win: self.prog_win.destroy(); self.prog_win = None
+
+    def run_full_audit(self):
+        """Audita o arquivo inteiro em processos paralelos e atualiza os filtros da lista."""
+        if not self.app.translations: return
+        if self.audit_engine and self.audit_engine.running: return
+        rows = [(idx, orig, text) for idx, orig, text, ign in
+                self.app.translations.columns("original", "translated", "ignore_errors") if not ign]
+        checks = self.app.editor_ctrl.audit_checks()
+        self.audit_engine = AuditEngine(self.app.audit_manager)
+        self.audit_popup = ProgressPopup(self.app.root, self.app.current_theme, 0, max(len(rows) - 1, 0),
+                                         self.cancel_full_audit, title="Auditando...")
+        self.app.lbl_status.config(text=f"Auditando ({self.audit_engine.workers} processos)...")
+
+        def progress(done, total, last):
+            self.app.root.after(0, lambda: self.audit_popup and self.audit_popup.update(last, done, total, 0, 0))
+        def finished(stats):
+            self.app.root.after(0, lambda: self._finish_full_audit(stats))
+        self.audit_engine.start(rows, checks, progress, finished)
+
+    def _finish_full_audit(self, stats):
+        if self.audit_popup: self.audit_popup.destroy(); self.audit_popup = None
+        self.populate_tree()
+        if stats["failure"]:
+            self.app.lbl_status.config(text="")
+            messagebox.showerror("Auditoria", f"Falha na auditoria:\n{stats['failure']}"); return
+        self.app.lbl_status.config(text=f"Auditoria: {stats['errors']} alertas em {stats['elapsed']:.1f}s")
+        if not stats["cancelled"]:
+            messagebox.showinfo("Auditoria", f"{stats['done']} linhas auditadas, {stats['errors']} com alertas.")
+
+    def cancel_full_audit(self):
+        if self.audit_engine: self.audit_engine.cancel()
+        if self.audit_popup: self.audit_popup.destroy(); self.audit_popup = None
 
     def handle_tree_click(self, event):
         if self.app.tree.identify_region(event.x, event.y) != "cell": return
         if self.app.tree.identify_row(event.y) in self.app.tree.selection():
+            self.app.vtree.selected = None
             self.app.tree.selection_remove(self.app.tree.identify_row(event.y)); return "break"
 
     def on_tree_hover(self, event):
@@ -139,14 +242,7 @@ class TreeController:
     def get_error_detail(self, idx):
         # Helper para tooltip
         if idx not in self.app.translations: return None
-        data = self.app.translations[idx]
-        t, o = data["translated"], data["original"]
-        gloss = self.app.audit_manager.validate_glossary(o, t)
-        if gloss: return "\n".join(gloss)
-        if self.app.show_tags.get():
-            msg, k = self.app.audit_manager.validate_tags(o, t)
-            if k != "tag_ok": return f"Tag HTML: {msg}"
-        return "Erro Genérico"
+        return self.app.editor_ctrl.audit_row(idx).error_detail()
 
     def toggle_filter_popup(self, event):
         if self.filter_popup:
@@ -242,6 +338,19 @@ class TreeController:
                     self.filter_popup.destroy(); self.filter_popup = None
             except: pass
 
+    def load_glossary(self):
+        filename = filedialog.askopenfilename(title="Carregar Glossário", filetypes=[("JSON Files", "*.json")])
+        if not filename: return False
+        try:
+            count = self.app.audit_manager.load_glossary_file(filename)
+            if count is None: messagebox.showerror("Erro", "JSON inválido.")
+            else:
+                self.populate_tree()
+                return count
+        except Exception as e:
+            messagebox.showerror("Erro", f"Falha ao ler: {e}")
+        return False
+
     def show_glossary_window(self):
         # Mantendo sua função corrigida da resposta anterior
         if not self.app.audit_manager.glossary:
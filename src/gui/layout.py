@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 import webbrowser
-from ..logic.backend import MT_AVAILABLE
+from .virtual_tree import VirtualTree
 
 def setup_ui(app):
     c = app.current_theme
@@ -53,7 +53,7 @@ def setup_ui(app):
     app.lbl_glossary = tk.Label(app.glossary_group, text="GLOSSÁRIO", font=("Segoe UI", 8, "bold"))
     app.lbl_glossary.pack(anchor="w")
     
-    app.btn_load_glossary = ttk.Button(app.glossary_group, text="📚 Carregar", command=app.audit_manager.load_glossary)
+    app.btn_load_glossary = ttk.Button(app.glossary_group, text="📚 Carregar", command=app.tree_ctrl.load_glossary)
     app.btn_load_glossary.pack(side=tk.LEFT, padx=1)
     app.btn_view_glossary = ttk.Button(app.glossary_group, text="👁️ Ver", command=app.tree_ctrl.show_glossary_window)
     app.btn_view_glossary.pack(side=tk.LEFT, padx=1)
@@ -71,6 +71,8 @@ def setup_ui(app):
     app.btn_replace.pack(side=tk.LEFT, padx=1)
     app.btn_session_log = ttk.Button(app.edit_group, text="📋 Log Global", command=app.editor_ctrl.show_session_log_window)
     app.btn_session_log.pack(side=tk.LEFT, padx=1)
+    app.btn_full_audit = ttk.Button(app.edit_group, text="🩺 Auditar", command=app.tree_ctrl.run_full_audit)
+    app.btn_full_audit.pack(side=tk.LEFT, padx=1)
 
     # ================= GRUPO: VISUALIZAÇÃO =================
     app.audit_group = tk.Frame(app.ribbon_frame, bg=c["bg_ribbon"])
@@ -80,8 +82,8 @@ def setup_ui(app):
     app.lbl_audit.pack(anchor="w")
     app.lbl_audit.bind("<Button-1>", app.tree_ctrl.toggle_spy_mode)
     
-    mt_state = tk.NORMAL if MT_AVAILABLE else tk.DISABLED
-    mt_text = "Tradutor" if MT_AVAILABLE else "Tradutor (N/A)"
+    mt_state = tk.NORMAL if app.translator_service.available else tk.DISABLED
+    mt_text = "Tradutor" if app.translator_service.available else "Tradutor (N/A)"
     audit_font = ("Segoe UI", 8)
 
     # Container interno para os checkboxes
@@ -114,6 +116,17 @@ def setup_ui(app):
     app.chk_glossary = tk.Checkbutton(chk_frame, text="Glossário", variable=app.show_glossary, command=app.editor_ctrl.refresh_audit_view, **chk_opts)
     app.chk_glossary.pack(side=tk.LEFT, padx=3)
 
+    # ================= GRUPO: DESEMPENHO (oculto; Ctrl+Shift+P com ENA_PERF=1) =================
+    app.perf_group = tk.Frame(app.ribbon_frame, bg=c["bg_ribbon"])
+    app.lbl_perf = tk.Label(app.perf_group, text="DESEMPENHO (ms: p50 / p95 / chamadas)", font=("Segoe UI", 8, "bold"))
+    app.lbl_perf.pack(anchor="w")
+    app.lbl_perf_stats = tk.Label(app.perf_group, text="", font=("Consolas", 7), justify=tk.LEFT, anchor="nw")
+    app.lbl_perf_stats.pack(side=tk.LEFT, anchor="n")
+    app.perf_buttons = tk.Frame(app.perf_group, bg=c["bg_ribbon"])
+    app.perf_buttons.pack(side=tk.LEFT, anchor="n", padx=(5, 0))
+    ttk.Button(app.perf_buttons, text="💾 JSON", command=app.export_perf).pack(anchor="w")
+    ttk.Button(app.perf_buttons, text="↺ Zerar", command=app.reset_perf).pack(anchor="w")
+
     # ================= LAYOUT PRINCIPAL =================
     app.main_pane = tk.PanedWindow(app.root, orient=tk.HORIZONTAL, sashwidth=2)
     app.main_pane.pack(fill=tk.BOTH, expand=True)
@@ -144,10 +157,11 @@ def setup_ui(app):
     app.tree.column("#2", width=280)
     app.tree.column("#3", width=70, anchor="center", stretch=False)
     
-    app.scrollbar = tk.Scrollbar(app.tree_container, orient="vertical", command=app.tree.yview)
-    app.tree.configure(yscroll=app.scrollbar.set)
+    app.scrollbar = tk.Scrollbar(app.tree_container, orient="vertical")
     app.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     app.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    # Lista virtual: só as linhas visíveis viram itens do Treeview
+    app.vtree = VirtualTree(app.tree, app.scrollbar, app.tree_ctrl.build_row)
     
     app.tree.bind("<Button-1>", app.tree_ctrl.handle_tree_click)
     app.tree.bind("<<TreeviewSelect>>", app.editor_ctrl.on_select)
@@ -204,10 +218,10 @@ def apply_theme(app):
     app.ribbon_frame.configure(bg=c["bg_ribbon"])
     
     # Configure todos os frames de grupo com a cor de fundo correta
-    for f in [app.file_group, app.file_header, app.edit_group, app.audit_group, app.glossary_group]:
+    for f in [app.file_group, app.file_header, app.edit_group, app.audit_group, app.glossary_group, app.perf_group, app.perf_buttons]:
         f.configure(bg=c["bg_ribbon"])
 
-    labels = [app.lbl_status, app.lbl_file, app.lbl_edit, app.lbl_glossary, app.lbl_audit] 
+    labels = [app.lbl_status, app.lbl_file, app.lbl_edit, app.lbl_glossary, app.lbl_audit, app.lbl_perf, app.lbl_perf_stats] 
     for lbl in labels: lbl.configure(bg=c["bg_ribbon"], fg=c["fg_text"])
     
     app.lbl_status.configure(fg=c["fg_dim"])
@@ -215,6 +229,7 @@ def apply_theme(app):
     app.lbl_file.configure(fg=c["accent"])
     app.lbl_edit.configure(fg=c["accent"]) 
     app.lbl_glossary.configure(fg=c["accent"])
+    app.lbl_perf.configure(fg=c["accent"])
     app.lbl_audit.configure(bg=c["bg_ribbon"], fg=c["mt_match"] if app.spy_mode else c["audit_label"])
     
     switches = [app.chk_spell, app.chk_tags, app.chk_grammar, app.chk_glossary, app.chk_mt, app.chk_baseline]
@@ -0,0 +1,72 @@
+from bisect import bisect_right
+
+class TagRenderer:
+    """
+    Aplica tags de um tk.Text a partir de posições em caracteres (início, fim).
+    Para cada tag compara o conjunto desejado com o que já está no widget
+    (tag ranges) e envia ao Tk só a diferença, em um único 'tag remove' e um
+    único 'tag add' com vários intervalos, usando índices linha.coluna.
+    """
+    def __init__(self, widget):
+        self.widget = widget
+        self._text = None
+        self._lines = [0]  # Offset de início de cada linha do texto atual
+
+    def _sync(self, text):
+        if text == self._text: return
+        self._text = text
+        lines = [0]
+        pos = text.find('\n')
+        while pos != -1:
+            lines.append(pos + 1)
+            pos = text.find('\n', pos + 1)
+        self._lines = lines
+
+    def _index(self, offset):
+        line = bisect_right(self._lines, offset) - 1
+        return f"{line + 1}.{offset - self._lines[line]}"
+
+    def _offset(self, index):
+        line, col = str(index).split('.')
+        line = int(line) - 1
+        if line >= len(self._lines): return len(self._text)
+        return self._lines[line] + int(col)
+
+    @staticmethod
+    def _merge(spans):
+        """Ordena e junta intervalos sobrepostos/encostados (o Tk guarda as tags assim)."""
+        out = []
+        for s, e in sorted(spans):
+            if e <= s: continue
+            if out and s <= out[-1][1]:
+                if e > out[-1][1]: out[-1] = (out[-1][0], e)
+            else: out.append((s, e))
+        return out
+
+    def applied(self, tag):
+        """Intervalos (início, fim) da tag hoje no widget, em offsets do texto atual."""
+        r = self.widget.tag_ranges(tag)
+        return [(self._offset(r[i]), self._offset(r[i + 1])) for i in range(0, len(r), 2)]
+
+    def render(self, tag, spans, text, window=None):
+        """
+        Deixa a tag cobrindo exatamente 'spans' em 'text' (o conteúdo atual do widget).
+        window=(ini, fim): 'spans' só vale dentro desse trecho; fora dele nada muda.
+        """
+        self._sync(text)
+        current = self.applied(tag)
+        wanted = self._merge(spans)
+        if window is not None:
+            lo, hi = window
+            keep = [(s, min(e, lo)) for s, e in current if s < lo] + [(max(s, hi), e) for s, e in current if e > hi]
+            wanted = self._merge([(max(s, lo), min(e, hi)) for s, e in wanted] + keep)
+        cur, new = set(current), set(wanted)
+        if cur == new: return
+        call, w = self.widget.tk.call, self.widget._w
+        gone = [self._index(x) for s, e in current if (s, e) not in new for x in (s, e)]
+        if gone: call(w, "tag", "remove", tag, *gone)
+        add = [self._index(x) for s, e in wanted if (s, e) not in cur for x in (s, e)]
+        if add: call(w, "tag", "add", tag, *add)
+
+    def clear(self, tag):
+        if self.widget.tag_ranges(tag): self.widget.tag_remove(tag, "1.0", "end")
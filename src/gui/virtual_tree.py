@@ -0,0 +1,168 @@
+import tkinter as tk
+from tkinter import ttk
+from array import array
+from bisect import bisect_left
+from ..logic.perf import timed
+
+class VirtualTree:
+    """
+    Lista virtual sobre um ttk.Treeview: só a janela visível (mais uma margem)
+    existe como itens reais do Tk. A posição da barra de rolagem é mapeada para
+    um array em memória com os IDs filtrados, então rolar e filtrar custam o
+    mesmo independente do tamanho do arquivo.
+    Os iids continuam sendo o próprio ID da linha (str).
+    """
+    MARGIN = 2  # Linhas extras abaixo da área visível (linha parcialmente cortada)
+
+    def __init__(self, tree, scrollbar, row_builder):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_builder = row_builder  # idx -> (values, tags)
+        self.ids = array('i')           # IDs filtrados, em ordem crescente
+        self.top = 0
+        self.visible = 20
+        self.shown = {}                 # iid -> (values, tags) atualmente no Treeview
+        self.selected = None            # ID selecionado (mantido mesmo fora da janela)
+
+        self.scrollbar.configure(command=self.yview)
+        self.tree.configure(yscrollcommand="")
+        self.tree.bind("<Configure>", self._on_configure, add="+")
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self._on_wheel)
+        keys = {"<Up>": -1, "<Down>": 1, "<Prior>": "page-", "<Next>": "page+", "<Home>": "home", "<End>": "end"}
+        for seq, step in keys.items():
+            self.tree.bind(seq, lambda e, s=step: self._on_key(s))
+
+    # --- Dados ---
+    def set_ids(self, ids):
+        """
+        Troca o conjunto filtrado mantendo a rolagem: a primeira linha visível
+        continua no topo (ou a próxima, se ela saiu do filtro).
+        """
+        anchor = self.ids[self.top] if self.top < len(self.ids) else None
+        self.ids = ids if isinstance(ids, array) else array('i', ids)
+        self.top = bisect_left(self.ids, anchor) if anchor is not None else 0
+        self.render()
+
+    def reset(self):
+        """Volta ao topo e esquece a seleção (ex.: ao trocar de arquivo base)."""
+        self.top = 0
+        self.selected = None
+
+    def __len__(self): return len(self.ids)
+
+    def position(self, idx):
+        """Posição do ID na lista filtrada (ou None)."""
+        p = bisect_left(self.ids, idx)
+        return p if p < len(self.ids) and self.ids[p] == idx else None
+
+    # --- Renderização ---
+    def _clamp_top(self, top):
+        return max(0, min(top, len(self.ids) - self.visible))
+
+    @timed()
+    def render(self):
+        """
+        Reconcilia a janela visível com o Treeview: remove o que saiu, insere o que
+        entrou e só chama item() para linhas cujo texto, ícone ou tags mudaram.
+        """
+        self.top = self._clamp_top(self.top)
+        window = [str(i) for i in self.ids[self.top:self.top + self.visible + self.MARGIN]]
+        keep = set(window)
+        gone = [iid for iid in self.shown if iid not in keep]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone: del self.shown[iid]
+
+        # Os IDs são crescentes, então os itens mantidos já estão na ordem certa
+        for pos, iid in enumerate(window):
+            values, tags = self.row_builder(int(iid))
+            tags = tuple(tags)
+            old = self.shown.get(iid)
+            if old is None: self.tree.insert("", pos, iid=iid, values=values, tags=tags)
+            elif old != (values, tags): self.tree.item(iid, values=values, tags=tags)
+            else: continue
+            self.shown[iid] = (values, tags)
+
+        sel = str(self.selected) if self.selected is not None else None
+        if sel in keep and self.tree.selection() != (sel,):
+            # O editor ignora o <<TreeviewSelect>> de uma linha que já está carregada
+            self.tree.selection_set(sel)
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def refresh_row(self, idx):
+        """Atualiza uma linha se ela estiver materializada na janela."""
+        iid = str(idx)
+        if iid not in self.shown: return
+        values, tags = self.row_builder(idx)
+        tags = tuple(tags)
+        if self.shown[iid] != (values, tags):
+            self.tree.item(iid, values=values, tags=tags)
+            self.shown[iid] = (values, tags)
+
+    def _update_scrollbar(self):
+        n = len(self.ids)
+        if not n: self.scrollbar.set(0, 1); return
+        self.scrollbar.set(self.top / n, min(1.0, (self.top + self.visible) / n))
+
+    # --- Rolagem ---
+    def yview(self, *args):
+        """Comando da Scrollbar ('moveto f' ou 'scroll n units|pages')."""
+        if not args: return
+        if args[0] == "moveto": top = int(float(args[1]) * len(self.ids))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            top = self.top + (n * self.visible if args[2] == "pages" else n)
+        else: return
+        self.scroll_to(top)
+
+    def scroll_to(self, top):
+        top = self._clamp_top(top)
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def see(self, idx):
+        p = self.position(idx)
+        if p is None: return False
+        if p < self.top: self.scroll_to(p)
+        elif p >= self.top + self.visible: self.scroll_to(p - self.visible + 1)
+        return True
+
+    def select(self, idx):
+        """Seleciona o ID (rolando até ele); dispara o <<TreeviewSelect>> normal."""
+        if not self.see(idx): return False
+        self.selected = idx
+        self.tree.selection_set(str(idx))
+        self.tree.focus(str(idx))
+        return True
+
+    # --- Eventos ---
+    def _on_configure(self, event):
+        try: row_h = int(ttk.Style().lookup("Treeview", "rowheight") or 25)
+        except (ValueError, tk.TclError): row_h = 25
+        visible = max(1, (event.height - row_h) // row_h)  # Desconta o cabeçalho
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def _on_wheel(self, event):
+        if event.num == 4: step = -3
+        elif event.num == 5: step = 3
+        else: step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.top + step)
+        return "break"
+
+    def _on_key(self, step):
+        if not len(self.ids): return "break"
+        p = self.position(self.selected) if self.selected is not None else None
+        if p is None: p = self.top - 1 if step in (1, "page+") else self.top
+        if step == "home": p = 0
+        elif step == "end": p = len(self.ids) - 1
+        elif step == "page-": p -= self.visible
+        elif step == "page+": p += self.visible
+        else: p += step
+        p = max(0, min(p, len(self.ids) - 1))
+        self.select(self.ids[p])
+        return "break"
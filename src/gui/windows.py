@@ -8,7 +8,7 @@ class FindReplaceDialog:
         self.c = theme
         self.win = tk.Toplevel(parent)
         self.win.title("Localizar / Substituir")
-        self.win.geometry("550x260")
+        self.win.geometry("550x290")
         self.win.configure(bg=self.c["bg_ribbon"])
         self.win.resizable(False, False)
         self.win.transient(parent)
@@ -17,7 +17,9 @@ class FindReplaceDialog:
         self.v_replace = tk.StringVar()
         self.v_case = tk.BooleanVar(value=False)
         self.v_whole = tk.BooleanVar(value=False)
-        self.win.bind('<Return>', lambda e: self.controller.find_next_action(self.v_find, self.v_case, self.v_whole))
+        self.v_regex = tk.BooleanVar(value=False)
+        self.v_count = tk.StringVar()
+        self.win.bind('<Return>', lambda e: self.controller.find_next_action(self.v_find, self.v_case, self.v_whole, self.v_regex))
         self._setup_ui()
 
     def _setup_ui(self):
@@ -35,6 +37,8 @@ class FindReplaceDialog:
             opts.pack(fill=tk.X, pady=10)
             tk.Checkbutton(opts, text="Palavra inteira", variable=self.v_whole, bg=self.c["bg_ribbon"], fg=self.c["fg_text"], selectcolor=self.c["bg_ribbon"]).pack(side=tk.LEFT, padx=5)
             tk.Checkbutton(opts, text="Maiúsc/Minúsc", variable=self.v_case, bg=self.c["bg_ribbon"], fg=self.c["fg_text"], selectcolor=self.c["bg_ribbon"]).pack(side=tk.LEFT, padx=5)
+            tk.Checkbutton(opts, text="Regex", variable=self.v_regex, bg=self.c["bg_ribbon"], fg=self.c["fg_text"], selectcolor=self.c["bg_ribbon"]).pack(side=tk.LEFT, padx=5)
+            tk.Label(opts, textvariable=self.v_count, bg=self.c["bg_ribbon"], fg=self.c["fg_text"]).pack(side=tk.RIGHT, padx=5)
 
         f_find = tk.Frame(notebook, bg=self.c["bg_ribbon"], pady=15, padx=10)
         notebook.add(f_find, text="  Localizar  ")
@@ -43,7 +47,8 @@ class FindReplaceDialog:
         create_opts(f_find)
         btn_box_f = tk.Frame(f_find, bg=self.c["bg_ribbon"])
         btn_box_f.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
-        tk.Button(btn_box_f, text="Localizar Próximo", command=lambda: self.controller.find_next_action(self.v_find, self.v_case, self.v_whole), **b_action_style).pack(side=tk.RIGHT, padx=5)
+        tk.Button(btn_box_f, text="Localizar Próximo", command=lambda: self.controller.find_next_action(self.v_find, self.v_case, self.v_whole, self.v_regex), **b_action_style).pack(side=tk.RIGHT, padx=5)
+        tk.Button(btn_box_f, text="Contar", command=self._count, **b_style).pack(side=tk.RIGHT, padx=0)
 
         f_repl = tk.Frame(notebook, bg=self.c["bg_ribbon"], pady=15, padx=10)
         notebook.add(f_repl, text="  Substituir  ")
@@ -54,14 +59,18 @@ class FindReplaceDialog:
         create_opts(f_repl)
         btn_box_r = tk.Frame(f_repl, bg=self.c["bg_ribbon"])
         btn_box_r.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
-        tk.Button(btn_box_r, text="Substituir", command=lambda: self.controller.replace_current(self.v_find, self.v_replace, self.v_case, self.v_whole), **b_action_style).pack(side=tk.LEFT, padx=5)
-        tk.Button(btn_box_r, text="Substituir Tudo", command=lambda: self.controller.replace_all(self.v_find, self.v_replace, self.v_case, self.v_whole), **b_style).pack(side=tk.LEFT, padx=0)
+        tk.Button(btn_box_r, text="Substituir", command=lambda: self.controller.replace_current(self.v_find, self.v_replace, self.v_case, self.v_whole, self.v_regex), **b_action_style).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_box_r, text="Substituir Tudo", command=lambda: self.controller.replace_all(self.v_find, self.v_replace, self.v_case, self.v_whole, self.v_regex), **b_style).pack(side=tk.LEFT, padx=0)
+        tk.Button(btn_box_r, text="Prévia", command=lambda: self._count(self.v_replace), **b_style).pack(side=tk.LEFT, padx=5)
+
+    def _count(self, v_replace=None):
+        self.v_count.set(self.controller.count_matches_action(self.v_find, self.v_case, self.v_whole, self.v_regex, v_replace))
 
 class ProgressPopup:
-    def __init__(self, parent, theme, start, end, cancel_callback):
+    def __init__(self, parent, theme, start, end, cancel_callback, title="Escaneando..."):
         self.c = theme
         self.win = tk.Toplevel(parent)
-        self.win.title("Escaneando...")
+        self.win.title(title)
         self.win.geometry("400x180")
         self.win.configure(bg=self.c["bg_ribbon"])
         self.win.transient(parent)
@@ -1,104 +1,253 @@
-import re
 import json
 import os
+import sys
+import time
+import threading
+from importlib.util import find_spec
 from collections import Counter
-from tkinter import filedialog, messagebox
-from ..config import resource_path, remove_accents
+from functools import lru_cache
+from ..config import resource_path, SPELL_DICT_FILE
+from .glossary import GlossaryMatcher
+from .spell_dict import CompiledDictionary
+from .tokenizer import tokenize, tags, SPACE, PUNCT, WORD_KINDS
+from .perf import timed
 
-try:
-    from spellchecker import SpellChecker
-    SPELL_AVAILABLE = True
-except ImportError:
-    SPELL_AVAILABLE = False
+def dictionary_source():
+    """
+    JSON gzip {palavra: frequência} de onde o dicionário é compilado: o pt_BR.json.gz
+    do projeto (ou do executável) ou, na falta dele, o 'pt' que vem com o pyspellchecker
+    (localizado sem importar o pacote). None se nenhum existe.
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for path in (os.path.join(src_dir, "pt_BR.json.gz"), resource_path(os.path.join("src", "pt_BR.json.gz"))):
+        if os.path.exists(path): return path
+    spec = find_spec("spellchecker")
+    for d in (spec.submodule_search_locations or []) if spec else []:
+        path = os.path.join(d, "resources", "pt.json.gz")
+        if os.path.exists(path): return path
+    return None
+
+SPELL_AVAILABLE = dictionary_source() is not None
+
+def compile_dictionary(path=SPELL_DICT_FILE, force=False):
+    """
+    Passo de build: garante o dicionário compilado em 'path' (refaz se desatualizado ou
+    com force). Devolve {source, output, words, bytes, compiled, elapsed} ou None sem fonte.
+    """
+    source = dictionary_source()
+    if source is None: return None
+    t0 = time.perf_counter()
+    extra = AuditManager.WHITELIST
+    d = None if force else CompiledDictionary.open(path, source, extra)
+    compiled = d is None
+    if compiled:
+        CompiledDictionary.build(source, path, extra)  # Aqui uma falha de gravação é erro
+        d = CompiledDictionary.open(path, source, extra)
+    words = len(d)
+    d.close()
+    return {"source": source, "output": os.path.abspath(path), "words": words, "bytes": os.path.getsize(path),
+            "compiled": compiled, "elapsed": time.perf_counter() - t0}
+
+class AuditResult:
+    """
+    Resultado estruturado da auditoria de uma linha.
+    Campos desativados ficam como None (tags, spelling, grammar).
+    """
+    __slots__ = ("glossary", "tags", "spelling", "grammar")
+
+    def __init__(self, glossary, tags=None, spelling=None, grammar=None):
+        self.glossary = glossary    # lista de mensagens do glossário
+        self.tags = tags            # (mensagem, chave) de validate_tags
+        self.spelling = spelling    # palavras desconhecidas
+        self.grammar = grammar      # mensagem de check_grammar_issues
+
+    @property
+    def tag_error(self): return bool(self.tags and self.tags[1] != "tag_ok")
+
+    @property
+    def has_errors(self):
+        return bool(self.glossary or self.tag_error or self.spelling or self.grammar)
+
+    @property
+    def issues(self):
+        """Lista de (tipo, mensagem) com todos os problemas encontrados."""
+        out = [("glossary", m) for m in self.glossary]
+        if self.tag_error: out.append(("tags", self.tags[0]))
+        if self.spelling: out.extend(("spell", w) for w in self.spelling)
+        if self.grammar: out.append(("grammar", self.grammar))
+        return out
+
+    def error_detail(self):
+        """Texto do tooltip da lista (prioriza glossário e tags)."""
+        if self.glossary: return "\n".join(self.glossary)
+        if self.tag_error: return f"Tag HTML: {self.tags[0]}"
+        return "Erro Genérico"
 
 class AuditManager:
-    def __init__(self):
+    WORD_CACHE_SIZE = 50000
+    # Whitelist técnica (compilada junto com o dicionário)
+    WHITELIST = (
+        'ena', 'moony', 'turrón', 'turron', 'phr', 'cg', 'ui', 'style',
+        'br', 'b', 'i', 'font', 'size', 'color', 'div', 'span', 'class',
+        'sales', 'mean', 'jumpscare', 'pra', 'tá', 'né', 'ok', 'vc', 'pq'
+    )
+
+    def __init__(self, load_dictionary=True):
         self.spell = None
         self.glossary = {}
-        self._init_spellchecker()
+        self.glossary_matcher = None
+        # Versões usadas na chave do cache de auditoria por linha
+        self.glossary_version = 0
+        self.dict_version = 0
+        self._row_cache = {}
+        self.added_words = []  # Palavras adicionadas na sessão (repassadas aos workers)
+        # Cache de veredito por palavra (conhecida/desconhecida); limpo quando o dicionário muda
+        self._word_known = lru_cache(maxsize=self.WORD_CACHE_SIZE)(self._check_word)
+        self._dict_lock = threading.Lock()
+        self.dict_loading = False
+        self.load_times = {}  # Etapa -> segundos (abrir ou compilar o dicionário)
+        if load_dictionary: self.spell = self._init_spellchecker()
 
-    def _init_spellchecker(self):
-        if SPELL_AVAILABLE:
-            try:
-                # Localiza o dicionário
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                src_dir = os.path.dirname(current_dir)
-                dict_path = os.path.join(src_dir, "pt_BR.json.gz")
-                
-                # Tenta carregar o local primeiro, depois o resource (para exe)
-                final_path = None
-                if os.path.exists(dict_path):
-                    final_path = dict_path
-                else:
-                    alt_path = resource_path(os.path.join("src", "pt_BR.json.gz"))
-                    if os.path.exists(alt_path):
-                        final_path = alt_path
-
-                if final_path:
-                    self.spell = SpellChecker(language=None, local_dictionary=final_path)
-                    print(f"✅ Dicionário PT-BR carregado: {final_path}")
-                else:
-                    print("⚠️ Dicionário não encontrado. Usando padrão.")
-                    self.spell = SpellChecker(language='pt')
-                
-                # Whitelist técnica
-                whitelist = [
-                    'ena', 'moony', 'turrón', 'turron', 'phr', 'cg', 'ui', 'style', 
-                    'br', 'b', 'i', 'font', 'size', 'color', 'div', 'span', 'class',
-                    'sales', 'mean', 'jumpscare', 'pra', 'tá', 'né', 'ok', 'vc', 'pq'
-                ]
-                self.spell.word_frequency.load_words(whitelist)
-                
-            except Exception as e:
-                print(f"❌ Erro no corretor: {e}")
-                self.spell = None
+    def load_dictionary_async(self, on_ready=None):
+        """
+        Carrega o dicionário em uma thread. Até terminar, self.spell é None e a ortografia
+        fica desativada; palavras adicionadas nesse meio tempo entram quando ele ficar pronto.
+        on_ready() roda na thread de carregamento (use root.after para tocar no Tk).
+        """
+        if self.dict_loading or self.spell or not SPELL_AVAILABLE: return False
+        self.dict_loading = True
+        threading.Thread(target=self._load_dictionary, args=(on_ready,), daemon=True).start()
+        return True
+
+    def _load_dictionary(self, on_ready):
+        spell = self._init_spellchecker()
+        with self._dict_lock:
+            if spell and self.added_words: spell.load_words(self.added_words)
+            self.spell = spell
+            self.dict_loading = False
+            self.dict_version += 1
+        self._word_known.cache_clear()
+        if on_ready: on_ready()
 
-    def load_glossary(self):
-        filename = filedialog.askopenfilename(title="Carregar Glossário", filetypes=[("JSON Files", "*.json")])
-        if not filename: return False
+    def _init_spellchecker(self):
+        """Abre (ou compila) o dicionário PT-BR com a whitelist; None se indisponível."""
+        source = dictionary_source()
+        if source is None:
+            print("⚠️ Dicionário não encontrado. Ortografia desativada.", file=sys.stderr)
+            return None
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    self.glossary = data
-                    return len(self.glossary)
-                else:
-                    messagebox.showerror("Erro", "JSON inválido.")
+            t0 = time.perf_counter()
+            spell, compiled = CompiledDictionary.load(SPELL_DICT_FILE, source, self.WHITELIST)
+            self.load_times["compile" if compiled else "open"] = time.perf_counter() - t0
+            if compiled: print(f"✅ Dicionário compilado: {source} -> {SPELL_DICT_FILE}", file=sys.stderr)
+            return spell
         except Exception as e:
-            messagebox.showerror("Erro", f"Falha ao ler: {e}")
-        return False
+            print(f"❌ Erro no corretor: {e}", file=sys.stderr)
+            return None
+
+    def load_glossary_file(self, filename):
+        """Carrega um glossário JSON {termo: tradução}. Retorna a quantidade ou None se o JSON não for um dict."""
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict): return None
+        self.set_glossary(data)
+        return len(self.glossary)
+
+    def set_glossary(self, data):
+        """Troca o glossário e compila o automato usado na validação."""
+        self.glossary = data
+        self.glossary_matcher = GlossaryMatcher(data) if data else None
+        self.glossary_version += 1
 
+    def add_words(self, words):
+        """Adiciona palavras ao dicionário em memória (invalida o cache de auditoria)."""
+        with self._dict_lock:
+            if not self.spell and not self.dict_loading: return
+            self.added_words.extend(words)
+            if not self.spell: return  # Entram quando o dicionário terminar de carregar
+            self.spell.load_words(words)
+            self.dict_version += 1
+        self._word_known.cache_clear()
+
+    def audit_line(self, original, translation, checks):
+        """
+        Roda todas as validações ativas. checks = (tags, ortografia, gramática).
+        """
+        do_tags, do_spell, do_grammar = checks
+        return AuditResult(
+            self.validate_glossary(original, translation),
+            self.validate_tags(original, translation) if do_tags else None,
+            self.check_spelling(translation) if do_spell else None,
+            self.check_grammar_issues(translation, original) if do_grammar else None)
+
+    def audit_row(self, idx, original, translation, checks):
+        """
+        Versão memoizada de audit_line. A entrada da linha só é recalculada quando
+        muda o texto, o original, o glossário, o dicionário ou as validações ativas.
+        """
+        key = self.cache_key(original, translation, checks)
+        hit = self._row_cache.get(idx)
+        if hit is not None and hit[0] == key: return hit[1]
+        res = self.audit_line(original, translation, checks)
+        self._row_cache[idx] = (key, res)
+        return res
+
+    def cache_key(self, original, translation, checks):
+        return (translation, original, self.glossary_version, self.dict_version, checks)
+
+    def is_cached(self, idx, key):
+        hit = self._row_cache.get(idx)
+        return hit is not None and hit[0] == key
+
+    def store_result(self, idx, key, result):
+        """Grava no cache um resultado calculado fora (ex.: AuditEngine)."""
+        self._row_cache[idx] = (key, result)
+
+    def clear_audit_cache(self): self._row_cache.clear()
+
+    @timed()
     def validate_glossary(self, original, translation):
-        if not self.glossary: return []
-        issues = []
-        original_lower = original.lower()
-        trans_lower = translation.lower()
-        trans_norm = remove_accents(translation).lower()
-        for src, tgt in self.glossary.items():
-            if src.lower() in original_lower:
-                if tgt in translation: continue
-                if tgt.lower() in trans_lower:
-                    issues.append(f"Glossário: '{tgt}' (Maiúsc/Minúsc incorreta)")
-                    continue
-                tgt_norm = remove_accents(tgt).lower()
-                if tgt_norm in trans_norm:
-                    issues.append(f"Glossário: '{tgt}' (Acentuação incorreta)")
-                    continue
-                issues.append(f"Glossário: Falta '{tgt}'")
-        return issues
+        if not self.glossary_matcher: return []
+        return self.glossary_matcher.validate(original, translation)
 
     def validate_tags(self, original, translation):
         if translation.count('<') != translation.count('>'): return "Tags quebradas (< >)", "tag_err"
-        c_orig = Counter(re.findall(r'<[^>]+>', original))
-        c_trans = Counter(re.findall(r'<[^>]+>', translation))
-        if c_orig == c_trans: return "Tags OK", "tag_ok"
+        if '<' not in original and '<' not in translation: return "Tags OK", "tag_ok"
+        if Counter(tags(original)) == Counter(tags(translation)): return "Tags OK", "tag_ok"
         return "Tags diferentes ou faltando", "tag_warn"
 
+    PUNCT_MARKS = frozenset(".,;:?!")
+    REPEAT_MARKS = frozenset("!?:;")
+
+    def grammar_marks(self, text):
+        """
+        Problemas de espaço/pontuação com posição: lista de (tipo, início, fim).
+        Tipos: double_space, missing_space, space_before, repeated. O conteúdo das tags é ignorado.
+        """
+        marks = []
+        if '  ' not in text and not any(c in text for c in self.PUNCT_MARKS): return marks
+        marks_p = self.PUNCT_MARKS
+        k2 = k1 = t1 = s1 = None  # Os dois trechos anteriores (tipo, texto, início)
+        for kind, start, end, tok in tokenize(text):
+            if kind == SPACE:
+                if '  ' in tok: marks.append(("double_space", start, end))
+            elif k1 == PUNCT and t1 in marks_p:
+                # 'Olá.Tudo' (número e reticências são aceitos)
+                if kind in WORD_KINDS:
+                    if not tok[0].isdigit(): marks.append(("missing_space", s1, start + 1))
+                elif kind == PUNCT and tok == t1 and tok in self.REPEAT_MARKS:
+                    marks.append(("repeated", s1, end))
+            if kind == PUNCT and tok in marks_p and k1 == SPACE and k2 in WORD_KINDS:
+                marks.append(("space_before", s1, end))
+            k2, k1, t1, s1 = k1, kind, tok, start
+        return marks
+
     def check_grammar_issues(self, text, original):
-        if re.search(r' {2,}', text): return "Gramática: Espaços duplos."
-        if re.search(r'[\.,;:\?!](?!\s|$|\d|\.)\w', text): return "Pontuação: Falta espaço."
-        if re.search(r'\w\s+[\.,;:\?!]', text): return "Pontuação: Espaço antes."
-        if re.search(r'([!?:;])\1+', text) and not re.search(r'([!?:;])\1+', original): return "Pontuação repetida."
+        found = {kind for kind, _, _ in self.grammar_marks(text)}
+        if "double_space" in found: return "Gramática: Espaços duplos."
+        if "missing_space" in found: return "Pontuação: Falta espaço."
+        if "space_before" in found: return "Pontuação: Espaço antes."
+        if "repeated" in found and not any(k == "repeated" for k, _, _ in self.grammar_marks(original)): return "Pontuação repetida."
         return None
 
     # --- LÓGICA INTELIGENTE DE SUFIXOS ---
@@ -135,47 +284,46 @@ class AuditManager:
 
     def check_spelling(self, text):
         if not self.spell: return None
+        return [word for _, _, word in self.misspelled_spans(text)]
+
+    def misspelled_spans(self, text, window=None):
+        """
+        (início, fim, palavra) de cada palavra desconhecida (tags e seu conteúdo são ignorados).
+        window=(ini, fim) limita a verificação às palavras que tocam esse trecho.
+        """
+        if not self.spell: return []
+        known = self._word_known
+        lo, hi = window if window is not None else (0, len(text))
+        return [(start, end, tok) for kind, start, end, tok in tokenize(text)
+                if kind in WORD_KINDS and end > lo and start < hi and not known(tok.lower())]
+
+    def _check_word(self, w_lower):
+        """Veredito de uma palavra (já em minúsculas). Memoizado em self._word_known."""
+        # 1. Filtros básicos
+        if len(w_lower) < 2: return True
+        if any(c.isdigit() for c in w_lower): return True
         
-        # Limpa tags HTML
-        clean_text = re.sub(r'<[^>]+>', ' ', text)
-        # Regex que pega palavras compostas com hífen
-        raw_words = re.findall(r'\b[\w-]+\b', clean_text)
-        
-        unknowns = []
+        # 2. Checagem Direta (Dicionário)
+        if w_lower in self.spell: return True
         
-        for word in raw_words:
-            w_lower = word.lower()
-            
-            # 1. Filtros básicos
-            if len(w_lower) < 2: continue 
-            if any(c.isdigit() for c in w_lower): continue
-            
-            # 2. Checagem Direta (Dicionário)
-            if w_lower in self.spell: continue 
-            
-            # 3. Tratamento de Hifens (Verbos ênclise)
-            # Ex: ajudá-lo
-            if '-' in w_lower:
-                parts = w_lower.split('-')
-                all_parts_ok = True
-                for part in parts:
-                    if len(part) < 2: continue
-                    # Aceita pronomes oblíquos comuns ou se a parte existe no dic
-                    if part not in self.spell and part not in ['lo', 'la', 'los', 'las', 'no', 'na', 'nos', 'nas', 'lho', 'lha', 'me', 'te', 'se', 'lhe']:
-                        all_parts_ok = False
-                        break
-                if all_parts_ok: continue
-
-            # 4. Tratamento de Plural Simples
-            if w_lower.endswith('s'):
-                singular = w_lower[:-1]
-                if singular in self.spell: continue
-
-            # 5. Tratamento de Sufixos (Aumentativo, Diminutivo, Mente)
-            if self._is_valid_suffix(w_lower):
-                continue
-
-            # Se falhou em tudo, é erro
-            unknowns.append(word)
-                
-        return unknowns
\ No newline at end of file
+        # 3. Tratamento de Hifens (Verbos ênclise)
+        # Ex: ajudá-lo
+        if '-' in w_lower:
+            parts = w_lower.split('-')
+            all_parts_ok = True
+            for part in parts:
+                if len(part) < 2: continue
+                # Aceita pronomes oblíquos comuns ou se a parte existe no dic
+                if part not in self.spell and part not in ['lo', 'la', 'los', 'las', 'no', 'na', 'nos', 'nas', 'lho', 'lha', 'me', 'te', 'se', 'lhe']:
+                    all_parts_ok = False
+                    break
+            if all_parts_ok: return True
+
+        # 4. Tratamento de Plural Simples
+        if w_lower.endswith('s'):
+            singular = w_lower[:-1]
+            if singular in self.spell: return True
+
+        # 5. Tratamento de Sufixos (Aumentativo, Diminutivo, Mente)
+        # Se falhou em tudo, é erro
+        return self._is_valid_suffix(w_lower)
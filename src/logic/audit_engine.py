@@ -0,0 +1,102 @@
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .audit import AuditManager, SPELL_AVAILABLE, compile_dictionary
+
+# --- Lado do worker (processo separado) ---
+_worker = None
+
+def _init_worker(glossary, extra_words, spell):
+    """
+    Cada processo monta seu próprio AuditManager; o dicionário compilado é mapeado (páginas
+    compartilhadas) e só é aberto com a ortografia ativa.
+    """
+    global _worker
+    _worker = AuditManager(load_dictionary=spell)
+    if glossary: _worker.set_glossary(glossary)
+    if extra_words: _worker.add_words(extra_words)
+
+def _audit_chunk(chunk, checks):
+    return [(idx, _worker.audit_line(orig, text, checks)) for idx, orig, text in chunk]
+
+class AuditEngine:
+    """
+    Auditoria do arquivo inteiro (glossário, tags, ortografia e gramática) em um
+    ProcessPoolExecutor. A tabela é dividida em blocos; os resultados voltam em
+    streaming e preenchem o cache de auditoria por linha do AuditManager, que é
+    o mesmo usado pelos filtros da lista.
+    Os callbacks são chamados na thread de despacho (use root.after para tocar no Tk).
+    """
+    CHUNK = 500
+
+    def __init__(self, audit_manager, workers=None):
+        self.audit_manager = audit_manager
+        self.workers = workers or os.cpu_count() or 1
+        self.cancelled = False
+        self.running = False
+        self._executor = None
+
+    def start(self, rows, checks, on_progress=None, on_done=None):
+        """
+        rows: lista de (id, original, tradução). Linhas já em cache são puladas.
+        on_progress(feitos, total, último_id) e on_done(stats) são opcionais.
+        """
+        am = self.audit_manager
+        todo, keys, errors = [], {}, 0
+        for idx, orig, text in rows:
+            key = am.cache_key(orig, text, checks)
+            if am.is_cached(idx, key):
+                if am.audit_row(idx, orig, text, checks).has_errors: errors += 1
+                continue
+            todo.append((idx, orig, text)); keys[idx] = key
+        self.cancelled = False
+        self.running = True
+        args = (todo, keys, checks, len(rows), errors, on_progress, on_done)
+        t = threading.Thread(target=self._dispatch, args=args, daemon=True)
+        t.start()
+        return t
+
+    def run(self, rows, checks, on_progress=None):
+        """Versão bloqueante de start() (CLI/benchmarks). Retorna as estatísticas."""
+        out = {}
+        self.start(rows, checks, on_progress, out.update).join()
+        return out
+
+    def _dispatch(self, todo, keys, checks, total, errors, on_progress, on_done):
+        t0 = time.perf_counter()
+        am = self.audit_manager
+        done = total - len(todo)
+        failure = None
+        chunks = [todo[i:i + self.CHUNK] for i in range(0, len(todo), self.CHUNK)]
+        try:
+            if chunks:
+                # Compila uma vez aqui, antes dos workers (senão cada um compilaria a sua cópia)
+                spell = bool(checks[1] and SPELL_AVAILABLE)
+                if spell: compile_dictionary()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(chunks)), initializer=_init_worker,
+                    initargs=(am.glossary, list(am.added_words), spell))
+                futures = [self._executor.submit(_audit_chunk, c, checks) for c in chunks]
+                for fut in as_completed(futures):
+                    if self.cancelled: break
+                    results = fut.result()
+                    for idx, res in results:
+                        am.store_result(idx, keys[idx], res)
+                        if res.has_errors: errors += 1
+                    done += len(results)
+                    if on_progress: on_progress(done, total, results[-1][0])
+        except Exception as e:
+            failure = str(e)
+        finally:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self.running = False
+        if on_done:
+            on_done({"total": total, "audited": len(todo), "done": done, "errors": errors,
+                     "elapsed": time.perf_counter() - t0, "cancelled": self.cancelled,
+                     "workers": self.workers, "failure": failure})
+
+    def cancel(self):
+        self.cancelled = True
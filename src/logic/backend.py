@@ -1,25 +1,97 @@
 import os
 import re
 import json
+import time
+import random
+import threading
+from importlib.util import find_spec
+from .base_index import BaseFileIndex
+from .mt_cache import MTCache
+from .row_store import RowStore
+from ..config import MT_PROVIDER
 
-try:
-    from deep_translator import GoogleTranslator
-    MT_AVAILABLE = True
-except ImportError:
-    MT_AVAILABLE = False
+# deep_translator (e a pilha HTTP) só é importado quando o tradutor é usado pela primeira vez
+MT_AVAILABLE = find_spec("deep_translator") is not None
+
+class LocalTranslator:
+    """
+    Tradutor simulado (sem rede) com a mesma interface do GoogleTranslator.
+    Latência e taxa de falha configuráveis; usado para medir vazão e cancelamento offline.
+    """
+    def __init__(self, latency=0.05, fail_rate=0.0, seed=None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate(self, text):
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.fail_rate
+        if self.latency: time.sleep(self.latency)
+        if fail: raise ConnectionError("Falha simulada do provedor")
+        return f"[pt] {text}"
 
 class TranslationManager:
-    def __init__(self):
-        self.translator = None
-        if MT_AVAILABLE:
+    """
+    Tradutor automático com cache em disco. O provedor é criado no primeiro uso
+    (ou por preload(), em segundo plano), não na abertura do programa.
+    """
+    def __init__(self, cache_path=None, target='pt', provider=None):
+        self.target = target
+        self._translator = provider
+        self._failed = False
+        self._lock = threading.Lock()
+        self.load_times = {}  # Etapa -> segundos (importação do pacote, criação do provedor)
+        # Cache em disco (SQLite) compartilhado entre IDs com o mesmo original e entre sessões
+        self.cache = MTCache(cache_path, target) if cache_path else None
+
+    @property
+    def translator(self):
+        if self._translator is None and not self._failed:
+            with self._lock:
+                if self._translator is None and not self._failed: self._create()
+        return self._translator
+
+    def _create(self):
+        if MT_PROVIDER == "local": self._translator = LocalTranslator()
+        elif MT_AVAILABLE:
             try:
-                self.translator = GoogleTranslator(source='auto', target='pt')
+                t0 = time.perf_counter()
+                from deep_translator import GoogleTranslator
+                t1 = time.perf_counter()
+                self._translator = GoogleTranslator(source='auto', target=self.target)
+                self.load_times.update({"import": t1 - t0, "init": time.perf_counter() - t1})
             except Exception as e:
                 print(f"Erro ao iniciar tradutor: {e}")
+        if self._translator is None: self._failed = True
+
+    def preload(self):
+        """Cria o provedor agora (chamar fora da thread do Tk). Devolve se ficou disponível."""
+        return self.translator is not None
+
+    @property
+    def available(self):
+        """Sem criar o provedor: se o pacote existe (ou o provedor local) e a criação não falhou."""
+        if self._translator is not None: return True
+        return not self._failed and (MT_PROVIDER == "local" or MT_AVAILABLE)
+
+    def cached(self, text):
+        """Tradução já conhecida (sem chamar o tradutor), ou None."""
+        return self.cache.get(text) if self.cache is not None else None
 
     def translate(self, text):
+        hit = self.cached(text)
+        if hit is not None: return hit
         if not self.translator: return "Erro: Biblioteca não disponível"
-        return self.translator.translate(text)
+        res = self.translator.translate(text)
+        if res: res = res.strip()  # O mesmo texto que uma consulta ao cache devolveria depois
+        if self.cache is not None and res: self.cache.put(text, res)
+        return res
+
+    def close(self):
+        if self.cache is not None: self.cache.close()
 
 class FileManager:
     @staticmethod
@@ -47,11 +119,86 @@ class FileManager:
         return data
 
     @staticmethod
-    def save_session(filepath, data):
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception: pass
+    def _unquote(raw):
+        raw = raw.strip()
+        return raw[1:-1] if (len(raw) >= 2 and raw.startswith('"') and raw.endswith('"')) else raw
+
+    @staticmethod
+    def parse_translation_lines(lines, id_range=None):
+        """
+        Lê um arquivo de tradução e devolve {id: texto}.
+        Aceita o formato exportado ([id] + '1 string data') ou um dump completo.
+        Com id_range=(min, max) só aceita blocos [id] dentro do intervalo (importação parcial).
+        """
+        id_pat = re.compile(r'^\s*\[(\d+)\]')
+        data_pat = re.compile(r'^\s*1 string data = (.*)$')
+        updates = {}
+        if id_range is None and not any(id_pat.match(l) for l in lines):
+            for k, v in FileManager.parse_file_to_dict(lines).items(): updates[k] = v["text"]
+            return updates
+        mn, mx = id_range if id_range else (float("-inf"), float("inf"))
+        curr = -1
+        for l in lines:
+            m = id_pat.match(l)
+            if m: curr = int(m.group(1)); continue
+            if curr != -1 and mn <= curr <= mx:
+                m2 = data_pat.match(l)
+                if m2:
+                    updates[curr] = FileManager._unquote(m2.group(1))
+                    curr = -1
+        return updates
+
+    @staticmethod
+    def new_entry(item):
+        """Linha nova da tabela de traduções a partir de um item do parser/índice."""
+        return {"original": item["text"], "translated": item["text"], "has_quotes": item["quotes"],
+                "mt_cache": None, "original_line": item["original_line"],
+                "history": [{"time": "Original", "text": item["text"]}], "source_file": None, "ignore_errors": False}
+
+    @staticmethod
+    def build_translations(index, previous=None):
+        """Monta a tabela (RowStore) a partir do índice; com previous, mantém o trabalho das linhas existentes."""
+        new_dict = RowStore()
+        for idx, text, quotes, line in index.rows():
+            if not previous or idx not in previous:
+                new_dict.add(idx, text, line, quotes)
+                continue
+            entry = FileManager.new_entry({"text": text, "quotes": quotes, "original_line": line})
+            old = previous[idx]
+            entry.update({"translated": old["translated"], "history": previous.packed_history(idx) or entry["history"],
+                          "source_file": old.get("source_file"), "ignore_errors": old.get("ignore_errors", False),
+                          "mt_cache": old.get("mt_cache")})
+            new_dict[idx] = entry
+        return new_dict
+
+    @staticmethod
+    def apply_updates(translations, updates, source):
+        """Aplica {id: texto}; devolve os IDs que realmente mudaram."""
+        changed = []
+        for k, v in updates.items():
+            row = translations.get(k)
+            if row is not None and row["translated"] != v:
+                row["translated"] = v
+                row["source_file"] = source
+                changed.append(k)
+        return changed
+
+    @staticmethod
+    def write_selection(filepath, translations, ids_list):
+        """Exporta as linhas escolhidas no formato [id] + '1 string data'."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for idx in ids_list:
+                if idx in translations:
+                    data = translations[idx]
+                    content = data["translated"]
+                    if data["has_quotes"]: content = f'"{content}"'
+                    f.write(f"[{idx}]\n")
+                    f.write(f"\t1 string data = {content}\n\n")
+
+    @staticmethod
+    def index_base_file(filepath, use_mmap=True):
+        """Indexa o arquivo base em streaming (sem readlines); textos são lidos sob demanda."""
+        return BaseFileIndex(filepath, use_mmap=use_mmap)
 
     @staticmethod
     def load_session(filepath):
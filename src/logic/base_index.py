@@ -0,0 +1,94 @@
+import re
+import mmap
+from array import array
+
+class BaseFileIndex:
+    """
+    Índice compacto das linhas '1 string data' de um dump Unity.
+    Uma única passada (regex em C sobre o arquivo mapeado) guarda apenas
+    número da linha e offsets em bytes do valor; o resto do arquivo (usado
+    pelo salvamento) é lido sob demanda, sem manter as linhas em memória.
+    Os textos originais são decodificados uma vez, direto para a tabela
+    (ver rows()): a lista, a busca e a auditoria leem todos eles de qualquer forma.
+    """
+    # Literal no início deixa o regex usar busca rápida; [^\r\n] já descarta o \r do CRLF
+    STRING_PATTERN = re.compile(rb'\n[ \t]*1 string data = ([^\r\n]*)')
+    VALUES_MARKER = b"vector values"
+
+    def __init__(self, filepath, use_mmap=True):
+        self.filepath = filepath
+        self._file = None
+        self._buf = None
+        self.line_numbers = array('i')  # ID -> número da linha no arquivo
+        self.starts = array('q')        # ID -> offset do início do valor
+        self.ends = array('q')          # ID -> offset do fim do valor (sem \r\n)
+        self._open(use_mmap)
+        self._build()
+
+    def _open(self, use_mmap):
+        self._file = open(self.filepath, 'rb')
+        if use_mmap:
+            try:
+                self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                return
+            except (ValueError, OSError): pass  # Arquivo vazio ou FS sem suporte
+        self._buf = self._file.read()
+        self._file.close(); self._file = None
+
+    def _build(self):
+        buf = self._buf
+        marker = buf.find(self.VALUES_MARKER)
+        if marker < 0: return
+        # Começa na linha que contém o primeiro "vector values" (mesma regra do parser antigo)
+        pos = buf.rfind(b"\n", 0, marker) + 1
+        line_num = buf[:pos].count(b"\n")
+        last = pos
+        add_line, add_start, add_end = self.line_numbers.append, self.starts.append, self.ends.append
+        for m in self.STRING_PATTERN.finditer(buf, max(pos - 1, 0)):
+            s, e = m.span(1)
+            line_num += buf[last:s].count(b"\n")
+            last = s
+            add_line(line_num); add_start(s); add_end(e)
+
+    def __len__(self): return len(self.starts)
+
+    @property
+    def buffer(self): return self._buf
+
+    @property
+    def size(self): return len(self._buf) if self._buf is not None else 0
+
+    def raw_bytes(self, idx):
+        return self._buf[self.starts[idx]:self.ends[idx]]
+
+    def entry(self, idx):
+        """Retorna o item no mesmo formato de FileManager.parse_file_to_dict."""
+        raw_text = self.raw_bytes(idx).decode('utf-8').strip()
+        has_quotes = False
+        clean_text = raw_text
+        if len(raw_text) >= 2 and raw_text.startswith('"') and raw_text.endswith('"'):
+            clean_text = raw_text[1:-1]
+            has_quotes = True
+        return {"text": clean_text, "quotes": has_quotes, "original_line": self.line_numbers[idx]}
+
+    def text(self, idx): return self.entry(idx)["text"]
+
+    def iter_entries(self):
+        for idx in range(len(self)): yield idx, self.entry(idx)
+
+    def rows(self):
+        """(id, texto, tem aspas, nº da linha) de cada entrada, sem montar o dict de entry()."""
+        buf, starts, ends, lines = self._buf, self.starts, self.ends, self.line_numbers
+        for idx in range(len(starts)):
+            raw = buf[starts[idx]:ends[idx]].decode('utf-8').strip()
+            if len(raw) >= 2 and raw[0] == '"' and raw[-1] == '"': yield idx, raw[1:-1], True, lines[idx]
+            else: yield idx, raw, False, lines[idx]
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap): self._buf.close()
+        self._buf = None
+        if self._file: self._file.close(); self._file = None
+
+    def __del__(self):
+        try: self.close()
+        except Exception: pass
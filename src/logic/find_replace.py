@@ -0,0 +1,88 @@
+import re
+
+class FindReplaceEngine:
+    """
+    Localizar/Substituir sobre as traduções da RowStore.
+    No modo texto (e com 'Palavra inteira'), o TextIndex reduz as linhas candidatas
+    às que têm todos os trigramas do termo; no modo regex todas as linhas são candidatas.
+    Substituir tudo é feito em duas fases: plan() calcula todos os textos novos sem
+    alterar nada (um erro no padrão ou na substituição não deixa nada pela metade) e
+    apply() grava o lote inteiro de uma vez.
+    """
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @staticmethod
+    def compile(pattern, case=False, whole=False, regex=False):
+        """Padrão compilado; no modo regex um padrão inválido levanta re.error."""
+        flags = 0 if case else re.IGNORECASE
+        if not regex: pattern = re.escape(pattern)
+        if whole: pattern = r'\b(?:' + pattern + r')\b'
+        return re.compile(pattern, flags)
+
+    @staticmethod
+    def template(repl, regex=False):
+        """No modo texto a substituição é literal (barras invertidas não são grupos)."""
+        return repl if regex else repl.replace('\\', r'\\')
+
+    def candidates(self, literal=None):
+        """IDs a testar, na ordem da lista. literal = termo do modo texto (None no modo regex)."""
+        cand = self.index.candidates_for(literal) if literal else None
+        return sorted(cand) if cand is not None else list(self.table.keys())
+
+    def matches(self, rx, literal=None):
+        """(id, tradução) das linhas cuja tradução casa com o padrão."""
+        texts = self.table.texts
+        for idx in self.candidates(literal):
+            t = texts(idx)
+            if t is not None and rx.search(t[1]): yield idx, t[1]
+
+    def find_next(self, rx, after=None, literal=None):
+        """Primeira linha depois de 'after' (dando a volta na lista) com ocorrência: (id, match) ou None."""
+        cand = self.candidates(literal)
+        if after is not None:
+            # Em ordem crescente de ID: começa logo depois de 'after'
+            split = next((i for i, idx in enumerate(cand) if idx > after), len(cand))
+            cand = cand[split:] + cand[:split]
+        texts = self.table.texts
+        for idx in cand:
+            t = texts(idx)
+            if t is None: continue
+            m = rx.search(t[1])
+            if m: return idx, m
+        return None
+
+    def plan(self, rx, repl, literal=None):
+        """[(id, texto antigo, texto novo, nº de ocorrências)] sem alterar a tabela."""
+        out = []
+        texts = self.table.texts
+        for idx in self.candidates(literal):
+            t = texts(idx)
+            if t is None: continue
+            new, n = rx.subn(repl, t[1])
+            if n and new != t[1]: out.append((idx, t[1], new, n))
+        return out
+
+    def preview(self, rx, repl=None, literal=None):
+        """{'rows', 'matches'}: quantas linhas e ocorrências seriam afetadas."""
+        if repl is not None:
+            changes = self.plan(rx, repl, literal)
+            return {"rows": len(changes), "matches": sum(c[3] for c in changes)}
+        rows = matches = 0
+        for _, text in self.matches(rx, literal):
+            rows += 1
+            matches += sum(1 for _ in rx.finditer(text))
+        return {"rows": rows, "matches": matches}
+
+    def apply(self, changes):
+        """Grava o lote calculado por plan() e atualiza o índice de uma vez. Devolve os IDs alterados."""
+        ids = []
+        texts = self.table.texts
+        for idx, old, new, _ in changes:
+            t = texts(idx)
+            if t is None or t[1] != old: continue  # Mudou desde o plan()
+            self.table[idx]["translated"] = new
+            ids.append(idx)
+        self.index.update_many(ids)
+        return ids
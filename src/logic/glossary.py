@@ -0,0 +1,81 @@
+from collections import deque
+from ..config import remove_accents
+
+class AhoCorasick:
+    """
+    Automato de Aho-Corasick simples (transições em dict).
+    find_ids(text) devolve os índices de todos os padrões contidos em text
+    com uma única passada pelo texto, independente da quantidade de padrões.
+    """
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self.always = frozenset(i for i, p in enumerate(patterns) if not p)  # "" está em qualquer texto
+        outputs = [[]]
+        for pid, pat in enumerate(patterns):
+            if not pat: continue
+            node = 0
+            for ch in pat:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({}); self.fail.append(0); outputs.append([])
+                node = nxt
+            outputs[node].append(pid)
+
+        # BFS: calcula links de falha e herda as saídas do sufixo
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]: f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0) if self.goto[f].get(ch) != nxt else 0
+                outputs[nxt].extend(outputs[self.fail[nxt]])
+        self.out = [tuple(o) for o in outputs]
+
+    def find_ids(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        hits = set(self.always)
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]: node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]: hits.update(out[node])
+        return hits
+
+class GlossaryMatcher:
+    """
+    Glossário compilado: um automato para os termos de origem (minúsculos) e dois
+    para as traduções recomendadas (minúsculas e sem acento). Mantém exatamente as
+    mensagens e a ordem do validate_glossary original.
+    """
+    def __init__(self, glossary):
+        self.entries = list(glossary.items())
+        self.sources = AhoCorasick([src.lower() for src, _ in self.entries])
+        self.targets_lower = AhoCorasick([tgt.lower() for _, tgt in self.entries])
+        self.targets_norm = AhoCorasick([remove_accents(tgt).lower() for _, tgt in self.entries])
+
+    def __len__(self): return len(self.entries)
+
+    def validate(self, original, translation):
+        hits = self.sources.find_ids(original.lower())
+        if not hits: return []
+        issues = []
+        lower_hits = self.targets_lower.find_ids(translation.lower())
+        norm_hits = None
+        for i in sorted(hits):
+            tgt = self.entries[i][1]
+            if i in lower_hits:
+                if tgt in translation: continue
+                issues.append(f"Glossário: '{tgt}' (Maiúsc/Minúsc incorreta)")
+                continue
+            if norm_hits is None: norm_hits = self.targets_norm.find_ids(remove_accents(translation).lower())
+            if i in norm_hits:
+                issues.append(f"Glossário: '{tgt}' (Acentuação incorreta)")
+                continue
+            issues.append(f"Glossário: Falta '{tgt}'")
+        return issues
@@ -0,0 +1,202 @@
+from collections import OrderedDict, deque
+from ..config import HISTORY_MAX_VERSIONS, HISTORY_KEYFRAME, HISTORY_BUDGET, SESSION_LOG_SIZE
+
+def _diff(a, b):
+    """(prefixo comum, sufixo comum, trecho novo do meio) para transformar a em b."""
+    # Busca binária com comparação de fatias (feita em C) em vez de caractere a caractere
+    n = min(len(a), len(b))
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]: lo = mid
+        else: hi = mid - 1
+    p = lo
+    lo, hi = 0, n - p
+    la, lb = len(a), len(b)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:] == b[lb - mid:]: lo = mid
+        else: hi = mid - 1
+    return p, lo, b[p:lb - lo]
+
+def _apply(text, e):
+    _, p, s, mid = e
+    return text[:p] + mid + text[len(text) - s:]
+
+class HistoryStore:
+    """
+    Versões de texto por chave (linha). Cada versão é guardada como diferença para a
+    anterior, (hora, prefixo, sufixo, meio); a cada 'keyframe' versões, ou quando a diferença
+    não compensa, a versão vai inteira, (hora, texto). Reconstruir uma versão custa no máximo
+    'keyframe' passos.
+    Os números de versão são absolutos: descartar as mais antigas não muda os das outras
+    (o Log Global aponta para eles).
+    Com o total acima de 'budget', descarta as versões mais antigas das linhas editadas
+    há mais tempo; a última versão de cada linha nunca é descartada.
+    Formato serializado: [base, entrada, entrada, ...] com as entradas como listas.
+    """
+    OVERHEAD = 80  # Bytes estimados por versão além do texto
+
+    def __init__(self, keyframe=HISTORY_KEYFRAME, max_versions=HISTORY_MAX_VERSIONS, budget=HISTORY_BUDGET):
+        self.keyframe = max(1, keyframe)
+        self.max_versions = max(1, max_versions)
+        self.budget = budget
+        self._chains = {}          # chave -> [base, entradas]
+        self._lru = OrderedDict()  # chaves com mais de uma versão, da edição mais antiga para a mais nova
+        self.bytes = 0
+
+    def _cost(self, e): return self.OVERHEAD + len(e[1] if len(e) == 2 else e[3])
+
+    def _text(self, entries, i):
+        k = i
+        while len(entries[k]) != 2: k -= 1
+        text = entries[k][1]
+        for j in range(k + 1, i + 1): text = _apply(text, entries[j])
+        return text
+
+    def count(self, key):
+        chain = self._chains.get(key)
+        return len(chain[1]) if chain else 0
+
+    def add(self, key, text, time, original=None):
+        """
+        Acrescenta 'text' como nova versão (se diferente da última) e devolve o número dela.
+        Uma linha sem histórico começa com ('Original', original). Devolve None se nada mudou.
+        """
+        chain = self._chains.get(key)
+        if chain is None:
+            chain = self._chains[key] = [0, []]
+            if original is not None:
+                chain[1].append(("Original", original))
+                self.bytes += self._cost(chain[1][0])
+        entries = chain[1]
+        if entries:
+            last = self._text(entries, len(entries) - 1)
+            if last == text: return None
+            since = next(n for n, e in enumerate(reversed(entries)) if len(e) == 2)
+            p, s, mid = _diff(last, text)
+            e = (time, text) if since + 1 >= self.keyframe or len(mid) * 2 >= len(text) else (time, p, s, mid)
+        else: e = (time, text)
+        entries.append(e)
+        self.bytes += self._cost(e)
+        while len(entries) > self.max_versions: self._drop_first(key)
+        if len(entries) > 1:
+            self._lru[key] = None
+            self._lru.move_to_end(key)
+        self._enforce_budget()
+        return chain[0] + len(entries) - 1
+
+    def _drop_first(self, key):
+        chain = self._chains[key]
+        entries = chain[1]
+        if len(entries) > 1 and len(entries[1]) != 2:
+            # A segunda versão vira keyframe antes de perder a base
+            new = (entries[1][0], self._text(entries, 1))
+            self.bytes += self._cost(new) - self._cost(entries[1])
+            entries[1] = new
+        self.bytes -= self._cost(entries.pop(0))
+        chain[0] += 1
+        if len(entries) <= 1: self._lru.pop(key, None)
+
+    def _enforce_budget(self):
+        while self.bytes > self.budget and self._lru:
+            self._drop_first(next(iter(self._lru)))
+
+    def versions(self, key):
+        """[(nº, hora, texto)] reconstruídas, da mais antiga para a mais nova."""
+        chain = self._chains.get(key)
+        if not chain: return []
+        base, entries = chain
+        out, text = [], None
+        for i, e in enumerate(entries):
+            text = e[1] if len(e) == 2 else _apply(text, e)
+            out.append((base + i, e[0], text))
+        return out
+
+    def text_at(self, key, version):
+        """Texto da versão pelo número absoluto; None se já foi descartada (ou não existe)."""
+        chain = self._chains.get(key)
+        if not chain: return None
+        i = version - chain[0]
+        if i < 0 or i >= len(chain[1]): return None
+        return self._text(chain[1], i)
+
+    def export(self, key):
+        chain = self._chains.get(key)
+        if not chain: return None
+        return [chain[0]] + [list(e) for e in chain[1]]
+
+    def load(self, key, data):
+        """Substitui o histórico da chave. Aceita o formato serializado ou a lista antiga [{'time', 'text'}]."""
+        self.remove(key)
+        if not data: return
+        if isinstance(data[0], dict):
+            for h in data: self.add(key, h["text"], h["time"])
+            return
+        entries = [tuple(e) for e in data[1:]]
+        if not entries: return
+        self._chains[key] = [data[0], entries]
+        self.bytes += sum(self._cost(e) for e in entries)
+        if len(entries) > 1: self._lru[key] = None
+        self._enforce_budget()
+
+    def copy(self):
+        """Cópia independente (as entradas são tuplas imutáveis; só as listas são copiadas)."""
+        new = HistoryStore(self.keyframe, self.max_versions, self.budget)
+        new._chains = {k: [c[0], list(c[1])] for k, c in self._chains.items()}
+        new._lru = OrderedDict(self._lru)
+        new.bytes = self.bytes
+        return new
+
+    def remove(self, key):
+        chain = self._chains.pop(key, None)
+        if chain:
+            self.bytes -= sum(self._cost(e) for e in chain[1])
+            self._lru.pop(key, None)
+
+class SessionLog:
+    """
+    Log Global em buffer circular de tamanho fixo, com índice por ID.
+    Cada entrada aponta para a versão no histórico da linha ({'time', 'id', 'v'});
+    o texto é reconstruído só quando a janela do log é aberta. Entradas antigas com
+    'text' (sessões anteriores) continuam aceitas.
+    'seq' conta todas as entradas já adicionadas (o diário da sessão usa para saber o que é novo).
+    """
+    def __init__(self, capacity=SESSION_LOG_SIZE):
+        self.capacity = max(1, capacity)
+        self._buf = [None] * self.capacity
+        self._by_id = {}   # id -> deque de seqs ainda no buffer
+        self.seq = 0
+
+    def __len__(self): return min(self.seq, self.capacity)
+
+    def append(self, time, idx, version):
+        self._add({"time": time, "id": idx, "v": version})
+
+    def _add(self, entry):
+        slot = self.seq % self.capacity
+        old = self._buf[slot]
+        if old is not None:
+            ids = self._by_id[old["id"]]
+            ids.popleft()
+            if not ids: del self._by_id[old["id"]]
+        self._buf[slot] = entry
+        self._by_id.setdefault(entry["id"], deque()).append(self.seq)
+        self.seq += 1
+
+    def since(self, seq):
+        """Entradas com seq >= seq que ainda estão no buffer, em ordem."""
+        return [self._buf[s % self.capacity] for s in range(max(seq, self.seq - len(self)), self.seq)]
+
+    def entries(self): return self.since(0)
+
+    def for_id(self, idx):
+        return [self._buf[s % self.capacity] for s in self._by_id.get(idx, ())]
+
+    def to_list(self): return [dict(e) for e in self.entries()]
+
+    @classmethod
+    def from_list(cls, entries, capacity=SESSION_LOG_SIZE):
+        log = cls(capacity)
+        for e in entries: log._add(dict(e))
+        return log
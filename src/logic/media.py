@@ -1,18 +1,19 @@
 import os
 import tkinter as tk
+from importlib.util import find_spec
 from ..config import resource_path
 
-try:
-    from PIL import Image, ImageTk, ImageSequence
-    import pygame
-    MEDIA_AVAILABLE = True
-except ImportError:
-    MEDIA_AVAILABLE = False
+# PIL e pygame só são importados quando o vídeo é aberto
+MEDIA_AVAILABLE = find_spec("PIL") is not None and find_spec("pygame") is not None
 
 class EasterEgg:
     @staticmethod
     def play(root_window):
         if not MEDIA_AVAILABLE: return
+        try:
+            from PIL import Image, ImageTk, ImageSequence
+            import pygame
+        except ImportError: return
         gif_filename = "jumpscare.gif"
         audio_filename = "jumpscare.mp3"
         gif_path = resource_path(gif_filename)
@@ -0,0 +1,89 @@
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+
+class MTCache:
+    """
+    Cache persistente de tradução automática (SQLite).
+    A chave é o sha1 do texto de origem sem tags + o idioma de destino, então
+    originais repetidos (menus, falas genéricas) e reinícios do app não geram
+    outra chamada ao tradutor. Pode ser usado de qualquer thread.
+    """
+    TAG_RE = re.compile(r'<[^>]+>')
+
+    def __init__(self, path, lang='pt'):
+        self.path = path
+        self.lang = lang
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = None
+        try:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS mt (key TEXT NOT NULL, lang TEXT NOT NULL, "
+                              "source TEXT, text TEXT NOT NULL, created REAL, PRIMARY KEY (key, lang))")
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Cache de tradução indisponível: {e}")
+            self.conn = None
+
+    @classmethod
+    def clean(cls, text):
+        return cls.TAG_RE.sub('', text or '').strip()
+
+    @classmethod
+    def key(cls, text):
+        return hashlib.sha1(cls.clean(text).encode('utf-8')).hexdigest()
+
+    def get(self, text):
+        """Tradução em cache para o texto (com ou sem tags), ou None."""
+        if self.conn is None or not self.clean(text): return None
+        with self._lock:
+            row = self.conn.execute("SELECT text FROM mt WHERE key=? AND lang=?", (self.key(text), self.lang)).fetchone()
+            if row: self.hits += 1
+            else: self.misses += 1
+        return row[0] if row else None
+
+    def get_many(self, texts):
+        """{texto: tradução} para os textos que já estão em cache (consulta em lotes)."""
+        if self.conn is None: return {}
+        by_key = {}
+        for t in texts:
+            if self.clean(t): by_key.setdefault(self.key(t), []).append(t)
+        found = {}
+        keys = list(by_key)
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                sql = f"SELECT key, text FROM mt WHERE lang=? AND key IN ({','.join('?' * len(part))})"
+                for k, v in self.conn.execute(sql, (self.lang, *part)):
+                    for t in by_key[k]: found[t] = v
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def put(self, text, translation):
+        if self.conn is None or not translation or not self.clean(text): return
+        with self._lock:
+            try:
+                self.conn.execute("INSERT OR REPLACE INTO mt (key, lang, source, text, created) VALUES (?, ?, ?, ?, ?)",
+                                  (self.key(text), self.lang, self.clean(text), translation, time.time()))
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"Erro ao gravar cache de tradução: {e}")
+
+    def __bool__(self): return True  # Cache vazio continua sendo um cache (não usar len() como teste)
+
+    def __len__(self):
+        if self.conn is None: return 0
+        with self._lock: return self.conn.execute("SELECT COUNT(*) FROM mt WHERE lang=?", (self.lang,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,81 @@
+import threading
+from collections import deque
+from ..config import MT_WORKERS, SCAN_RATE, SCAN_BURST
+from .scan_engine import TokenBucket
+
+class MTScheduler:
+    """
+    Cliente único de tradução automática para o painel do editor.
+    - request(): pedido da linha aberta. Só existe um pedido pendente; um novo
+      substitui o anterior que ainda não começou (navegação rápida não gera fila).
+    - prefetch(): próximas linhas na ordem da lista, traduzidas em segundo plano
+      com limite de taxa; a lista é trocada a cada navegação.
+    Cada resultado volta marcado com o ID e o texto de origem que o gerou:
+    on_result(id, origem, tradução, erro), chamado na thread de trabalho.
+    """
+    def __init__(self, translator_service, workers=MT_WORKERS):
+        self.service = translator_service
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(SCAN_RATE, SCAN_BURST)  # Só o prefetch passa pelo limitador
+        self._cond = threading.Condition()
+        self._current = None       # (id, texto, callback)
+        self._prefetch = deque()   # (id, texto, callback)
+        self._inflight = set()     # textos sendo traduzidos agora
+        self._threads = []
+        self.dropped = 0           # pedidos substituídos antes de começar
+
+    def _ensure_workers(self):
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._loop, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def request(self, idx, text, on_result):
+        with self._cond:
+            if self._current is not None: self.dropped += 1
+            self._current = (idx, text, on_result)
+            self._ensure_workers()
+            self._cond.notify()
+
+    def prefetch(self, items, on_result):
+        """items: lista de (id, texto) na ordem de navegação. Substitui o prefetch anterior."""
+        with self._cond:
+            self._prefetch.clear()
+            self._prefetch.extend((idx, text, on_result) for idx, text in items)
+            if items:
+                self._ensure_workers()
+                self._cond.notify_all()
+
+    def clear(self):
+        """Descarta o que ainda não começou (ex.: ao fechar o arquivo)."""
+        with self._cond:
+            self._current = None
+            self._prefetch.clear()
+
+    def _next(self):
+        with self._cond:
+            while True:
+                if self._current is not None:
+                    job, self._current = self._current, None
+                    return job, True
+                while self._prefetch:
+                    job = self._prefetch.popleft()
+                    if job[1] not in self._inflight: return job, False
+                self._cond.wait()
+
+    def _loop(self):
+        while True:
+            (idx, text, on_result), urgent = self._next()
+            with self._cond: self._inflight.add(text)
+            res, err = None, None
+            try:
+                res = self.service.cached(text)
+                if res is None:
+                    # O prefetch cede a vez ao pedido da linha aberta (será pedido de novo na próxima navegação)
+                    if not urgent and not self.bucket.acquire(lambda: self._current is not None): continue
+                    res = self.service.translate(text)
+            except Exception as e:
+                err = str(e)
+            finally:
+                with self._cond: self._inflight.discard(text)
+            on_result(idx, text, res, err)
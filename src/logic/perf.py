@@ -0,0 +1,90 @@
+import sys
+import json
+import time
+import platform
+import threading
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+from datetime import datetime
+from ..config import PERF_MONITOR, PERF_SAMPLES
+
+# Limites (ms) das faixas do histograma; a última faixa é "acima de 2000"
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+def _percentile(sorted_values, q):
+    if not sorted_values: return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+class PerfMonitor:
+    """
+    Contadores de tempo dos handlers principais (ligados com ENA_PERF=1).
+    Por nome guarda nº de chamadas, total, máximo, um histograma em faixas fixas e as
+    últimas 'samples' medidas, de onde saem p50/p95. Desligado, timed() devolve a função
+    original (custo zero). record() pode ser chamado de qualquer thread.
+    """
+    def __init__(self, enabled=PERF_MONITOR, samples=PERF_SAMPLES):
+        self.enabled = enabled
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._data = {}
+        self.started = time.time()
+
+    def timed(self, name=None):
+        """Decorador: mede cada chamada com o nome dado (padrão: Classe.método)."""
+        def deco(fn):
+            if not self.enabled: return fn
+            key = name or fn.__qualname__
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try: return fn(*args, **kwargs)
+                finally: self.record(key, time.perf_counter() - t0)
+            return wrapper
+        return deco
+
+    def record(self, name, seconds):
+        if not self.enabled: return
+        ms = seconds * 1000
+        with self._lock:
+            d = self._data.get(name)
+            if d is None:
+                d = self._data[name] = {"calls": 0, "total": 0.0, "max": 0.0,
+                                        "hist": [0] * (len(BUCKETS) + 1), "recent": deque(maxlen=self.samples)}
+            d["calls"] += 1
+            d["total"] += ms
+            if ms > d["max"]: d["max"] = ms
+            d["hist"][bisect_left(BUCKETS, ms)] += 1
+            d["recent"].append(ms)
+
+    def reset(self):
+        with self._lock: self._data.clear()
+        self.started = time.time()
+
+    def stats(self):
+        """{nome: {calls, total_ms, mean_ms, max_ms, p50_ms, p95_ms, hist}} (p50/p95 das últimas medidas)."""
+        with self._lock:
+            items = [(k, dict(d, hist=list(d["hist"]), recent=sorted(d["recent"]))) for k, d in self._data.items()]
+        out = {}
+        for name, d in items:
+            out[name] = {"calls": d["calls"], "total_ms": d["total"], "mean_ms": d["total"] / d["calls"],
+                         "max_ms": d["max"], "p50_ms": _percentile(d["recent"], 0.50),
+                         "p95_ms": _percentile(d["recent"], 0.95), "hist": d["hist"]}
+        return out
+
+    def top(self, n=5, key="p95_ms"):
+        """Os n nomes com maior 'key', para o painel."""
+        return sorted(self.stats().items(), key=lambda kv: kv[1][key], reverse=True)[:n]
+
+    def export(self, path, extra=None):
+        """Grava as estatísticas em JSON (para anexar em relatos de travamento)."""
+        data = {"time": datetime.now().isoformat(timespec="seconds"),
+                "uptime_s": time.time() - self.started, "python": sys.version.split()[0],
+                "platform": platform.platform(), "buckets_ms": list(BUCKETS) + ["inf"],
+                "samples": self.samples, "handlers": self.stats()}
+        if extra: data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f: json.dump(data, f, ensure_ascii=False, indent=2)
+        return data
+
+PERF = PerfMonitor()
+timed = PERF.timed
@@ -0,0 +1,287 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+from .history_store import HistoryStore
+
+# Bits de _flags (um byte por linha)
+_QUOTES, _IGNORE, _HISTORY, _MT = 1, 2, 4, 8
+FIELDS = ("original", "translated", "has_quotes", "mt_cache", "original_line", "history", "source_file", "ignore_errors")
+
+def _intern(s): return sys.intern(s) if type(s) is str else s
+
+class RowView(MutableMapping):
+    """
+    Linha da RowStore com a interface do dict antigo (row["translated"], row.get(...),
+    "history" in row, dict(row)...). Não guarda dados: lê e grava direto nos arrays.
+    'history' e 'mt_cache' podem estar ausentes (seções da sessão ainda não carregadas).
+    """
+    __slots__ = ("_store", "_pos")
+
+    def __init__(self, store, pos):
+        self._store = store
+        self._pos = pos
+
+    def __getitem__(self, key): return self._store._get(self._pos, key)
+    def __setitem__(self, key, value): self._store._set(self._pos, key, value)
+    def __delitem__(self, key): self._store._del(self._pos, key)
+    def __iter__(self): return (k for k in FIELDS if self._store._has(self._pos, k))
+    def __len__(self): return sum(1 for _ in self)
+    def __contains__(self, key): return self._store._has(self._pos, key)
+    def __repr__(self): return repr(dict(self))
+
+    def get(self, key, default=None):
+        return self._store._get(self._pos, key) if self._store._has(self._pos, key) else default
+
+class RowStore(MutableMapping):
+    """
+    Tabela de traduções {id: linha} em arrays paralelos, no lugar de um dict por linha.
+    - original: lista de strings internadas; original_line: array de inteiros
+    - has_quotes / ignore_errors / presença de history e mt_cache: bits em um bytearray
+    - translated, mt_cache e source_file: dicts esparsos por posição, só para as linhas
+      que têm valor próprio (tradução igual ao original não ocupa nada)
+    - history: HistoryStore (versões em diferenças); o histórico padrão [Original] não ocupa nada
+    store[id] devolve uma RowView compatível com o dict antigo; columns() percorre
+    campos sem criar views (para os laços sobre a tabela inteira). O histórico tem
+    acesso próprio (add_version, versions, version_text) sem montar a lista de dicts.
+    """
+    def __init__(self):
+        self._pos = {}                # id -> posição nos arrays
+        self._original = []
+        self._line = array('q')
+        self._flags = bytearray()
+        self._translated = {}         # posição -> texto (só quando difere do original)
+        self.history = HistoryStore() # chave = posição
+        self._mt = {}                 # posição -> texto
+        self._source = {}             # posição -> nome do arquivo importado
+
+    # --- Mapping {id: RowView} ---
+    def __getitem__(self, idx): return RowView(self, self._pos[idx])
+    def __contains__(self, idx): return idx in self._pos
+    def __iter__(self): return iter(self._pos)
+    def __len__(self): return len(self._pos)
+    def keys(self): return self._pos.keys()
+
+    def get(self, idx, default=None):
+        pos = self._pos.get(idx)
+        return default if pos is None else RowView(self, pos)
+
+    def items(self):
+        for idx, pos in self._pos.items(): yield idx, RowView(self, pos)
+
+    def values(self):
+        for pos in self._pos.values(): yield RowView(self, pos)
+
+    def __setitem__(self, idx, row):
+        """Adiciona (ou substitui) uma linha a partir de um dict/RowView."""
+        pos = self._pos.get(idx)
+        if pos is None:
+            pos = self._append(idx, row["original"], row.get("original_line", 0))
+        else:
+            self._clear(pos)
+            self._original[pos] = _intern(row["original"])
+            self._line[pos] = row.get("original_line", 0)
+        for k in ("translated", "has_quotes", "ignore_errors", "source_file", "history", "mt_cache"):
+            if k in row: self._set(pos, k, row[k])
+
+    def add(self, idx, original, original_line=0, has_quotes=False):
+        """Linha nova, sem trabalho (o mesmo que FileManager.new_entry, sem criar o dict)."""
+        pos = self._append(idx, original, original_line)
+        self._flags[pos] = _HISTORY | _MT | (_QUOTES if has_quotes else 0)
+
+    def __delitem__(self, idx):
+        # A posição fica órfã nos arrays (remoção é rara; to_dict/from_dict reconstrói)
+        self._clear(self._pos.pop(idx))
+
+    def _append(self, idx, original, line):
+        pos = len(self._original)
+        self._pos[idx] = pos
+        self._original.append(_intern(original))
+        self._line.append(line)
+        self._flags.append(0)
+        return pos
+
+    def _clear(self, pos):
+        self._flags[pos] = 0
+        for d in (self._translated, self._mt, self._source): d.pop(pos, None)
+        self.history.remove(pos)
+
+    # --- Campos por posição (usados pela RowView) ---
+    def _has(self, pos, key):
+        if key == "history": return bool(self._flags[pos] & _HISTORY)
+        if key == "mt_cache": return bool(self._flags[pos] & _MT)
+        return key in FIELDS
+
+    def _get(self, pos, key):
+        if key == "original": return self._original[pos]
+        if key == "translated": return self._translated.get(pos, self._original[pos])
+        if key == "has_quotes": return bool(self._flags[pos] & _QUOTES)
+        if key == "ignore_errors": return bool(self._flags[pos] & _IGNORE)
+        if key == "original_line": return self._line[pos]
+        if key == "source_file": return self._source.get(pos)
+        if key == "history" and self._flags[pos] & _HISTORY:
+            return [{"time": t, "text": text} for _, t, text in self._versions(pos)]
+        if key == "mt_cache" and self._flags[pos] & _MT: return self._mt.get(pos)
+        raise KeyError(key)
+
+    def _set(self, pos, key, value):
+        if key == "translated":
+            if value == self._original[pos]: self._translated.pop(pos, None)
+            else: self._translated[pos] = _intern(value)
+        elif key == "has_quotes": self._set_flag(pos, _QUOTES, value)
+        elif key == "ignore_errors": self._set_flag(pos, _IGNORE, value)
+        elif key == "original_line": self._line[pos] = value
+        elif key == "original":
+            # O texto padrão da tradução/histórico acompanha o original antigo
+            old = self._original[pos]
+            if pos not in self._translated: self._translated[pos] = old
+            if self._flags[pos] & _HISTORY and not self.history.count(pos): self.history.add(pos, old, "Original")
+            self._original[pos] = _intern(value)
+            if self._translated[pos] == value: del self._translated[pos]
+        elif key == "source_file":
+            if value is None: self._source.pop(pos, None)
+            else: self._source[pos] = _intern(value)
+        elif key == "history":
+            # Lista de dicts (formato antigo) ou o formato serializado do HistoryStore
+            self._flags[pos] |= _HISTORY
+            if value is None or value == [{"time": "Original", "text": self._original[pos]}]: self.history.remove(pos)
+            else: self.history.load(pos, value)
+        elif key == "mt_cache":
+            self._flags[pos] |= _MT
+            if value is None: self._mt.pop(pos, None)
+            else: self._mt[pos] = value
+        else: raise KeyError(key)
+
+    def _set_flag(self, pos, bit, on):
+        if on: self._flags[pos] |= bit
+        else: self._flags[pos] &= ~bit & 0xFF
+
+    def _del(self, pos, key):
+        if key == "history": self._flags[pos] &= ~_HISTORY & 0xFF; self.history.remove(pos)
+        elif key == "mt_cache": self._flags[pos] &= ~_MT & 0xFF; self._mt.pop(pos, None)
+        else: raise KeyError(key)
+
+    # --- Histórico ---
+    def _versions(self, pos):
+        return self.history.versions(pos) or [(0, "Original", self._original[pos])]
+
+    def add_version(self, idx, text, time):
+        """Nova versão no histórico da linha (se mudou). Devolve o nº da versão ou None."""
+        pos = self._pos[idx]
+        self._flags[pos] |= _HISTORY
+        v = self.history.add(pos, text, time, self._original[pos])
+        if v is None and self.history.count(pos) == 1 and self.history.text_at(pos, 0) == self._original[pos]:
+            self.history.remove(pos)  # Continua sendo o histórico padrão
+        return v
+
+    def versions(self, idx):
+        """[(nº, hora, texto)] da linha, reconstruídas do histórico."""
+        return self._versions(self._pos[idx])
+
+    def history_count(self, idx): return max(1, self.history.count(self._pos[idx]))
+
+    def version_text(self, idx, version):
+        """Texto de uma versão (nº absoluto); None se descartada ou se a linha não existe mais."""
+        pos = self._pos.get(idx)
+        if pos is None: return None
+        if version == 0 and not self.history.count(pos): return self._original[pos]
+        return self.history.text_at(pos, version)
+
+    def packed_history(self, idx):
+        """Histórico no formato serializado; None se for o padrão (ou ausente)."""
+        return self.history.export(self._pos[idx])
+
+    # --- Acesso em massa ---
+    def columns(self, *fields):
+        """Tuplas (id, campo1, campo2, ...) na ordem da tabela, sem criar RowViews."""
+        orig, tr, flags, line, src = self._original, self._translated, self._flags, self._line, self._source
+        getters = {
+            "original": orig.__getitem__,
+            "translated": lambda p: tr.get(p, orig[p]),
+            "has_quotes": lambda p: bool(flags[p] & _QUOTES),
+            "ignore_errors": lambda p: bool(flags[p] & _IGNORE),
+            "original_line": line.__getitem__,
+            "source_file": src.get,
+            "mt_cache": self._mt.get,
+        }
+        gets = [getters[f] for f in fields]
+        if fields == ("original", "translated"):  # Caso mais comum (busca, auditoria, lista)
+            for idx, p in self._pos.items(): yield idx, orig[p], tr.get(p, orig[p])
+        else:
+            for idx, p in self._pos.items(): yield (idx, *[g(p) for g in gets])
+
+    def texts(self, idx):
+        """(original, tradução) da linha sem criar RowView; None se o ID não existe."""
+        pos = self._pos.get(idx)
+        if pos is None: return None
+        orig = self._original[pos]
+        return orig, self._translated.get(pos, orig)
+
+    def modified_ids(self):
+        """IDs cuja tradução difere do original."""
+        ids = {p: idx for idx, p in self._pos.items()}
+        return [ids[p] for p in self._translated if p in ids]
+
+    # --- Conversão ---
+    def copy(self):
+        """Cópia independente da tabela (arrays e dicts copiados; as strings são compartilhadas)."""
+        new = RowStore()
+        new._pos = dict(self._pos)
+        new._original = list(self._original)
+        new._line = array('q', self._line)
+        new._flags = bytearray(self._flags)
+        new._translated = dict(self._translated)
+        new.history = self.history.copy()
+        new._mt = dict(self._mt)
+        new._source = dict(self._source)
+        return new
+
+    def to_dict(self):
+        """{id: dict} no formato antigo (cópia)."""
+        return {idx: dict(RowView(self, pos)) for idx, pos in self._pos.items()}
+
+    @classmethod
+    def from_dict(cls, table):
+        """A partir de {id: dict} (chaves podem ser str, como no JSON)."""
+        store = cls()
+        for k, row in table.items(): store[int(k)] = row
+        return store
+
+    @classmethod
+    def from_columns(cls, ids, original, translated, has_quotes, original_line, source_file, ignore_errors=()):
+        """A partir de listas alinhadas por linha (translated None = igual ao original); ignore_errors = IDs."""
+        store = cls()
+        ignored = set(ignore_errors)
+        for i, idx in enumerate(ids):
+            pos = store._append(idx, original[i], original_line[i])
+            if translated[i] is not None and translated[i] != original[i]: store._translated[pos] = _intern(translated[i])
+            if source_file[i] is not None: store._source[pos] = _intern(source_file[i])
+            store._flags[pos] = (_QUOTES if has_quotes[i] else 0) | (_IGNORE if idx in ignored else 0)
+        return store
+
+    def memory_usage(self):
+        """
+        Bytes ocupados pela tabela (arrays, dicts esparsos e strings próprias, cada
+        objeto contado uma vez) e a média por linha.
+        """
+        seen = set()
+        parts = {"index": deep_sizeof(self._pos, seen), "original": deep_sizeof(self._original, seen),
+                 "columns": sys.getsizeof(self._line) + sys.getsizeof(self._flags),
+                 "translated": deep_sizeof(self._translated, seen), "history": deep_sizeof(self.history, seen),
+                 "mt_cache": deep_sizeof(self._mt, seen), "source_file": deep_sizeof(self._source, seen)}
+        total = sum(parts.values())
+        return {"rows": len(self), "bytes": total, "per_row": total / len(self) if self else 0.0, "parts": parts}
+
+def deep_sizeof(obj, seen=None):
+    """Tamanho recursivo (dict/list/tuple/set/str/números), sem contar o mesmo objeto duas vezes."""
+    if seen is None: seen = set()
+    stack, total = [obj], 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen: continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys()); stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)): stack.extend(o)
+        elif isinstance(o, (RowStore, HistoryStore)): stack.extend(vars(o).values())
+    return total
@@ -0,0 +1,85 @@
+import os
+import time
+import shutil
+import tempfile
+from .perf import timed
+
+class SaveEngine:
+    """
+    Salvamento por 'splice': copia o arquivo base em streaming para um temporário,
+    substituindo apenas as linhas '1 string data' cuja tradução difere do base,
+    e troca o destino de forma atômica (os.replace).
+    Não depende de Tk; pode rodar em thread de fundo ou na CLI.
+    """
+    CHUNK = 1 << 20  # 1 MB por write ao copiar trechos inalterados
+
+    @staticmethod
+    @timed()
+    def snapshot_rows(translations):
+        """Captura (id, texto, aspas) de cada linha; deve ser chamado na thread que edita os dados."""
+        return list(translations.columns("translated", "has_quotes"))
+
+    @staticmethod
+    @timed()
+    def save(index, rows, out_path):
+        """
+        Grava out_path a partir do índice do arquivo base e das linhas capturadas.
+        Retorna um dict com estatísticas de throughput.
+        """
+        t0 = time.perf_counter()
+        buf = index.buffer
+        count = len(index)
+        starts, ends = index.starts, index.ends
+
+        # Só entram no splice linhas cujo conteúdo difere dos bytes do base
+        splices = []
+        for idx, text, has_quotes in rows:
+            if idx >= count: continue
+            content = f'"{text}"' if has_quotes else text
+            data = content.encode('utf-8')
+            if buf[starts[idx]:ends[idx]] != data: splices.append((starts[idx], ends[idx], data))
+        splices.sort()
+
+        out_path = os.path.abspath(out_path)
+        fd, tmp_path = tempfile.mkstemp(prefix=".ena_save_", suffix=".tmp", dir=os.path.dirname(out_path))
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                pos = 0
+                for s, e, data in splices:
+                    written += SaveEngine._copy_range(buf, pos, s, out)
+                    out.write(data); written += len(data)
+                    pos = e
+                written += SaveEngine._copy_range(buf, pos, len(buf), out)
+                out.flush()
+                os.fsync(out.fileno())
+            # mkstemp cria com 0600; mantém as permissões de um arquivo comum
+            if os.path.exists(out_path): shutil.copymode(out_path, tmp_path)
+            else: os.chmod(tmp_path, 0o644)
+            # No Windows um arquivo mapeado não pode ser substituído
+            overwrite_base = SaveEngine._same_file(out_path, index.filepath)
+            if overwrite_base: index.close()
+            os.replace(tmp_path, out_path)
+        except BaseException:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            raise
+
+        elapsed = max(time.perf_counter() - t0, 1e-9)
+        return {
+            "path": out_path, "lines": count, "changed": len(splices), "bytes": written,
+            "elapsed": elapsed, "lines_per_s": count / elapsed,
+            "mb_per_s": written / (1024 * 1024) / elapsed, "overwrote_base": overwrite_base
+        }
+
+    @staticmethod
+    def _copy_range(buf, start, end, out):
+        step = SaveEngine.CHUNK
+        for p in range(start, end, step):
+            out.write(buf[p:min(p + step, end)])
+        return max(end - start, 0)
+
+    @staticmethod
+    def _same_file(a, b):
+        try: return os.path.exists(a) and os.path.samefile(a, b)
+        except OSError: return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
@@ -0,0 +1,134 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..config import SCAN_WORKERS, SCAN_RATE, SCAN_BURST, SCAN_RETRIES, SCAN_BACKOFF
+from .mt_cache import MTCache
+from .perf import timed
+
+class TokenBucket:
+    """Limitador de taxa: 'rate' fichas por segundo, acumulando no máximo 'burst'."""
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancelled=lambda: False):
+        """Bloqueia até haver uma ficha. Retorna False se cancelado durante a espera."""
+        while not cancelled():
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(min(wait, 0.1))
+        return False
+
+class ScanEngine:
+    """
+    Varredura do Modo Espião: traduz um intervalo de linhas com um pool de threads,
+    respeitando o limite de requisições do provedor (TokenBucket), com retentativas
+    e backoff exponencial. Originais idênticos (sem tags) são traduzidos uma única vez
+    e o que já está no cache em disco não vai para a rede.
+    Os callbacks são chamados nas threads de trabalho (use root.after para tocar no Tk).
+    """
+    def __init__(self, translator_service, workers=SCAN_WORKERS, rate=SCAN_RATE, burst=SCAN_BURST,
+                 retries=SCAN_RETRIES, backoff=SCAN_BACKOFF):
+        self.service = translator_service
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.cancelled = False
+        self.running = False
+
+    def start(self, rows, on_result=None, on_progress=None, on_done=None):
+        """
+        rows: lista de (id, original). on_result(id, tradução) é chamado para cada ID
+        (inclusive os duplicados), on_progress(feitos, total, último_id) por ID concluído
+        e on_done(stats) no fim.
+        """
+        self.cancelled = False
+        self.running = True
+        t = threading.Thread(target=self._run, args=(rows, on_result, on_progress, on_done), daemon=True)
+        t.start()
+        return t
+
+    def run(self, rows, on_result=None, on_progress=None):
+        """Versão bloqueante de start(). Retorna as estatísticas."""
+        out = {}
+        self.start(rows, on_result, on_progress, out.update).join()
+        return out
+
+    @timed()
+    def _run(self, rows, on_result, on_progress, on_done):
+        t0 = time.perf_counter()
+        groups = {}  # texto limpo -> [ids]
+        for idx, orig in rows:
+            clean = MTCache.clean(orig)
+            if clean: groups.setdefault(clean, []).append(idx)
+        total = sum(len(v) for v in groups.values())
+        stats = {"total": total, "unique": len(groups), "cached": 0, "requests": 0, "retries": 0, "failed": 0}
+        done = 0
+        lock = threading.Lock()
+
+        def deliver(ids, text):
+            nonlocal done
+            with lock:
+                for idx in ids:
+                    done += 1
+                    if on_result and text is not None: on_result(idx, text)
+                    if on_progress: on_progress(done, total, idx)
+
+        cache = self.service.cache
+        hits = cache.get_many(list(groups)) if cache is not None else {}
+        pending = []
+        for clean, ids in groups.items():
+            if clean in hits:
+                stats["cached"] += len(ids)
+                deliver(ids, hits[clean].strip())
+            else: pending.append((clean, ids))
+
+        try:
+            if pending and not self.cancelled:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                    futures = {pool.submit(self._translate, clean, stats, lock): ids for clean, ids in pending}
+                    for fut in as_completed(futures):
+                        text = fut.result()
+                        if text is None:
+                            if self.cancelled: continue
+                            with lock: stats["failed"] += len(futures[fut])
+                        deliver(futures[fut], text)
+                    # Cancelado: as tarefas restantes retornam assim que olham a flag
+        finally:
+            self.running = False
+        elapsed = max(time.perf_counter() - t0, 1e-9)
+        stats.update({"done": done, "elapsed": elapsed, "cancelled": self.cancelled,
+                      "workers": self.workers, "requests_per_s": stats["requests"] / elapsed})
+        if on_done: on_done(stats)
+
+    @timed()
+    def _translate(self, text, stats, lock):
+        """Uma tradução com limite de taxa e backoff. Retorna None em falha ou cancelamento."""
+        for attempt in range(self.retries + 1):
+            if not self.bucket.acquire(lambda: self.cancelled): return None
+            with lock: stats["requests"] += 1
+            try:
+                res = self.service.translate(text)
+                if res: return res.strip()
+            except Exception: pass
+            if attempt == self.retries: break
+            with lock: stats["retries"] += 1
+            # Backoff exponencial com jitter, interrompível pelo cancelamento
+            delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+            end = time.monotonic() + delay
+            while not self.cancelled and time.monotonic() < end: time.sleep(0.05)
+        return None
+
+    def cancel(self):
+        self.cancelled = True
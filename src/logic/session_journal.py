@@ -0,0 +1,215 @@
+import os
+import json
+import queue
+import threading
+from ..config import JOURNAL_COMPACT_RECORDS, JOURNAL_COMPACT_ROWS
+from .backend import FileManager
+from .snapshot import SessionSnapshot
+from .row_store import RowStore
+
+ROW_FIELDS = ("translated", "history", "mt_cache", "ignore_errors", "source_file")
+
+class SessionJournal:
+    """
+    Sessão automática = snapshot completo + diário (append-only, uma linha JSON por registro).
+    A thread do Tk só marca o que mudou; flush() (chamado a cada poucos segundos) copia as
+    linhas sujas e a thread de escrita grava o diário com fsync. De tempos em tempos o estado
+    inteiro vira um novo snapshot (gravação atômica) e o diário é zerado. Se uma gravação
+    falha, a próxima chamada de flush() compacta de novo e 'error' fica até ela dar certo.
+    Cada registro tem um 'seq' crescente e o snapshot guarda o último incluído, então reaplicar
+    um diário já compactado (queda entre as duas gravações) não muda nada.
+    O snapshot é um SessionSnapshot (binário em seções); history e mt_cache só entram nas
+    linhas quando attach() é chamado. Uma sessão JSON antiga (legacy_path) é lida uma vez
+    e convertida na primeira compactação.
+    """
+    def __init__(self, snapshot_path, legacy_path=None, compact_records=JOURNAL_COMPACT_RECORDS, compact_rows=JOURNAL_COMPACT_ROWS):
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + ".journal"
+        self.legacy_path = legacy_path
+        self.snapshot = None      # Leitor do snapshot carregado (seções lazy ainda não lidas)
+        self._migrate = None      # Arquivos do formato antigo a aposentar depois da compactação
+        self.compact_records = compact_records
+        self.compact_rows = compact_rows
+        self.seq = 0              # Último seq emitido
+        self.records = 0          # Registros no diário desde a última compactação
+        self.dirty = set()        # IDs alterados desde o último flush (pode vir de outras threads)
+        self._dirty_lock = threading.Lock()
+        self.log_pos = 0          # seq do session_log já enviado ao diário
+        self.last_state = None
+        self.compact_pending = False
+        self.error = None         # Última falha de escrita (None = ok)
+        self._failed = False      # Houve falha desde a última compactação gravada (o erro fica até compactar)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    # --- Thread do Tk ---
+    def mark_row(self, idx):
+        with self._dirty_lock: self.dirty.add(idx)
+    def request_compact(self): self.compact_pending = True
+
+    def pending(self, name): return self.snapshot is not None and self.snapshot.pending(name)
+
+    def attach(self, name, translations):
+        """Carrega a seção lazy 'history' ou 'mt' nas linhas, se ainda não foi. True se carregou agora."""
+        if not self.pending(name): return False
+        self.snapshot.attach(name, translations)
+        return True
+
+    def flush(self, translations, session_log, state, snapshot_fn):
+        """
+        Envia para a thread de escrita o que mudou. state é o dict pequeno de estado
+        (seleção, UI, filtros); snapshot_fn() monta o estado completo quando for hora de compactar.
+        translations é a RowStore (histórico vai no formato em diferenças) e session_log o SessionLog.
+        """
+        if self.compact_pending or len(self.dirty) > self.compact_rows or self.records >= self.compact_records:
+            self.compact(snapshot_fn(), session_log.seq)
+            return
+        recs = []
+        with self._dirty_lock: dirty, self.dirty = self.dirty, set()
+        for idx in sorted(dirty):
+            row = translations.get(idx)
+            if row is None: continue
+            recs.append({"op": "row", "id": idx, "row": {k: (translations.packed_history(idx) if k == "history" else row[k])
+                                                         for k in ROW_FIELDS if k in row}})
+        for entry in session_log.since(self.log_pos): recs.append({"op": "log", "entry": dict(entry)})
+        self.log_pos = session_log.seq
+        if state != self.last_state:
+            recs.append({"op": "state", "state": state})
+            self.last_state = json.loads(json.dumps(state))
+        if not recs: return
+        for r in recs:
+            self.seq += 1
+            r["seq"] = self.seq
+        self.records += len(recs)
+        self._queue.put(("append", recs))
+
+    def compact(self, snapshot, log_pos=None):
+        """
+        Grava o estado completo como novo snapshot e descarta o diário anterior.
+        As seções lazy precisam estar carregadas (attach) antes de montar 'snapshot'.
+        """
+        if any(self.pending(n) for n in SessionSnapshot.LAZY):
+            raise RuntimeError("Compactação com seções da sessão ainda não carregadas")
+        self.snapshot = None
+        with self._dirty_lock: self.dirty.clear()
+        self.log_pos = len(snapshot.get("log", [])) if log_pos is None else log_pos
+        self.compact_pending = False
+        self.records = 0
+        self.seq += 1
+        snapshot["seq"] = self.seq
+        self._queue.put(("compact", snapshot))
+
+    def reset(self):
+        """Apaga snapshot e diário (ex.: 'Zerar tudo')."""
+        self.snapshot = None
+        with self._dirty_lock: self.dirty.clear()
+        self.log_pos = 0
+        self.last_state = None
+        self.compact_pending = False
+        self.records = 0
+        self._queue.put(("reset", None))
+
+    def wait(self):
+        """Espera a thread de escrita terminar o que já foi enviado. Retorna o último erro."""
+        self._queue.join()
+        return self.error
+
+    def close(self):
+        self._queue.put(("stop", None))
+        self._thread.join()
+        return self.error
+
+    # --- Thread de escrita ---
+    def _writer(self):
+        f = None
+        while True:
+            op, payload = self._queue.get()
+            try:
+                if op == "append":
+                    if f is None: f = open(self.path, 'a', encoding='utf-8')
+                    f.write("".join(json.dumps(r, ensure_ascii=False, separators=(',', ':')) + "\n" for r in payload))
+                    f.flush()
+                    os.fsync(f.fileno())
+                elif op == "compact":
+                    SessionSnapshot.write(self.snapshot_path, payload)
+                    if f: f.close(); f = None
+                    open(self.path, 'w').close()  # Tudo até payload['seq'] já está no snapshot
+                    if self._migrate: self._retire_legacy()
+                elif op in ("reset", "stop"):
+                    if f: f.close(); f = None
+                    if op == "stop": return
+                    for p in (self.snapshot_path, self.path) + (self._migrate or ()):
+                        if os.path.exists(p): os.remove(p)
+                    self._migrate = None
+                if op != "append": self._failed = False
+                if not self._failed: self.error = None
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                # As linhas enviadas já saíram de 'dirty': só um snapshot completo recupera o que se perdeu
+                self._failed = True
+                self.compact_pending = True
+                if f:
+                    try: f.close()
+                    except OSError: pass
+                    f = None
+            finally:
+                self._queue.task_done()
+
+    def _retire_legacy(self):
+        """Sessão antiga já convertida: o JSON vira .bak e o diário dele é apagado."""
+        json_path, journal_path = self._migrate
+        os.replace(json_path, json_path + ".bak")
+        if os.path.exists(journal_path): os.remove(journal_path)
+        self._migrate = None
+
+    # --- Recuperação ---
+    def load(self, full=False):
+        """
+        Lê o snapshot e reaplica os registros do diário mais novos que ele.
+        Retorna o dict da sessão ou None. Sem full=True, as linhas de um snapshot binário
+        vêm sem 'history'/'mt_cache' até attach().
+        """
+        self.snapshot = None
+        journal_path = self.path
+        if SessionSnapshot.is_snapshot(self.snapshot_path):
+            self.snapshot = SessionSnapshot.open(self.snapshot_path)
+            data = self.snapshot.load(full)
+        elif os.path.exists(self.snapshot_path):
+            data = FileManager.load_session(self.snapshot_path)  # Sessão JSON passada direto (ex.: CLI)
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            data = FileManager.load_session(self.legacy_path)
+            journal_path = self.legacy_path + ".journal"
+            if data:
+                self._migrate = (self.legacy_path, journal_path)
+                self.compact_pending = True
+        else: return None
+        if not data: return None
+        if not isinstance(data.get("trans"), RowStore): data["trans"] = RowStore.from_dict(data.get("trans", {}))
+        data.setdefault("log", [])
+        last = data.get("seq", 0)
+        applied = 0
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r+b') as f:
+                good = 0
+                for line in f:
+                    try: rec = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        # Última linha cortada por uma queda: descarta para os próximos registros não ficarem atrás dela
+                        f.truncate(good)
+                        break
+                    good += len(line)
+                    seq = rec.get("seq", 0)
+                    if seq <= last: continue
+                    last = seq
+                    applied += 1
+                    op = rec.get("op")
+                    if op == "row":
+                        row = data["trans"].get(rec["id"])
+                        if row is not None: row.update(rec["row"])
+                    elif op == "log": data["log"].append(rec["entry"])
+                    elif op == "state": data.update(rec["state"])
+        self.seq = last
+        self.records = applied
+        self.log_pos = len(data["log"])
+        return data
@@ -0,0 +1,167 @@
+import os
+import json
+import zlib
+import struct
+from .row_store import RowStore
+
+class SessionSnapshot:
+    """
+    Snapshot binário da sessão, dividido em seções comprimidas (zlib):
+        cabeçalho: MAGIC, versão, nº de seções
+        tabela:    (nome, offset, tamanho comprimido, tamanho original) por seção
+        seções:    state, rows, baseline, log, history, mt
+    A tabela de linhas é colunar (uma lista por campo; 'translated' só quando difere do
+    original). history e mt ficam fora das linhas e só são lidas quando pedidas, então abrir
+    a sessão decodifica apenas o necessário para montar a lista.
+    Também lê o formato antigo (JSON) para migração.
+    """
+    MAGIC = b"ENASNAP\x01"
+    VERSION = 1
+    HEADER = struct.Struct("<8sHH")
+    ENTRY = struct.Struct("<8sQQQ")
+    LAZY = ("history", "mt")
+    STATE_KEYS = ("base", "idx", "ui", "spy_mode", "filters", "use_custom_baseline", "seq")
+
+    def __init__(self, path, table, raw_header):
+        self.path = path
+        self.table = table              # nome -> (offset, tamanho, tamanho original)
+        self._raw_header = raw_header   # Para detectar se o arquivo foi trocado depois de aberto
+        self._cache = {}
+
+    # --- Escrita ---
+    @classmethod
+    def encode(cls, data):
+        """Dict da sessão (trans = RowStore, log = lista) -> {seção: objeto}."""
+        trans = data.get("trans", RowStore())
+        ids = sorted(trans)
+        rows = {"ids": ids, "original": [], "translated": [], "has_quotes": [], "original_line": [],
+                "source_file": [], "ignore_errors": []}
+        history, mt = {}, {}
+        for idx in ids:
+            r = trans[idx]
+            orig = r["original"]
+            rows["original"].append(orig)
+            rows["translated"].append(None if r["translated"] == orig else r["translated"])
+            rows["has_quotes"].append(1 if r.get("has_quotes") else 0)
+            rows["original_line"].append(r.get("original_line", 0))
+            rows["source_file"].append(r.get("source_file"))
+            if r.get("ignore_errors"): rows["ignore_errors"].append(idx)
+            # Histórico em diferenças (HistoryStore); o padrão (só a versão original) não é gravado
+            hist = trans.packed_history(idx) if "history" in r else None
+            if hist: history[str(idx)] = hist
+            if r.get("mt_cache"): mt[str(idx)] = r["mt_cache"]
+        return {
+            "state": {k: data[k] for k in cls.STATE_KEYS if k in data},
+            "rows": rows,
+            "baseline": {str(k): v for k, v in data.get("base_snap", {}).items()},
+            "log": data.get("log", []),
+            "history": history,
+            "mt": mt,
+        }
+
+    @classmethod
+    def write(cls, path, data, level=6):
+        """Grava a sessão de forma atômica (temporário + os.replace)."""
+        blobs = []
+        for name, obj in cls.encode(data).items():
+            raw = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            blobs.append((name, zlib.compress(raw, level), len(raw)))
+        offset = cls.HEADER.size + cls.ENTRY.size * len(blobs)
+        table = b""
+        for name, blob, raw_len in blobs:
+            table += cls.ENTRY.pack(name.encode('ascii'), offset, len(blob), raw_len)
+            offset += len(blob)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(blobs)) + table)
+                for _, blob, _ in blobs: f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+
+    # --- Leitura ---
+    @classmethod
+    def open(cls, path):
+        """Abre só o cabeçalho. None se o arquivo não existe; ValueError se não é um snapshot."""
+        if not os.path.exists(path): return None
+        with open(path, 'rb') as f:
+            raw = cls._read_header(f)
+        return cls(path, cls._parse_table(raw), raw)
+
+    @classmethod
+    def is_snapshot(cls, path):
+        try:
+            with open(path, 'rb') as f: return f.read(len(cls.MAGIC)) == cls.MAGIC
+        except OSError: return False
+
+    @classmethod
+    def _read_header(cls, f):
+        head = f.read(cls.HEADER.size)
+        if len(head) < cls.HEADER.size: raise ValueError("Snapshot truncado")
+        magic, version, count = cls.HEADER.unpack(head)
+        if magic != cls.MAGIC: raise ValueError("Não é um snapshot de sessão")
+        if version > cls.VERSION: raise ValueError(f"Snapshot de versão mais nova ({version})")
+        table = f.read(cls.ENTRY.size * count)
+        if len(table) < cls.ENTRY.size * count: raise ValueError("Snapshot truncado")
+        return head + table
+
+    @classmethod
+    def _parse_table(cls, raw):
+        table = {}
+        for i in range(cls.HEADER.unpack_from(raw)[2]):
+            name, off, size, raw_len = cls.ENTRY.unpack_from(raw, cls.HEADER.size + i * cls.ENTRY.size)
+            table[name.rstrip(b"\0").decode('ascii')] = (off, size, raw_len)
+        return table
+
+    def section(self, name):
+        """Decodifica uma seção (uma vez só). Seções ausentes valem vazio."""
+        if name in self._cache: return self._cache[name]
+        if name not in self.table: return {} if name != "log" else []
+        off, size, raw_len = self.table[name]
+        with open(self.path, 'rb') as f:
+            if self._read_header(f) != self._raw_header:
+                raise RuntimeError("O arquivo de sessão foi substituído depois de aberto")
+            f.seek(off)
+            raw = zlib.decompress(f.read(size))
+        if len(raw) != raw_len: raise ValueError(f"Seção '{name}' corrompida")
+        obj = json.loads(raw.decode('utf-8'))
+        self._cache[name] = obj
+        return obj
+
+    def pending(self, name):
+        return name in self.LAZY and name not in self._cache and name in self.table
+
+    def load(self, full=False):
+        """
+        Monta o dict da sessão a partir de state, rows (como RowStore), baseline e log.
+        As linhas saem sem 'history' e 'mt_cache' (ver attach), a menos que full=True.
+        """
+        data = dict(self.section("state"))
+        rows = self.section("rows")
+        trans = RowStore.from_columns(rows["ids"], rows["original"], rows["translated"], rows["has_quotes"],
+                                      rows["original_line"], rows["source_file"], rows["ignore_errors"])
+        self._cache.pop("rows", None)  # Já virou RowStore; não precisa ficar em memória duas vezes
+        data["trans"] = trans
+        data["base_snap"] = {int(k): v for k, v in self.section("baseline").items()}
+        data["log"] = list(self.section("log"))
+        if full:
+            for name in self.LAZY: self.attach(name, trans)
+        return data
+
+    def attach(self, name, translations):
+        """
+        Preenche 'history' ou 'mt_cache' nas linhas a partir da seção lazy.
+        Só as linhas gravadas na seção são tocadas; as demais continuam sem o campo
+        (histórico padrão / sem MT). Linhas que já têm o campo (vindo do diário) são mantidas.
+        """
+        field = "history" if name == "history" else "mt_cache"
+        for k, v in self.section(name).items():
+            row = translations.get(int(k))
+            if row is not None and field not in row: row[field] = v
+        self._cache.pop(name, None)
+        self._cache[name] = None  # Marca como carregada sem manter a cópia
@@ -0,0 +1,211 @@
+import os
+import sys
+import gzip
+import json
+import mmap
+import zlib
+import struct
+import threading
+from array import array
+from functools import lru_cache
+from operator import itemgetter
+
+class CompiledDictionary:
+    """
+    Dicionário ortográfico compilado em um arquivo mapeável (mmap), no lugar do
+    dict de frequências do pyspellchecker montado a cada abertura.
+        cabeçalho: MAGIC, versão, ordem dos bytes, nº de slots, nº de palavras,
+                   mtime/tamanho do dicionário fonte, crc32 das palavras extras, alfabeto
+        slots:     uint32 por slot (endereçamento aberto, sondagem linear a partir de
+                   crc32(palavra)); 0 = vazio, senão 1 + offset da palavra no bloco
+        bloco:     por palavra: frequência (uint32), tamanho (uint16), bytes UTF-8
+    As consultas leem direto do mapeamento, então processos diferentes (workers da
+    auditoria) compartilham as mesmas páginas. O arquivo é refeito quando o dicionário
+    fonte ou as palavras extras (whitelist) mudam. Palavras adicionadas na sessão ficam
+    em um overlay em memória.
+    """
+    MAGIC = b"ENADICT\x01"
+    VERSION = 1
+    HEADER = struct.Struct("=8sHcxIIqqII")
+    ENTRY = struct.Struct("=IH")
+    LOAD = 0.5  # Ocupação máxima da tabela de slots
+
+    def __init__(self, buf, mm=None, path=None):
+        self.path = path
+        self._mm = mm
+        self._buf = buf
+        magic, _, _, nslots, self.words, _, _, _, alpha_len = self.HEADER.unpack_from(buf)
+        start = self.HEADER.size
+        self.letters = bytes(buf[start:start + alpha_len]).decode('utf-8')
+        start = (start + alpha_len + 3) & ~3
+        self._mask = nslots - 1
+        self._slots = memoryview(buf)[start:start + 4 * nslots].cast('I')
+        self._blob = start + 4 * nslots
+        self.overlay = set()
+        self.candidates = lru_cache(maxsize=256)(self._candidates)
+
+    # --- Montagem ---
+    @staticmethod
+    def stamp(source, extra=()):
+        """(mtime_ns, tamanho, crc32 das palavras extras) que identificam a versão da fonte."""
+        st = os.stat(source)
+        return st.st_mtime_ns, st.st_size, zlib.crc32("\n".join(sorted(extra)).encode('utf-8'))
+
+    @classmethod
+    def compile(cls, source, extra=()):
+        """Lê o dicionário fonte (JSON gzip {palavra: frequência}) e devolve o arquivo compilado (bytes)."""
+        with gzip.open(source, 'rt', encoding='utf-8') as f: data = json.load(f)
+        freq = {}
+        for w, n in data.items():
+            w = w.lower()
+            freq[w] = freq.get(w, 0) + n
+        for w in extra:
+            w = w.lower()
+            freq[w] = freq.get(w, 0) + 1
+        del data
+        letters = "".join(sorted({c for w in freq for c in w}))
+        alpha = letters.encode('utf-8')
+
+        nslots = 1
+        while nslots * cls.LOAD < len(freq): nslots *= 2
+        mask = nslots - 1
+        slots = array('I', bytes(4 * nslots))
+        blob = bytearray()
+        entry = cls.ENTRY.pack
+        for w, n in freq.items():
+            b = w.encode('utf-8')
+            if len(b) > 0xFFFF: continue
+            h = zlib.crc32(b) & mask
+            while slots[h]: h = (h + 1) & mask
+            slots[h] = len(blob) + 1
+            blob += entry(min(n, 0xFFFFFFFF), len(b)) + b
+
+        mtime, size, extra_crc = cls.stamp(source, extra)
+        head = cls.HEADER.pack(cls.MAGIC, cls.VERSION, sys.byteorder[0].encode('ascii'), nslots, len(freq),
+                               mtime, size, extra_crc, len(alpha)) + alpha
+        head += bytes(-len(head) % 4)
+        return head + slots.tobytes() + bytes(blob)
+
+    @classmethod
+    def build(cls, source, path, extra=()):
+        """Compila e grava de forma atômica (temporário por processo e thread + os.replace)."""
+        data = cls.compile(source, extra)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'wb') as f: f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+        return data
+
+    @classmethod
+    def is_current(cls, buf, source, extra=()):
+        """O arquivo compilado corresponde à fonte, à whitelist e a esta máquina (ordem dos bytes)?"""
+        if len(buf) < cls.HEADER.size: return False
+        magic, version, order, _, _, mtime, size, extra_crc, _ = cls.HEADER.unpack_from(buf)
+        return (magic == cls.MAGIC and version == cls.VERSION and order == sys.byteorder[0].encode('ascii')
+                and (mtime, size, extra_crc) == cls.stamp(source, extra))
+
+    @classmethod
+    def open(cls, path, source, extra=()):
+        """Mapeia o arquivo compilado; None se não existe ou está desatualizado."""
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError): return None
+        if not cls.is_current(mm, source, extra):
+            mm.close()
+            return None
+        return cls(mm, mm, path)
+
+    @classmethod
+    def load(cls, path, source, extra=()):
+        """
+        Abre o compilado ou compila de novo. Se não der para gravar (pasta sem permissão,
+        arquivo em uso por outro processo), usa a versão compilada direto da memória.
+        Devolve (dicionário, compilou agora?).
+        """
+        d = cls.open(path, source, extra)
+        if d is not None: return d, False
+        try: data = cls.build(source, path, extra)
+        except OSError: return cls(cls.compile(source, extra)), True
+        return cls.open(path, source, extra) or cls(data), True
+
+    def close(self):
+        self._slots.release()
+        if self._mm is not None: self._mm.close()
+
+    # --- Consulta ---
+    def _find(self, word):
+        """Offset da entrada da palavra no bloco, ou -1."""
+        b = word.encode('utf-8')
+        buf, slots, mask, size = self._buf, self._slots, self._mask, self.ENTRY.size
+        h = zlib.crc32(b) & mask
+        while True:
+            o = slots[h]
+            if not o: return -1
+            o += self._blob - 1
+            n = buf[o + 4] | (buf[o + 5] << 8) if sys.byteorder == "little" else (buf[o + 4] << 8) | buf[o + 5]
+            if n == len(b) and buf[o + size:o + size + n] == b: return o
+            h = (h + 1) & mask
+
+    def __contains__(self, word):
+        word = word.lower()
+        return word in self.overlay or self._find(word) >= 0
+
+    def __len__(self): return self.words + len(self.overlay)
+
+    def frequency(self, word):
+        word = word.lower()
+        o = self._find(word)
+        if o >= 0: return self.ENTRY.unpack_from(self._buf, o)[0]
+        return 1 if word in self.overlay else 0
+
+    def known(self, words):
+        return {w for w in words if w in self}
+
+    def _known_lower(self, words):
+        """
+        known() para muitas palavras já em minúsculas (edições geradas). O slot inicial de
+        cada uma é lido em lote (itemgetter, em C); slot vazio = ausente, sem sondagem.
+        """
+        words = list(words)
+        if not words: return set()
+        crc, mask = zlib.crc32, self._mask
+        home = itemgetter(*[crc(w.encode('utf-8')) & mask for w in words])(self._slots)
+        if len(words) == 1: home = (home,)
+        found = {w for w, h in zip(words, home) if h and self._find(w) >= 0}
+        found.update(self.overlay.intersection(words))
+        return found
+
+    def load_words(self, words):
+        """Palavras adicionadas na sessão (só em memória)."""
+        self.overlay.update(w.lower() for w in words)
+        self.candidates.cache_clear()
+
+    def edits1(self, word):
+        letters = self.letters
+        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        out = {L + R[1:] for L, R in splits if R}
+        out.update(L + R[1] + R[0] + R[2:] for L, R in splits if len(R) > 1)
+        out.update(L + c + R[1:] for L, R in splits if R for c in letters)
+        out.update(L + c + R for L, R in splits for c in letters)
+        return out
+
+    def _candidates(self, word):
+        """
+        Correções possíveis (distância de edição 1, senão 2), da mais frequente para a
+        menos; None se não houver. Mesmo critério do SpellChecker.candidates.
+        """
+        word = word.lower()
+        if word in self: return [word]
+        e1 = self.edits1(word)
+        found = self._known_lower(e1)
+        if not found:
+            e2 = set()
+            for e in e1: e2 |= self.edits1(e)
+            found = self._known_lower(e2)
+        if not found: return None
+        return sorted(found, key=lambda w: (-self.frequency(w), w))
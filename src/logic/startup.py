@@ -0,0 +1,54 @@
+import sys
+import time
+import threading
+from ..config import STARTUP_REPORT
+
+class StartupReport:
+    """
+    Tempo de cada etapa da abertura: as feitas antes da janela aparecer (importações,
+    serviços, interface, sessão) e os serviços carregados depois, em segundo plano
+    (dicionário, tradutor, índice de busca). O relógio começa na importação deste módulo.
+    """
+    def __init__(self, verbose=STARTUP_REPORT):
+        self.verbose = verbose  # Imprime as etapas de segundo plano conforme terminam
+        self.t0 = time.perf_counter()
+        self._last = self.t0
+        self._lock = threading.Lock()
+        self.steps = []  # (etapa, segundos, em segundo plano)
+        self.ready_at = None
+
+    def mark(self, name):
+        """Fecha a etapa 'name': o tempo desde a marca anterior."""
+        now = time.perf_counter()
+        with self._lock:
+            self.steps.append((name, now - self._last, False))
+            self._last = now
+
+    def add(self, name, seconds):
+        """Etapa medida fora da sequência (thread de segundo plano)."""
+        with self._lock: self.steps.append((name, seconds, True))
+        if self.verbose: print(f"⏱️ {name}: {seconds * 1000:.1f} ms (segundo plano)", file=sys.stderr)
+
+    def window_ready(self):
+        self.mark("janela")
+        self.ready_at = time.perf_counter() - self.t0
+        if self.verbose: self.print()
+
+    def lines(self):
+        with self._lock: steps = list(self.steps)
+        out = [f"{name:<28}{sec * 1000:9.1f} ms" for name, sec, bg in steps if not bg]
+        if self.ready_at is not None: out.append(f"{'= janela pronta':<28}{self.ready_at * 1000:9.1f} ms")
+        bg = [(name, sec) for name, sec, b in steps if b]
+        if bg:
+            out.append("Em segundo plano:")
+            out.extend(f"  {name:<26}{sec * 1000:9.1f} ms" for name, sec in bg)
+        return out
+
+    def print(self, file=None):
+        print("⏱️ Abertura:\n" + "\n".join(self.lines()), file=file or sys.stderr)
+
+    def to_dict(self):
+        with self._lock:
+            return {"ready": self.ready_at, "steps": [{"name": n, "seconds": s, "background": b} for n, s, b in self.steps]}
+
+STARTUP = StartupReport()
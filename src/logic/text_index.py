@@ -0,0 +1,147 @@
+import time
+import threading
+from array import array
+from collections import defaultdict
+
+def _grams(text, n=3):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class TextIndex:
+    """
+    Índice invertido de trigramas sobre original + tradução (casefold) de cada linha,
+    para a busca da lista e o Localizar/Substituir.
+    - Base: trigrama -> array de IDs, montada em uma thread a partir da tabela inteira.
+    - Edições depois da montagem: o ID entra em 'stale' (a base pode estar errada para ele)
+      e os trigramas atuais vão para um overlay pequeno (trigrama -> set de IDs).
+    search() intersecta as listas dos trigramas da consulta, junta o overlay e confirma
+    cada candidato no texto. Enquanto o índice não está pronto (ou a consulta tem menos
+    de 3 caracteres) devolve None e quem chamou faz a varredura linear.
+    """
+    N = 3
+    REBUILD_AFTER = 20000  # Linhas editadas no overlay antes de remontar a base
+
+    def __init__(self):
+        self.table = None
+        self.ready = False
+        self._lock = threading.Lock()
+        self._gen = 0
+        self._base = {}
+        self._stale = set()
+        self._delta = defaultdict(set)
+        self._delta_grams = {}   # id -> trigramas no overlay (para remover na próxima edição)
+        self.build_time = 0.0
+
+    def _row_grams(self, orig, text):
+        g = _grams(orig.casefold(), self.N)
+        if text != orig: g |= _grams(text.casefold(), self.N)
+        return g
+
+    # --- Montagem ---
+    def rebuild(self, table, on_ready=None):
+        """Descarta o índice e monta de novo em segundo plano. on_ready() roda na thread de montagem."""
+        with self._lock:
+            self._gen += 1
+            gen = self._gen
+            self.table = table
+            self.ready = False
+            self._base = {}
+            self._stale = set()
+            self._delta = defaultdict(set)
+            self._delta_grams = {}
+        threading.Thread(target=self._build, args=(gen, table, on_ready), daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._gen += 1
+            self.table = None
+            self.ready = False
+            self._base, self._stale, self._delta, self._delta_grams = {}, set(), defaultdict(set), {}
+
+    def _build(self, gen, table, on_ready):
+        t0 = time.perf_counter()
+        post = defaultdict(list)
+        n = self.N
+        try:
+            for i, (idx, orig, text) in enumerate(table.columns("original", "translated")):
+                # Original e tradução juntos; trigramas que cruzam o '\n' só geram candidatos a mais
+                s = orig.casefold() if text == orig else orig.casefold() + "\n" + text.casefold()
+                for g in {s[j:j + n] for j in range(len(s) - n + 1)}: post[g].append(idx)
+                if not i % 2000:
+                    if gen != self._gen: return  # Tabela trocada: montagem descartada
+                    time.sleep(0)  # Cede o GIL para a interface
+        except RuntimeError: return  # Tabela alterada em tamanho durante a leitura (foi trocada)
+        base = {g: array('i', ids) for g, ids in post.items()}
+        del post
+        with self._lock:
+            if gen != self._gen: return
+            self._base = base
+            self.ready = True
+            self.build_time = time.perf_counter() - t0
+        if on_ready: on_ready()
+
+    # --- Atualização (thread do Tk) ---
+    def update(self, idx):
+        """Reindexa a linha depois de uma alteração na tradução."""
+        table = self.table
+        if table is None: return
+        with self._lock:
+            for g in self._delta_grams.pop(idx, ()):
+                ids = self._delta.get(g)
+                if ids is not None:
+                    ids.discard(idx)
+                    if not ids: del self._delta[g]
+            self._stale.add(idx)
+            row = table.texts(idx)
+            if row is not None:
+                grams = self._row_grams(*row)
+                for g in grams: self._delta[g].add(idx)
+                self._delta_grams[idx] = grams
+            rebuild = self.ready and len(self._stale) > self.REBUILD_AFTER
+        if rebuild: self.rebuild(table)
+
+    def update_many(self, ids):
+        """Reindexa um lote (importação, substituir tudo); lotes grandes remontam a base direto."""
+        if self.table is None: return
+        if len(self._stale) + len(ids) > self.REBUILD_AFTER: self.rebuild(self.table); return
+        for idx in ids: self.update(idx)
+
+    # --- Consulta ---
+    def candidates(self, grams):
+        """IDs que podem conter todos os trigramas (superconjunto); None se o índice não está pronto."""
+        with self._lock:
+            if not self.ready: return None
+            lists = sorted((self._base.get(g, ()) for g in grams), key=len)
+            base = set(lists[0]) if lists else set()
+            for ids in lists[1:]:
+                if not base: break
+                base.intersection_update(ids)
+            base -= self._stale
+            delta = None
+            for g in grams:
+                ids = self._delta.get(g, ())
+                delta = set(ids) if delta is None else delta & ids
+                if not delta: break
+            return base | (delta or set())
+
+    def candidates_for(self, text):
+        """Candidatos (superconjunto) das linhas que contêm 'text'; None se não dá para usar o índice."""
+        q = text.casefold()
+        if len(q) < self.N: return None
+        return self.candidates(_grams(q, self.N))
+
+    def search(self, query):
+        """
+        IDs cujo original ou tradução contém 'query' (sem diferenciar maiúsculas).
+        None = índice indisponível ou consulta curta demais; use a varredura linear.
+        """
+        q = query.casefold()
+        cand = self.candidates_for(q)
+        if cand is None: return None
+        texts = self.table.texts
+        out = set()
+        for idx in cand:
+            row = texts(idx)
+            if row is None: continue
+            orig, text = row
+            if q in orig.casefold() or (text != orig and q in text.casefold()): out.add(idx)
+        return out
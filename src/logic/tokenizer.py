@@ -0,0 +1,52 @@
+import re
+from functools import lru_cache
+
+# Tipos de trecho
+TAG, ENA, WORD, HYPHEN, NUMBER, PUNCT, SPACE = "tag", "ena", "word", "hyphen", "number", "punct", "space"
+WORD_KINDS = frozenset((ENA, WORD, HYPHEN, NUMBER))  # Tudo que a ortografia enxerga como palavra
+ENA_KEYWORDS = frozenset(("ENASales", "ENAMean", "Whisper", "Hint"))
+
+# Uma alternativa por tipo, testadas na ordem; '.' cobre qualquer outro caractere.
+# Palavra = sequência de letras/dígitos e hífens que começa e termina em letra/dígito
+# (o mesmo que \b[\w-]+\b com as tags trocadas por espaço).
+_TOKEN_RE = re.compile(r'<[^>]+>|\w[\w-]*\w|\w|\s+|.', re.S)
+
+@lru_cache(maxsize=8192)
+def tokenize(text):
+    """
+    Divide o texto em trechos tipados em uma única passada: tuplas
+    (tipo, início, fim, texto) com tipo em tag, ena, word, hyphen, number, punct, space.
+    Os trechos cobrem o texto inteiro, em ordem. O resultado é imutável e fica em cache por texto.
+    """
+    spans = []
+    add = spans.append
+    pos = 0
+    for tok in _TOKEN_RE.findall(text):
+        c = tok[0]
+        if c.isspace(): kind = SPACE
+        elif c == '<' and len(tok) > 1: kind = TAG
+        elif c.isalnum() or c == '_':
+            if tok in ENA_KEYWORDS: kind = ENA
+            elif '-' in tok: kind = HYPHEN
+            elif tok.isdigit(): kind = NUMBER
+            else: kind = WORD
+        else: kind = PUNCT
+        end = pos + len(tok)
+        add((kind, pos, end, tok))
+        pos = end
+    return tuple(spans)
+
+def tags(text):
+    """Tags <...> do texto, na ordem."""
+    if '<' not in text: return []
+    return [tok for kind, _, _, tok in tokenize(text) if kind == TAG]
+
+def ena_ranges(spans):
+    """(início, fim) de cada palavra reservada do jogo, inclusive dentro de palavras com hífen."""
+    for kind, start, end, tok in spans:
+        if kind == ENA: yield start, end
+        elif kind == HYPHEN:
+            pos = start
+            for part in tok.split('-'):
+                if part in ENA_KEYWORDS: yield pos, pos + len(part)
+                pos += len(part) + 1
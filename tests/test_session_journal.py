@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.logic.row_store import RowStore
+from src.logic.history_store import SessionLog
+from src.logic.session_journal import SessionJournal
+
+class SessionJournalRoundTrip(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "sessao.snap")
+        self.trans = RowStore()
+        for i in range(5): self.trans.add(i, f"line {i}", i + 10, has_quotes=True)
+        self.log = SessionLog()
+
+    def tearDown(self): shutil.rmtree(self.dir)
+
+    def edit(self, journal, idx, text, time):
+        self.trans[idx]["translated"] = text
+        self.log.append(time, idx, self.trans.add_version(idx, text, time))
+        journal.mark_row(idx)
+
+    def snapshot(self):
+        return {"base": "base.txt", "idx": 1, "trans": self.trans.copy(), "log": self.log.to_list(), "base_snap": {}}
+
+    def test_compact_append_load(self):
+        j = SessionJournal(self.path)
+        self.edit(j, 1, "linha 1", "10:00")
+        self.edit(j, 2, "linha 2", "10:01")
+        j.request_compact()
+        j.flush(self.trans, self.log, {"idx": 1}, self.snapshot)
+        self.edit(j, 1, "linha um", "10:02")
+        self.trans[3]["ignore_errors"] = True
+        j.mark_row(3)
+        j.flush(self.trans, self.log, {"idx": 3}, self.snapshot)
+        self.assertIsNone(j.close())
+
+        data = SessionJournal(self.path).load(full=True)
+        t = data["trans"]
+        self.assertEqual(t[1]["translated"], "linha um")
+        self.assertEqual(t[2]["translated"], "linha 2")
+        self.assertEqual(t[0]["translated"], "line 0")
+        self.assertTrue(t[3]["ignore_errors"])
+        self.assertEqual(t[4]["original_line"], 14)
+        self.assertEqual([v[2] for v in t.versions(1)], ["line 1", "linha 1", "linha um"])
+        self.assertEqual(len(data["log"]), 3)
+        self.assertEqual(data["idx"], 3)
+
+    def test_failed_compaction_is_retried(self):
+        j = SessionJournal(os.path.join(self.dir, "falta", "sessao.snap"))
+        self.edit(j, 1, "linha 1", "10:00")
+        j.request_compact()
+        j.flush(self.trans, self.log, {"idx": 1}, self.snapshot)
+        self.assertIsNotNone(j.wait())
+        self.assertTrue(j.compact_pending)
+        os.makedirs(os.path.join(self.dir, "falta"))
+        j.flush(self.trans, self.log, {"idx": 1}, self.snapshot)
+        self.assertIsNone(j.close())
+        data = SessionJournal(j.snapshot_path).load(full=True)
+        self.assertEqual(data["trans"][1]["translated"], "linha 1")
+
+if __name__ == "__main__":
+    unittest.main()